@@ -0,0 +1,106 @@
+"""
+_bench_import.py — Startup import cost of main.py, with a budget and a lazy-import guard.
+
+Runs `python -X importtime -c "import main"` a few times in fresh processes
+and parses the per-module timings from stderr, then:
+
+  * reports main's cumulative import time (best of N runs) and the modules
+    that cost the most on their own,
+  * times `python main.py --help` end to end against an empty interpreter,
+  * fails if importing main pulls in anything that should only load once a
+    session starts (the question bank, the store, the keyboard driver).
+
+Usage:
+    python _bench_import.py                   # 7 runs, 25 ms budget
+    python _bench_import.py --runs 15 --budget-ms 15
+
+Exits 1 when the budget is exceeded or a guarded module is imported.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Module name prefixes that must not be imported by `import main`
+GUARDED = (
+    "session_memory", "session_history", "question_generator", "question_templates",
+    "snippets", "bank", "human_simulator", "pyautogui", "sqlite3",
+)
+
+
+def importtime(statement: str) -> dict[str, tuple[int, int]]:
+    """Return module → (self µs, cumulative µs) for one fresh `python -c statement`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative))
+    return timings
+
+
+def wall_ms(argv: list[str], runs: int) -> float:
+    """Best wall-clock time of `argv` over `runs` fresh processes, in ms."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def guarded_imports() -> list[str]:
+    out = subprocess.run(
+        [sys.executable, "-c", "import json, sys, main; print(json.dumps(sorted(sys.modules)))"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return [m for m in json.loads(out) if m.split(".")[0] in GUARDED]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time budget check for main.py")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh processes per measurement (default: 7)")
+    parser.add_argument("--budget-ms", type=float, default=25.0,
+                        help="Max cumulative import time of main, best run (default: 25)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest modules to list (default: 8)")
+    args = parser.parse_args()
+
+    runs = [importtime("import main") for _ in range(args.runs)]
+    best = min(runs, key=lambda t: t["main"][1])
+    main_ms = best["main"][1] / 1000
+
+    print(f"[Import] import main: {main_ms:.1f} ms cumulative (best of {args.runs}), "
+          f"{len(best)} modules loaded by the interpreter + main")
+    print("         slowest modules (self time, best run):")
+    for name, (self_us, cumulative) in sorted(best.items(), key=lambda kv: -kv[1][0])[:args.top]:
+        print(f"           {name:32s} {self_us / 1000:6.2f} ms  (cumulative {cumulative / 1000:6.2f} ms)")
+
+    empty = wall_ms([sys.executable, "-c", "pass"], args.runs)
+    help_ms = wall_ms([sys.executable, "main.py", "--help"], args.runs)
+    print(f"[Import] python main.py --help: {help_ms:.1f} ms wall "
+          f"({help_ms - empty:.1f} ms over an empty interpreter at {empty:.1f} ms)")
+
+    failed = False
+    leaked = guarded_imports()
+    if leaked:
+        failed = True
+        print(f"[Import] FAIL: import main loads {', '.join(leaked)} — defer it into main()")
+    if main_ms > args.budget_ms:
+        failed = True
+        print(f"[Import] FAIL: {main_ms:.1f} ms exceeds the {args.budget_ms:.1f} ms budget")
+    if not failed:
+        print(f"[Import] OK: within the {args.budget_ms:.1f} ms budget, no guarded modules imported")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+_bench_rss.py — Resident memory of the two runtime modes across bank sizes.
+
+For each size a synthetic live bank is generated from the real questions
+(cycled, each copy made unique) in a temporary directory, both as a Q_* list
+module — what question_generator imports by default — and as a pack (what
+main.py --lean maps). A fresh child process per (mode, size) then loads the
+bank, asks for one question and reports how much its RSS grew:
+
+    resident   import the list module (from its .pyc, as on every normal run)
+    lean       open the pack with PackReader and decode the one question
+
+Both children import the bank code first, so the growth is the bank's data
+alone; the total process RSS is shown alongside.
+
+Usage:
+    python _bench_rss.py                          # 1k, 10k, 100k questions
+    python _bench_rss.py --sizes 500,5000 --codec zlib
+
+RSS is read from /proc/self/statm on Linux, else from psutil if installed,
+else the peak from the resource module.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+THEMES = ("react_internals", "performance", "nextjs_advanced", "typescript", "architecture",
+          "debugging", "state_management", "css_rendering", "testing")
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    import resource  # peak, not current — the closest portable fallback
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ─── Child process ────────────────────────────────────────────────────────────
+
+def child(mode: str, workdir: Path, size: int) -> None:
+    from bank.pack import PackReader
+    from bank.source import question_id
+
+    before = rss_bytes()
+    target = size // 2
+    if mode == "resident":
+        sys.path.insert(0, str(workdir))
+        from q_bench import Q_BENCH
+        question = Q_BENCH[target].strip()
+    else:
+        reader = PackReader(workdir / "bench.pack")
+        per_theme = -(-size // len(THEMES))
+        question = reader.get(question_id("live", THEMES[target // per_theme], target % per_theme))
+    after = rss_bytes()
+    print(json.dumps({"before": before, "after": after, "chars": len(question)}))
+
+
+# ─── Parent ───────────────────────────────────────────────────────────────────
+
+def seed_questions() -> list[str]:
+    from bank.pack import collect
+    texts = list(collect(errors=[]).values())
+    if not texts:
+        raise SystemExit("No questions found to seed the synthetic bank")
+    return texts
+
+
+def build(workdir: Path, size: int, seeds: list[str], codec: str | None) -> dict:
+    """Write q_bench.py (+ .pyc) and bench.pack holding `size` questions."""
+    from bank.pack import write_pack
+    from bank.source import question_id
+
+    texts = [f"{seeds[i % len(seeds)]}\n\n(variant {i})" for i in range(size)]
+    with (workdir / "q_bench.py").open("w", encoding="utf-8") as f:
+        f.write("Q_BENCH = [\n")
+        for text in texts:
+            f.write(f"    {text!r},\n")
+        f.write("]\n")
+    # Compile in a child so this process doesn't hold the module's AST
+    source = str(workdir / "q_bench.py")
+    subprocess.run([sys.executable, "-c", f"import py_compile; py_compile.compile({source!r})"], check=True)
+
+    per_theme = -(-size // len(THEMES))
+    questions = {
+        question_id("live", THEMES[i // per_theme], i % per_theme): text
+        for i, text in enumerate(texts)
+    }
+    stats = write_pack(questions, workdir / "bench.pack", codec=codec)
+    return {"raw": stats["raw_bytes"], "pack": stats["pack_bytes"]}
+
+
+def measure(mode: str, workdir: Path, size: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, str(workdir), str(size)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RSS of the resident vs lean question bank")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated bank sizes (default: 1000,10000,100000)")
+    parser.add_argument("--codec", choices=["zstd", "zlib"], default=None)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "DIR", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, workdir, size = args.child
+        child(mode, Path(workdir), int(size))
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    seeds = seed_questions()
+    mb = 1024 * 1024
+    print(f"{'questions':>10} {'raw MB':>8} {'pack MB':>8} "
+          f"{'resident +MB':>13} {'lean +MB':>9} {'ratio':>6}   process MB (resident / lean)")
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix="bench_rss_") as tmp:
+            workdir = Path(tmp)
+            sizes_on_disk = build(workdir, size, seeds, args.codec)
+            resident = measure("resident", workdir, size)
+            lean = measure("lean", workdir, size)
+        r = (resident["after"] - resident["before"]) / mb
+        l = (lean["after"] - lean["before"]) / mb
+        print(f"{size:>10,} {sizes_on_disk['raw'] / mb:8.1f} {sizes_on_disk['pack'] / mb:8.1f} "
+              f"{r:13.1f} {l:9.2f} {r / max(l, 0.01):5.0f}x   "
+              f"{resident['after'] / mb:.1f} / {lean['after'] / mb:.1f}")
+
+
+if __name__ == "__main__":
+    main()
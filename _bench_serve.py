@@ -0,0 +1,158 @@
+"""
+_bench_serve.py — The local bank service against importing the bank in every consumer.
+
+Starts `python -m bank serve` on a free port, then measures:
+
+  consumer   what one short-lived script pays to fetch a live and an archived
+             question, in a fresh process each time (best of --runs):
+                 import     import question_generator and generate() both
+                 client     from bank.client import BankClient, two lookups
+             wall time and RSS growth over an empty interpreter are shown
+  requests   --threads client threads doing --requests random id lookups
+             each, three ways:
+                 new conn   a fresh TCP connection per request
+                 keep-alive one connection per thread (BankClient)
+                 304        the same lookups repeated: ETag revalidations
+
+Usage:
+    python _bench_serve.py
+    python _bench_serve.py --threads 8 --requests 500 --runs 3
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from bank.client import BankClient  # noqa: E402
+
+# One live and one archived question, fetched by every consumer
+CHILD = {
+    "import": """
+import question_generator
+texts = [question_generator.generate("testing", "0"), question_generator.generate("testing", "batch1:0")]
+""",
+    "client": """
+from bank.client import BankClient
+bank = BankClient({url!r})
+texts = [bank.question("live/testing#0")["text"], bank.question("batch1/testing#0")["text"]]
+""",
+}
+
+CHILD_WRAPPER = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from _bench_rss import rss_bytes
+before, start = rss_bytes(), time.perf_counter()
+{body}
+print(json.dumps({{"seconds": time.perf_counter() - start, "rss": rss_bytes() - before,
+                  "chars": sum(map(len, texts))}}))
+"""
+
+
+def start_server() -> tuple[subprocess.Popen, str]:
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-m", "bank", "serve", "--port", "0"],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True,
+    )
+    for line in proc.stdout:
+        if "Serving" in line:
+            return proc, line.split(" on ")[1].split("/ ")[0]
+    raise SystemExit("the server did not start")
+
+
+def bench_consumers(url: str, runs: int) -> None:
+    for name, body in CHILD.items():
+        code = CHILD_WRAPPER.format(root=str(ROOT), body=body.format(url=url))
+        results = [
+            json.loads(subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                                      capture_output=True, text=True).stdout)
+            for _ in range(runs)
+        ]
+        best = min(results, key=lambda r: r["seconds"])
+        print(f"  {name:<8} {best['seconds'] * 1e3:8.1f} ms   +{best['rss'] / 2 ** 20:6.1f} MB RSS   "
+              f"({best['chars']:,} chars)")
+
+
+def bench_requests(url: str, ids: list[str], threads: int, requests: int) -> None:
+    host, port = url.removeprefix("http://").split(":")
+    picks = [random.Random(t).choices(ids, k=requests) for t in range(threads)]
+
+    def new_conn(targets: list[str], latencies: list[float]) -> None:
+        for qid in targets:
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection(host, int(port))
+            conn.request("GET", "/questions/" + quote(qid, safe="/"))
+            conn.getresponse().read()
+            conn.close()
+            latencies.append(time.perf_counter() - start)
+
+    def keep_alive(client: BankClient, targets: list[str], latencies: list[float]) -> None:
+        for qid in targets:
+            start = time.perf_counter()
+            client.question(qid)
+            latencies.append(time.perf_counter() - start)
+
+    clients = [BankClient(url) for _ in range(threads)]
+    modes = [
+        ("new conn", lambda t, lat: new_conn(picks[t], lat)),
+        ("keep-alive", lambda t, lat: keep_alive(clients[t], picks[t], lat)),
+        ("304", lambda t, lat: keep_alive(clients[t], picks[t], lat)),
+    ]
+    for name, work in modes:
+        for c in clients:
+            c.not_modified = 0
+        latencies: list[list[float]] = [[] for _ in range(threads)]
+        workers = [threading.Thread(target=work, args=(t, latencies[t])) for t in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        flat = sorted(x for lat in latencies for x in lat)
+        print(f"  {name:<10} {len(flat) / elapsed:8,.0f} req/s   "
+              f"p50 {statistics.median(flat) * 1e3:6.2f} ms   p95 {flat[int(len(flat) * 0.95)] * 1e3:6.2f} ms")
+    revalidated = sum(c.not_modified for c in clients)
+    print(f"  ({revalidated:,} of {threads * requests:,} repeated lookups answered 304)")
+    for c in clients:
+        c.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--threads", type=int, default=4, help="client threads (default: 4)")
+    parser.add_argument("--requests", type=int, default=300, help="lookups per thread (default: 300)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh consumer processes per mode (default: 3)")
+    args = parser.parse_args()
+
+    proc, url = start_server()
+    try:
+        client = BankClient(url)
+        info = client.get("/")
+        ids = []
+        while len(ids) < info["questions"]:
+            ids += [q["id"] for q in client.get("/questions", offset=len(ids), limit=1000)["questions"]]
+        client.close()
+        print(f"[*] {url}: {info['questions']} questions, bank {info['bank'][:12]}")
+        print("[*] One consumer process, two questions")
+        bench_consumers(url, args.runs)
+        print(f"[*] {args.threads} threads × {args.requests} lookups")
+        bench_requests(url, ids, args.threads, args.requests)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
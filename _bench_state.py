@@ -0,0 +1,128 @@
+"""
+_bench_state.py — Cost of upgrading saved session state and of rebuilding a
+cycle from the history log, on large synthetic histories.
+
+For each size N a synthetic state of N entries (about a third used) is
+generated in every format session_state.upgrade() accepts:
+
+    v0-names   theme → [named subtopics] objects, as the first prototype kept
+    v0-pairs   [theme, name] pairs with named subtopics
+    v1         unversioned index pairs, mixed "12" / "batch3:007" / int
+               subtopics, some pairs listed both as used and available
+    v2         the current format (the no-op fast path)
+
+and upgraded once; every entry must come out exactly once. A synthetic
+session_history.jsonl of N events spread over several cycles is then read
+back with HistoryLog.cycle_pairs(), the fallback for an unreadable state.
+
+Usage:
+    python _bench_state.py                    # 10k, 100k, 1M entries
+    python _bench_state.py --sizes 5000,50000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from session_history import HistoryLog  # noqa: E402
+from session_state import STATE_VERSION, upgrade  # noqa: E402
+
+THEMES = ("react_internals", "performance", "nextjs_advanced", "typescript", "architecture",
+          "debugging", "state_management", "css_rendering", "testing")
+
+
+# ─── Synthetic data ───────────────────────────────────────────────────────────
+
+def synthetic_state(fmt: str, size: int) -> tuple[dict, int]:
+    """(a raw state of `size` entries in format `fmt`, distinct pairs it holds)."""
+    used_n = size // 3
+    if fmt == "v0-names":
+        used: dict = {t: [] for t in THEMES}
+        available: dict = {t: [] for t in THEMES}
+        for i in range(size):
+            theme = THEMES[i % len(THEMES)]
+            (used if i < used_n else available)[theme].append(f"topic_{i}_name")
+        return {"used": used, "available": available, "last_theme": THEMES[0]}, size
+    if fmt == "v0-pairs":
+        pairs = [[THEMES[i % len(THEMES)], f"topic_{i}_name"] for i in range(size)]
+        return {"used": pairs[:used_n], "available": pairs[used_n:], "last_theme": None}, size
+    if fmt == "v1":
+        def subtopic(i):
+            return (str(i), f"batch3:{i:03d}", i)[i % 3]
+        pairs = [[THEMES[i % len(THEMES)], subtopic(i)] for i in range(size)]
+        # the first 100 used pairs are also still listed as available
+        return {"used": pairs[:used_n], "available": pairs[:100] + pairs[used_n:],
+                "last_theme": THEMES[1], "cycle": 3}, size
+    pairs = [[THEMES[i % len(THEMES)], str(i)] for i in range(size)]
+    return {"version": STATE_VERSION, "used": pairs[:used_n], "available": pairs[used_n:],
+            "last_theme": None, "cycle": 1}, size
+
+
+def write_history(path: Path, size: int, cycles: int = 4) -> int:
+    """Write `size` events over `cycles` cycles; returns the last cycle's length."""
+    per_cycle = -(-size // cycles)
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(size):
+            cycle = i // per_cycle + 1
+            f.write(json.dumps({
+                "at": "2026-10-19T14:03:11", "session": "3f9c0a12b7de", "cycle": cycle,
+                "theme": THEMES[i % len(THEMES)], "subtopic": str(i % per_cycle),
+                "fp": "9fc2b8a7971079e1",
+            }) + "\n")
+    return size - (cycles - 1) * per_cycle
+
+
+# ─── Benchmarks ───────────────────────────────────────────────────────────────
+
+def bench_upgrade(size: int) -> None:
+    for fmt in ("v0-names", "v0-pairs", "v1", "v2"):
+        raw, expected = synthetic_state(fmt, size)
+        text = json.dumps(raw)
+        start = time.perf_counter()
+        data = json.loads(text)
+        parsed = time.perf_counter()
+        out, version = upgrade(data)
+        done = time.perf_counter()
+        kept = len(out["used"]) + len(out["available"])
+        assert kept == expected, f"{fmt}: {kept} entries out of {expected}"
+        assert out["version"] == STATE_VERSION
+        print(f"  {fmt:<9} from v{version}  {len(text) / 1e6:7.1f} MB  "
+              f"parse {(parsed - start) * 1e3:8.1f} ms  "
+              f"upgrade {(done - parsed) * 1e3:8.1f} ms  "
+              f"({(done - parsed) / size * 1e9:5.0f} ns/entry)")
+
+
+def bench_history(size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "session_history.jsonl"
+        last = write_history(log, size)
+        history = HistoryLog(log, Path(tmp) / "session_rollups.json")
+        start = time.perf_counter()
+        cycle, pairs = history.cycle_pairs()
+        elapsed = time.perf_counter() - start
+        assert len(pairs) == last, f"history: {len(pairs)} pairs out of {last}"
+        print(f"  history   {log.stat().st_size / 1e6:7.1f} MB  cycle {cycle}: "
+              f"{len(pairs)} pairs in {elapsed * 1e3:8.1f} ms "
+              f"({elapsed / size * 1e9:5.0f} ns/event)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="comma-separated entry counts (default: 10000,100000,1000000)")
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"[*] {size:,} entries")
+        bench_upgrade(size)
+        bench_history(size)
+
+
+if __name__ == "__main__":
+    main()
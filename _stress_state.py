@@ -0,0 +1,512 @@
+"""
+_stress_state.py — Fault-injection stress run of SessionMemory's persistence.
+
+Runs thousands of short simulated sessions in-process against a temporary
+state directory (the real files are never touched). Each session is one
+"restart": a new SessionMemory (and HistoryLog / BankStore) is built from
+whatever the previous session left on disk, then a few questions go through
+the same calls main.py makes — pick_next_theme, record_intent, record_sent,
+mark_used.
+
+Before a session, with some probability:
+
+    * a kill is armed at one persistence step of the session — a state or
+      pending write (_write_atomic), a history append, a rollups save, the
+      pending-record clear, or a store transaction — and fires there as an
+      exception that unwinds everything, like a crash. Writes can be killed
+      before they start, half-way (a torn temp file or history line) or
+      right after they complete.
+    * a file is damaged: the state truncated, replaced by garbage or by the
+      wrong JSON type, the rollups garbled, a stale garbage .tmp left behind,
+      or an "intent" pending record garbled (a "sent" one is never damaged:
+      it is written atomically, so nothing short of disk failure can tear it)
+    * the wall clock jumps by up to ±3 days
+
+A model of what was actually delivered (a question counts once its "sent"
+record is durable) is checked after every restart:
+
+    lost       a question delivered this cycle is offered again
+    phantom    a question counts as asked that was never delivered
+    duplicate  a question was delivered twice in one cycle
+    pool       the used and available pools overlap or miss a question
+
+and at the end against the history log (every delivery logged exactly once,
+rollups matching the log) and the backups of damaged state files. Recovery
+time is the time to build SessionMemory after a crash or damage.
+
+Usage:
+    python _stress_state.py                       # 2000 sessions, JSON files
+    python _stress_state.py --db --sessions 500   # SQLite store
+    python _stress_state.py --seed 7 --fsync      # real fsync (slower)
+    python _stress_state.py --verbose             # with SessionMemory's messages
+
+Exits 1 on any violation.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+import session_memory  # noqa: E402
+from session_history import HistoryLog  # noqa: E402
+from session_memory import SessionMemory  # noqa: E402
+
+KILL_MODES = {
+    "state":         ("before", "torn", "after"),
+    "pending":       ("before", "torn", "after"),
+    "history":       ("before", "torn", "after"),
+    "rollups":       ("before", "torn", "after"),
+    "clear_pending": ("before",),
+    "store.state":   ("before", "after"),
+    "store.pending": ("before", "after"),
+}
+DAMAGE = ("state-truncated", "state-garbage", "state-wrong-type", "rollups-garbage",
+          "stale-tmp", "pending-intent-garbage")
+
+
+class Killed(BaseException):
+    """A simulated crash (BaseException, so no `except Exception` swallows it)."""
+
+
+# ─── Fault injection ──────────────────────────────────────────────────────────
+
+class Faults:
+    """Counts persistence steps and raises Killed at the armed one."""
+
+    def __init__(self) -> None:
+        self.step = 0
+        self.kill_at: int | None = None
+        self.modes: dict = {}
+        self.fired: Counter = Counter()
+        self.seen: Counter = Counter()
+
+    def arm(self, rng: random.Random, horizon: int, sites) -> None:
+        self.step = 0
+        self.kill_at = rng.randint(1, horizon)
+        self.modes = {site: rng.choice(KILL_MODES[site]) for site in sites}
+
+    def disarm(self) -> None:
+        self.kill_at = None
+
+    def hit(self, site: str) -> str | None:
+        """Called at every persistence step; returns the kill mode if it fires here."""
+        self.seen[site] += 1
+        if self.kill_at is None:
+            return None
+        self.step += 1
+        if self.step != self.kill_at:
+            return None
+        self.kill_at = None
+        mode = self.modes[site]
+        self.fired[site, mode] += 1
+        return mode
+
+
+class Clock:
+    """Wall clock with injectable jumps, standing in for time.strftime."""
+
+    def __init__(self, strftime) -> None:
+        self._strftime = strftime
+        self.offset = 0.0
+
+    def strftime(self, fmt: str, t=None) -> str:
+        if t is None:
+            t = time.localtime(time.time() + self.offset)
+        return self._strftime(fmt, t)
+
+
+def install(faults: Faults, clock: Clock) -> list:
+    """Wrap every persistence step; returns the originals for restore()."""
+    import bank.store as store_mod
+
+    originals = [
+        (session_memory, "_write_atomic", session_memory._write_atomic),
+        (SessionMemory, "_clear_pending", SessionMemory._clear_pending),
+        (HistoryLog, "record", HistoryLog.record),
+        (HistoryLog, "_save_rollups", HistoryLog._save_rollups),
+        (store_mod.BankStore, "save_state", store_mod.BankStore.save_state),
+        (store_mod.BankStore, "save_pending", store_mod.BankStore.save_pending),
+        (time, "strftime", time.strftime),
+    ]
+    write_atomic = session_memory._write_atomic
+    clear_pending = SessionMemory._clear_pending
+    record = HistoryLog.record
+    save_rollups = HistoryLog._save_rollups
+    save_state = store_mod.BankStore.save_state
+    save_pending = store_mod.BankStore.save_pending
+
+    def torn_tmp(path: Path, text: str) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(text[: len(text) // 2], encoding="utf-8")
+
+    def _write_atomic(path, text):
+        site = "state" if path == session_memory._STATE_FILE else "pending"
+        mode = faults.hit(site)
+        if mode == "before":
+            raise Killed(site)
+        if mode == "torn":
+            torn_tmp(path, text)
+            raise Killed(site)
+        write_atomic(path, text)
+        if mode == "after":
+            raise Killed(site)
+
+    def _clear_pending(self):
+        if faults.hit("clear_pending") is not None:
+            raise Killed("clear_pending")
+        clear_pending(self)
+
+    def _record(self, event):
+        mode = faults.hit("history")
+        if mode == "before":
+            raise Killed("history")
+        if mode == "torn":
+            line = json.dumps(event).encode("utf-8") + b"\n"
+            with self.log_path.open("ab") as f:
+                f.truncate(self.rollups["offset"])
+                f.write(line[: len(line) // 2])
+            raise Killed("history")
+        record(self, event)
+        if mode == "after":
+            raise Killed("history")
+
+    def _save_rollups(self):
+        mode = faults.hit("rollups")
+        if mode == "before":
+            raise Killed("rollups")
+        if mode == "torn":
+            torn_tmp(self.rollup_path, json.dumps(self.rollups))
+            raise Killed("rollups")
+        save_rollups(self)
+        if mode == "after":
+            raise Killed("rollups")
+
+    def wrap_store(site, original):
+        def wrapper(self, *args, **kwargs):
+            mode = faults.hit(site)
+            if mode == "before":
+                raise Killed(site)
+            original(self, *args, **kwargs)
+            if mode == "after":
+                raise Killed(site)
+        return wrapper
+
+    session_memory._write_atomic = _write_atomic
+    SessionMemory._clear_pending = _clear_pending
+    HistoryLog.record = _record
+    HistoryLog._save_rollups = _save_rollups
+    store_mod.BankStore.save_state = wrap_store("store.state", save_state)
+    store_mod.BankStore.save_pending = wrap_store("store.pending", save_pending)
+    time.strftime = clock.strftime
+    return originals
+
+
+def restore(originals: list) -> None:
+    for owner, name, value in originals:
+        setattr(owner, name, value)
+
+
+# ─── Damage ───────────────────────────────────────────────────────────────────
+
+def damage(kind: str, rng: random.Random, workdir: Path, db: Path | None) -> bool:
+    """Damage one file on disk; returns False if there was nothing to damage."""
+    state = session_memory._STATE_FILE
+    garbage = bytes(rng.randrange(256) for _ in range(rng.randint(1, 64)))
+    if kind.startswith("state-") and db is not None:
+        conn = sqlite3.connect(db)
+        with conn:
+            changed = conn.execute(
+                "UPDATE state SET value = ? WHERE key = 'session'",
+                ("[]" if kind == "state-wrong-type" else garbage.decode("latin-1"),),
+            ).rowcount
+        conn.close()
+        return changed > 0
+    if kind == "state-truncated":
+        if not state.exists() or state.stat().st_size < 2:
+            return False
+        data = state.read_bytes()
+        state.write_bytes(data[: rng.randrange(1, len(data) - 1)])
+    elif kind == "state-garbage":
+        if not state.exists():
+            return False
+        state.write_bytes(garbage)
+    elif kind == "state-wrong-type":
+        if not state.exists():
+            return False
+        state.write_text("[]", encoding="utf-8")
+    elif kind == "rollups-garbage":
+        rollups = workdir / "session_rollups.json"
+        if not rollups.exists():
+            return False
+        rollups.write_bytes(garbage)
+    elif kind == "stale-tmp":
+        target = rng.choice([state, session_memory._PENDING_FILE, workdir / "session_rollups.json"])
+        target.with_name(target.name + ".tmp").write_bytes(garbage)
+    elif kind == "pending-intent-garbage":
+        pending = session_memory._PENDING_FILE
+        if db is not None or not pending.exists():
+            return False
+        try:
+            if json.loads(pending.read_text(encoding="utf-8")).get("phase") != "intent":
+                return False
+        except ValueError:
+            return False
+        pending.write_bytes(garbage)
+    return True
+
+
+def state_damaged_beyond_json(kind: str) -> bool:
+    return kind in ("state-truncated", "state-garbage", "state-wrong-type")
+
+
+# ─── Run ──────────────────────────────────────────────────────────────────────
+
+class Model:
+    """What was actually delivered, per cycle."""
+
+    def __init__(self) -> None:
+        self.delivered: dict[int, set] = defaultdict(set)
+        self.count = 0
+        self.violations: list[str] = []
+
+    def deliver(self, cycle: int, pair) -> None:
+        if pair in self.delivered[cycle]:
+            self.violations.append(f"duplicate: {pair} delivered twice in cycle {cycle}")
+        self.delivered[cycle].add(pair)
+        self.count += 1
+
+    def check(self, memory: SessionMemory, when: str) -> None:
+        cycle = memory._cycle
+        expected = self.delivered.get(cycle, set())
+        used = memory._used
+        available = set(memory._available)
+        for pair in sorted(expected - used)[:3]:
+            self.violations.append(f"lost ({when}): {pair} delivered in cycle {cycle} but not used")
+        for pair in sorted(used - expected)[:3]:
+            self.violations.append(f"phantom ({when}): {pair} used in cycle {cycle} but never delivered")
+        if used & available or len(used) + len(available) != len(memory._all_pairs):
+            self.violations.append(
+                f"pool ({when}): {len(used)} used + {len(available)} available "
+                f"of {len(memory._all_pairs)}, {len(used & available)} in both"
+            )
+
+
+def pending_sent(memory: SessionMemory, pair) -> bool:
+    record = memory._read_pending()
+    return (record is not None and record.get("phase") == "sent"
+            and (record["theme"], record["subtopic"]) == pair)
+
+
+def session(memory: SessionMemory, model: Model, sends: int) -> None:
+    """One session's sends, as main.py makes them."""
+    for _ in range(sends):
+        pair = memory.pick_next_theme()
+        memory.record_intent(*pair)
+        try:
+            memory.record_sent(*pair)
+        except Killed:
+            # Delivered only if the "sent" record reached the disk
+            if pending_sent(memory, pair):
+                model.deliver(memory._cycle, pair)
+            raise
+        model.deliver(memory._cycle, pair)
+        memory.mark_used(*pair)
+
+
+def history_events(workdir: Path, db: Path | None) -> list[tuple]:
+    if db is not None:
+        conn = sqlite3.connect(db)
+        rows = conn.execute("SELECT cycle, theme, subtopic FROM history ORDER BY id").fetchall()
+        conn.close()
+        return rows
+    events = []
+    log = workdir / "session_history.jsonl"
+    if log.exists():
+        with log.open("rb") as f:
+            for raw in f:
+                if raw.endswith(b"\n") and raw.strip():
+                    e = json.loads(raw)
+                    events.append((e["cycle"], e["theme"], e["subtopic"]))
+    return events
+
+
+def restart(workdir: Path, db: Path | None, seed: float):
+    """A fresh SessionMemory over what is on disk, as on a process start."""
+    if db is not None:
+        from bank.store import BankStore
+        store = BankStore(db)
+        try:
+            return SessionMemory(store=store, rng=random.Random(seed)), store
+        except BaseException:
+            store.close()
+            raise
+    history = HistoryLog(workdir / "session_history.jsonl", workdir / "session_rollups.json")
+    return SessionMemory(rng=random.Random(seed), history=history), None
+
+
+def check_history(model: Model, memory: SessionMemory, workdir: Path, db: Path | None,
+                  backups_expected: int) -> None:
+    """End-of-run checks: the history log, its rollups and the state backups."""
+    logged = Counter(history_events(workdir, db))
+    for (cycle, theme, subtopic), count in logged.items():
+        if count > 1:
+            model.violations.append(f"history: {theme} > {subtopic} logged {count}x in cycle {cycle}")
+        if (theme, subtopic) not in model.delivered.get(cycle, ()):
+            model.violations.append(f"history: {theme} > {subtopic} logged but not delivered in cycle {cycle}")
+    missing = sum(
+        1 for cycle, pairs in model.delivered.items() for pair in pairs if (cycle, *pair) not in logged
+    )
+    if missing:
+        model.violations.append(f"history: {missing} deliveries never logged")
+    if db is not None:
+        return
+    events = sum(logged.values())
+    rollups = memory._history.rollups
+    if rollups["events"] != events or sum(rollups["by_day"].values()) != events:
+        model.violations.append(
+            f"rollups: {rollups['events']} events, {sum(rollups['by_day'].values())} by day, "
+            f"log has {events}")
+    # A crash before the rebuilt state is saved recovers (and copies) again
+    backups = len(list(workdir.glob("session_state.json.*.bak")))
+    if backups < backups_expected:
+        model.violations.append(f"backups: {backups} kept of {backups_expected} damaged states")
+
+
+def run(args) -> int:
+    rng = random.Random(args.seed)
+    faults = Faults()
+    clock = Clock(time.strftime)
+    model = Model()
+    recovery_ms: list[float] = []
+    damaged: Counter = Counter()
+    backups_expected = 0
+    crashed_in_recovery = 0
+    kills_armed = 0
+    sessions = 0
+
+    saved = (session_memory._STATE_FILE, session_memory._PENDING_FILE, os.fsync)
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with tempfile.TemporaryDirectory() as tmp, quiet:
+        workdir = Path(tmp)
+        db = workdir / "bank.sqlite3" if args.db else None
+        sites = [s for s in KILL_MODES
+                 if s == "clear_pending" or s.startswith("store.") == (db is not None)]
+        session_memory._STATE_FILE = workdir / "session_state.json"
+        session_memory._PENDING_FILE = workdir / "session_state.pending.json"
+        if not args.fsync:
+            os.fsync = lambda fd: None
+        originals = install(faults, clock)
+        started = time.perf_counter()
+        try:
+            crashed = False
+            for n in range(args.sessions):
+                sessions += 1
+                kind = None
+                if n and rng.random() < args.damage:
+                    kind = rng.choice(DAMAGE)
+                    if damage(kind, rng, workdir, db):
+                        damaged[kind] += 1
+                        if db is None and state_damaged_beyond_json(kind):
+                            backups_expected += 1
+                    else:
+                        kind = None
+                if rng.random() < args.clock_jumps:
+                    clock.offset += rng.uniform(-3, 3) * 86400
+                sends = rng.randint(1, args.max_sends)
+                if rng.random() < args.kills:
+                    faults.arm(rng, 5 * sends, sites)
+                    kills_armed += 1
+
+                start = time.perf_counter()
+                try:
+                    memory, store = restart(workdir, db, rng.random())
+                except Killed:
+                    crashed_in_recovery += 1
+                    crashed = True
+                    faults.disarm()
+                    continue
+                if crashed or kind is not None:
+                    recovery_ms.append((time.perf_counter() - start) * 1e3)
+                model.check(memory, f"session {n} start")
+
+                try:
+                    session(memory, model, sends)
+                    crashed = False
+                except Killed:
+                    crashed = True
+                finally:
+                    faults.disarm()
+                    if store is not None:
+                        store.close()
+                if model.violations and not args.keep_going:
+                    break
+            elapsed = time.perf_counter() - started
+
+            # Final restart with no faults, then the history and backups
+            memory, store = restart(workdir, db, 0)
+            model.check(memory, "final")
+            check_history(model, memory, workdir, db, backups_expected)
+            if store is not None:
+                store.close()
+        finally:
+            restore(originals)
+            session_memory._STATE_FILE, session_memory._PENDING_FILE, os.fsync = saved
+
+    # ─── Report ───────────────────────────────────────────────────────────────
+    print(f"[Stress] {sessions} sessions ({'store' if args.db else 'files'}), "
+          f"{model.count} deliveries, {len(model.delivered)} cycles in {elapsed:.1f}s")
+    print(f"[Stress] kills armed {kills_armed}, fired {sum(faults.fired.values())} "
+          f"({crashed_in_recovery} during recovery)")
+    for (site, mode), count in sorted(faults.fired.items()):
+        print(f"  {site + ' / ' + mode:<24} {count:5d}")
+    untested = [f"{site}/{mode}" for site in sites
+                for mode in KILL_MODES[site] if (site, mode) not in faults.fired]
+    if untested:
+        print(f"[Stress] kill points never hit: {', '.join(untested)}")
+    print("[Stress] damage: " + (", ".join(f"{k} {v}" for k, v in sorted(damaged.items())) or "none"))
+    if recovery_ms:
+        recovery_ms.sort()
+        print(f"[Stress] recovery over {len(recovery_ms)} restarts: "
+              f"median {statistics.median(recovery_ms):.2f} ms, "
+              f"p95 {recovery_ms[int(len(recovery_ms) * 0.95)]:.2f} ms, "
+              f"max {recovery_ms[-1]:.2f} ms")
+    if model.violations:
+        print(f"[Stress] FAILED — {len(model.violations)} violation(s):")
+        for line in model.violations[:20]:
+            print(f"  {line}")
+        return 1
+    print("[Stress] OK: no progress lost or duplicated")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sessions", type=int, default=2000, help="simulated sessions (default: 2000)")
+    parser.add_argument("--max-sends", type=int, default=6, help="questions per session, at most (default: 6)")
+    parser.add_argument("--kills", type=float, default=0.5, help="chance a session has a kill armed (default: 0.5)")
+    parser.add_argument("--damage", type=float, default=0.1, help="chance a file is damaged before a session (default: 0.1)")
+    parser.add_argument("--clock-jumps", type=float, default=0.1, help="chance the clock jumps before a session (default: 0.1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", action="store_true", help="run against a SQLite store instead of JSON files")
+    parser.add_argument("--fsync", action="store_true", help="keep real fsync calls (default: skipped for speed)")
+    parser.add_argument("--keep-going", action="store_true", help="don't stop at the first failing session")
+    parser.add_argument("--verbose", action="store_true", help="show SessionMemory's [Memory] messages")
+    args = parser.parse_args()
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+bank — Offline tooling for the question bank (indexing, rotation, reports).
+
+Run as a module from the project root:
+    python -m bank --help
+"""
@@ -0,0 +1,545 @@
+"""
+bank/__main__.py - Command line entry point for question bank maintenance.
+
+Usage:
+    python -m bank index                  # index archived batches missing from the index
+    python -m bank rotate                 # archive the live batch, start an empty one
+    python -m bank rotate --from staging/ # ...and promote staging/q_*.py as the new batch
+    python -m bank rotate --dry-run       # show what a rotation would do
+    python -m bank diff batch6 live       # added / removed / moved / rewritten questions
+    python -m bank store                  # (re)build the SQLite store from every batch
+    python -m bank search "useSyncExternalStore"
+    python -m bank history --since 2026-09-01 --until 2026-10-01 --by theme
+    python -m bank code --ident useSyncExternalStore
+    python -m bank code --lang css --min-lines 30
+    python -m bank code --dupes           # code blocks shared by several questions
+    python -m bank report                 # asked-history rollups by cycle, theme and day
+    python -m bank lint                   # structural checks over every batch (cached)
+    python -m bank compile                # compile questions/*.md (only changed files)
+    python -m bank pack                   # compressed, randomly accessible bank file
+    python -m bank get batch6/testing#12  # decode one question from the pack
+    python -m bank tokens                 # approximate token counts per batch and theme
+    python -m bank stats                  # distributions + outliers -> .bank/stats.html
+    python -m bank stats --out stats.md   # ...as Markdown
+    python -m bank export                 # static searchable site -> .bank/site/ (incremental)
+    python -m bank serve                  # local read-only HTTP/JSON service on port 8765
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+def cmd_index(args: argparse.Namespace) -> None:
+    from bank.index import INDEX_FILE, backfill
+
+    added = backfill(rebuild=args.rebuild)
+    if added:
+        print(f"[Bank] Indexed {', '.join(added)} -> {INDEX_FILE}")
+    else:
+        print("[Bank] Archive index is up to date.")
+
+
+def cmd_rotate(args: argparse.Namespace) -> None:
+    import random
+    from bank.rotate import rotate
+    from bank.store import DB_FILE, BankStore
+
+    rng = random.Random(f"{args.seed}:rotate") if args.seed is not None else None
+    # State kept by main.py --db lives in the store; migrate it with the file
+    db = Path(args.db) if args.db else DB_FILE
+    store = None
+    if not args.dry_run and (args.db is not None or db.exists()):
+        store = BankStore(db)
+    try:
+        summary = rotate(stage_dir=args.stage_dir, dry_run=args.dry_run, rng=rng, store=store)
+    finally:
+        if store is not None:
+            store.close()
+    prefix = "[Bank] (dry run) " if args.dry_run else "[Bank] "
+    print(f"{prefix}Live batch archived as {summary['archived_as']} "
+          f"({summary['archived_questions']} questions)")
+    print(f"{prefix}New live batch: {summary['new_live_questions']} questions "
+          f"({summary['carried_over']} carried over)")
+    for where, (used, available) in summary["state"].items():
+        print(f"{prefix}Session state ({where}) migrated: {used} already asked, {available} available")
+
+
+def cmd_diff(args: argparse.Namespace) -> None:
+    import json
+    from bank.diff import diff_entries, label
+    from bank.index import batch_entries
+
+    errors: list[str] = []
+    result = diff_entries(batch_entries(args.a, errors), batch_entries(args.b, errors),
+                          threshold=args.threshold)
+    for err in errors:
+        print(f"[Bank] SKIPPED {err}", file=sys.stderr if args.json else sys.stdout)
+
+    if args.json:
+        out = {
+            "unchanged": result["unchanged"],
+            "moved": [[label(a), label(b)] for a, b in result["moved"]],
+            "rewritten": [[label(a), label(b), sim] for a, b, sim in result["rewritten"]],
+            "removed": [label(a) for a in result["removed"]],
+            "added": [label(b) for b in result["added"]],
+        }
+        print(json.dumps(out, indent=2))
+        return
+
+    print(f"[Bank] {args.a} -> {args.b}: "
+          f"{len(result['added'])} added, {len(result['removed'])} removed, "
+          f"{len(result['moved'])} moved, {len(result['rewritten'])} rewritten, "
+          f"{result['unchanged']} unchanged")
+    sections = [
+        ("MOVED", "  >", [f"{label(a)} -> {label(b)}" for a, b in result["moved"]]),
+        ("REWRITTEN", "  ~", [f"{label(a)} -> {label(b)}  (sim {sim:.2f})"
+                              for a, b, sim in result["rewritten"]]),
+        ("REMOVED", "  -", [f"{label(a)}  [{a['header']}] {a['chars']} chars" for a in result["removed"]]),
+        ("ADDED", "  +", [f"{label(b)}  [{b['header']}] {b['chars']} chars" for b in result["added"]]),
+    ]
+    for title, mark, lines in sections:
+        if not lines:
+            continue
+        print(f"\n{title}:")
+        for line in lines[:args.limit] if args.limit else lines:
+            print(f"{mark} {line}")
+        if args.limit and len(lines) > args.limit:
+            print(f"    ... {len(lines) - args.limit} more")
+
+
+def _open_store(args: argparse.Namespace):
+    from bank.store import BankStore, DB_FILE
+    return BankStore(Path(args.db) if args.db else DB_FILE)
+
+
+def cmd_store(args: argparse.Namespace) -> None:
+    from bank.lint import lint_corpus
+
+    results, _ = lint_corpus(args.batches or None)
+    errors = sum(1 for issues in results.values() for sev, _, _ in issues if sev == "error")
+    if errors:
+        print(f"[Bank] Lint: {errors} error(s) (details: python -m bank lint)")
+
+    store = _open_store(args)
+    written, skipped = store.build(args.batches or None)
+    for err in skipped:
+        print(f"[Bank] SKIPPED {err}")
+    print(f"[Bank] Stored {written} questions in {store.path}")
+    store.close()
+
+
+def cmd_report(args: argparse.Namespace) -> None:
+    if args.db is not None:
+        store = _open_store(args)
+        rollups = store.rollups()
+        store.close()
+    else:
+        from session_history import HistoryLog
+        rollups = HistoryLog().rollups
+
+    print(f"[Bank] {rollups['events']} question(s) sent in total")
+    if not rollups["events"]:
+        return
+
+    print("\nBy cycle:")
+    for cycle, c in sorted(rollups["by_cycle"].items(), key=lambda kv: int(kv[0])):
+        print(f"  cycle {cycle:>4s}  {c['count']:6d}   {c['first_at']} .. {c['last_at']}")
+
+    print("\nBy theme:")
+    total = rollups["events"]
+    for theme, n in sorted(rollups["by_theme"].items(), key=lambda kv: -kv[1]):
+        print(f"  {theme:20s} {n:6d}  {n / total:6.1%}")
+
+    days = sorted(rollups["by_day"].items())[-args.days:]
+    print(f"\nLast {len(days)} active day(s):")
+    peak = max(n for _, n in days)
+    for day, n in days:
+        print(f"  {day}  {n:5d}  {'#' * max(1, round(30 * n / peak))}")
+
+
+def cmd_lint(args: argparse.Namespace) -> int:
+    import time
+    from bank.lint import lint_corpus
+
+    start = time.perf_counter()
+    results, stats = lint_corpus(args.batches or None, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    counts = {"error": 0, "warning": 0}
+    for where, issues in sorted(results.items()):
+        shown = [i for i in issues if args.warnings or i[0] == "error"]
+        for severity, check, message in shown:
+            print(f"  {severity.upper():7s} {where}  [{check}] {message}")
+        for severity, _, _ in issues:
+            counts[severity] += 1
+    print(f"[Bank] Linted {stats['questions']} questions "
+          f"({stats['unique']} unique: {stats['checked']} checked, {stats['cached']} cached) "
+          f"in {elapsed:.2f}s: "
+          f"{counts['error']} error(s), {counts['warning']} warning(s)")
+    return 1 if counts["error"] else 0
+
+
+def cmd_compile(args: argparse.Namespace) -> int:
+    import time
+    from bank.source import compile_markdown, list_batches, markdown_cache_file, markdown_dir
+
+    failed = 0
+    for batch in args.batches or list_batches():
+        if args.rebuild:
+            markdown_cache_file(batch).unlink(missing_ok=True)
+        if not markdown_dir(batch).is_dir():
+            continue
+        errors: list[str] = []
+        start = time.perf_counter()
+        records, stats = compile_markdown(batch, errors=errors)
+        elapsed = time.perf_counter() - start
+        for err in errors:
+            print(f"  ERROR   {err}")
+        per_theme = ", ".join(f"{theme} {len(recs)}" for theme, recs in sorted(records.items()))
+        print(f"[Bank] {batch}: {stats['files']} file(s), {stats['compiled']} compiled, "
+              f"{stats['reused']} unchanged, {len(errors)} error(s) in {elapsed:.2f}s")
+        if per_theme:
+            print(f"       {per_theme}")
+        failed += len(errors)
+    return 1 if failed else 0
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    store = _open_store(args)
+    rows = store.search(args.query, limit=args.limit)
+    for batch, theme, idx, fp, snippet in rows:
+        print(f"  {batch}/{theme}#{idx}  {fp}")
+        print(f"      {' '.join(snippet.split())}")
+    print(f"[Bank] {len(rows)} match(es)")
+    store.close()
+
+
+def cmd_history(args: argparse.Namespace) -> None:
+    store = _open_store(args)
+    rows = store.history_counts(by=args.by, since=args.since, until=args.until)
+    for key, count in rows:
+        print(f"  {key:30s} {count:5d}")
+    print(f"[Bank] {sum(c for _, c in rows)} question(s) asked")
+    store.close()
+
+
+def cmd_code(args: argparse.Namespace) -> None:
+    from bank.codeblocks import normalize_lang
+
+    store = _open_store(args)
+    if args.dupes:
+        rows = store.code_duplicates(min_lines=args.min_lines or 3, limit=args.limit)
+        for fp, count, ids in rows:
+            print(f"  {fp}  x{count}  {ids}")
+        print(f"[Bank] {len(rows)} shared code block(s)")
+    else:
+        rows = store.code_blocks(
+            ident=args.ident,
+            lang=normalize_lang(args.lang) if args.lang else None,
+            min_lines=args.min_lines,
+            max_lines=args.max_lines,
+            batch=args.batch,
+            limit=args.limit,
+        )
+        for batch, theme, idx, ordinal, lang, lines in rows:
+            print(f"  {batch}/{theme}#{idx}  block {ordinal}  {lang:6s} {lines:4d} lines")
+        print(f"[Bank] {len(rows)} block(s)")
+    store.close()
+
+
+def cmd_pack(args: argparse.Namespace) -> None:
+    import time
+    from bank.pack import PACK_FILE, PackReader, collect, source_stamps, write_pack
+    from bank.source import list_batches
+
+    path = args.out or PACK_FILE
+    batches = args.batches or list_batches()
+    sources = source_stamps(batches)  # before reading: an edit made meanwhile shows as stale
+    errors: list[str] = []
+    fps: dict[str, str] = {}
+    questions = collect(batches, errors=errors, fps=fps)
+    for err in errors:
+        print(f"[Bank] SKIPPED {err}")
+    stats = write_pack(questions, path, codec=args.codec, sources=sources, fps=fps)
+    print(f"[Bank] Packed {stats['count']} questions with {stats['codec']} -> {path}")
+    print(f"       {stats['raw_bytes']:,} bytes raw -> {stats['pack_bytes']:,} bytes "
+          f"({stats['pack_bytes'] / max(stats['raw_bytes'], 1):.0%}, "
+          f"dictionary {stats['dict_bytes']:,} bytes)")
+    if args.no_bench:
+        return
+
+    reader = PackReader(path)
+    start = time.perf_counter()
+    for qid in reader.ids:
+        reader.get(qid)
+    per_get = (time.perf_counter() - start) / max(len(reader), 1)
+    reader.close()
+    print(f"       random access: {per_get * 1e6:.1f} us per question")
+
+
+def cmd_get(args: argparse.Namespace) -> None:
+    from bank.pack import PACK_FILE, PackReader
+
+    path = args.pack or PACK_FILE
+    if not path.exists():
+        raise ValueError(f"{path} not found (run: python -m bank pack)")
+    reader = PackReader(path)
+    try:
+        print(reader.get(args.id))
+    except KeyError as exc:
+        raise ValueError(exc.args[0]) from None
+    finally:
+        reader.close()
+
+
+def cmd_tokens(args: argparse.Namespace) -> None:
+    from bank.pack import collect
+    from bank.source import list_batches, parse_question_id
+    from bank.tokens import TOKEN_CACHE_FILE, token_counts
+
+    for batch in args.batches or list_batches():
+        errors: list[str] = []
+        questions = collect([batch], errors=errors)
+        for err in errors:
+            print(f"[Bank] SKIPPED {err}")
+        if not questions:
+            continue
+        counts = token_counts(questions.values())
+        by_theme: dict[str, list[int]] = {}
+        for qid, n in zip(questions, counts):
+            by_theme.setdefault(parse_question_id(qid)[1], []).append(n)
+        ranked = sorted(counts)
+        print(f"[Bank] {batch}: {len(counts)} questions, ~{sum(counts):,} tokens "
+              f"(median {ranked[len(ranked) // 2]}, p90 {ranked[len(ranked) * 9 // 10]}, "
+              f"max {ranked[-1]})")
+        for theme, ns in sorted(by_theme.items()):
+            print(f"       {theme:20s} {len(ns):4d}  mean {sum(ns) / len(ns):6.0f}  max {max(ns):5d}")
+    print(f"[Bank] Counts cached by fingerprint in {TOKEN_CACHE_FILE}")
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    import time
+    from bank.source import list_batches
+    from bank.stats import STATS_FILE, corpus_stats, load_rows, render_html, render_markdown
+
+    start = time.perf_counter()
+    errors: list[str] = []
+    rows = load_rows(args.batches or list_batches(), errors)
+    for err in errors:
+        print(f"[Bank] SKIPPED {err}")
+    if not rows:
+        raise ValueError("No questions to report on")
+    report = corpus_stats(rows, threshold=args.threshold, use_numpy=not args.no_numpy, skipped=errors)
+    path = args.out or STATS_FILE
+    render = render_markdown if path.suffix.lower() == ".md" else render_html
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render(report), encoding="utf-8")
+    elapsed = time.perf_counter() - start
+
+    for batch, g in report["by_batch"].items():
+        print(f"[Bank] {batch:8s} {g['n']:5d} questions  median {g['chars_median']:5,} chars  "
+              f"{g['blocks_mean']:.1f} blocks/q  near-dup {g['with_dups'] / g['n']:4.0%}")
+    print(f"[Bank] {len(report['outliers'])} outlier(s), "
+          f"{len(report['duplicated'])} most near-duplicated question(s) listed")
+    print(f"[Bank] Stats over {report['questions']} questions: {report['seconds'] * 1000:.0f} ms "
+          f"({report['engine']}), {elapsed * 1000:.0f} ms total -> {path}")
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    from bank.export import SITE_DIR, export_site
+    from bank.source import list_batches
+
+    site = args.out or SITE_DIR
+    errors: list[str] = []
+    summary = export_site(args.batches or list_batches(), site=site, rebuild=args.rebuild, errors=errors)
+    for err in errors:
+        print(f"[Bank] SKIPPED {err}")
+    if not summary["questions"]:
+        raise ValueError("No questions to export")
+    print(f"[Bank] {summary['questions']} questions ({summary['docs']} distinct): "
+          f"{summary['rendered']} rendered, {summary['removed']} removed, "
+          f"{summary['shards']} index shard(s) and {summary['pages']} page(s) rewritten")
+    print(f"[Bank] Exported in {summary['seconds'] * 1000:.0f} ms -> {site}/index.html "
+          f"(serve with: python -m http.server -d {site})")
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    from bank.pack import PACK_FILE, ensure_pack
+    from bank.serve import BankServer
+
+    path = args.pack or PACK_FILE
+    if args.pack is None and ensure_pack(path):
+        print(f"[Bank] Rebuilt {path}")
+    server = BankServer((args.host, args.port), path, verbose=args.verbose)
+    bank = server.bank()
+    host, port = server.server_address[:2]
+    print(f"[Bank] Serving {len(bank.records)} questions (bank {bank.digest[:12]}) "
+          f"on http://{host}:{port}/ (Ctrl+C to stop)")
+    bank.release()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[Bank] Stopped.")
+    finally:
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m bank",
+        description="Question bank maintenance",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("index", help="Add archived batches missing from the archive index")
+    p.add_argument(
+        "--rebuild", action="store_true",
+        help="Discard the index and re-index every archived batch"
+    )
+    p.set_defaults(func=cmd_index)
+
+    p = sub.add_parser("rotate", help="Archive the live batch and start the next one")
+    p.add_argument(
+        "--from", dest="stage_dir", type=Path, default=None,
+        help="Directory with the next batch's q_*.py files (default: empty stubs)"
+    )
+    p.add_argument(
+        "--dry-run", action="store_true",
+        help="Report what would happen without moving any files"
+    )
+    p.add_argument(
+        "--db", nargs="?", const="", default=None, metavar="PATH",
+        help="Also migrate the state kept in this store (default when given without "
+             "PATH, and whenever it exists: .bank/bank.sqlite3)"
+    )
+    p.add_argument(
+        "--seed", type=int, default=None,
+        help="Seed the shuffle of the new available pool"
+    )
+    p.set_defaults(func=cmd_rotate)
+
+    p = sub.add_parser("diff", help="Compare two batches (e.g. batch5 batch6, batch6 live)")
+    p.add_argument("a", help="Older batch name")
+    p.add_argument("b", help="Newer batch name")
+    p.add_argument(
+        "--threshold", type=float, default=0.5,
+        help="MinHash similarity above which a changed question counts as rewritten (default: 0.5)"
+    )
+    p.add_argument(
+        "--limit", type=int, default=20,
+        help="Max lines per section, 0 for all (default: 20)"
+    )
+    p.add_argument("--json", action="store_true", help="Print the full diff as JSON")
+    p.set_defaults(func=cmd_diff)
+
+    db_help = "SQLite store path (default: .bank/bank.sqlite3)"
+
+    p = sub.add_parser("store", help="(Re)build the SQLite store from the q_*.py batches")
+    p.add_argument("batches", nargs="*", help="Batches to (re)load (default: all)")
+    p.add_argument("--db", type=Path, default=None, help=db_help)
+    p.set_defaults(func=cmd_store)
+
+    p = sub.add_parser("search", help="Full-text search over the stored bank (FTS5 syntax)")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=20, help="Max results (default: 20)")
+    p.add_argument("--db", type=Path, default=None, help=db_help)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("history", help="Count asked questions from the store's history")
+    p.add_argument("--by", choices=["theme", "day", "month", "session"], default="theme")
+    p.add_argument("--since", default=None, help="ISO date, inclusive (e.g. 2026-09-01)")
+    p.add_argument("--until", default=None, help="ISO date, exclusive")
+    p.add_argument("--db", type=Path, default=None, help=db_help)
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("report", help="Asked-history report from the precomputed rollups")
+    p.add_argument("--days", type=int, default=14, help="Active days to list (default: 14)")
+    p.add_argument("--db", nargs="?", const="", default=None, metavar="PATH",
+                   help="Read the SQLite store's rollups instead of session_rollups.json")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("lint", help="Check fences, brackets, headers and lengths")
+    p.add_argument("batches", nargs="*", help="Batches to lint (default: all)")
+    p.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    p.add_argument("--warnings", "-w", action="store_true", help="Also list warnings")
+    p.set_defaults(func=cmd_lint)
+
+    p = sub.add_parser("compile", help="Compile one-question markdown files (incremental)")
+    p.add_argument("batches", nargs="*", help="Batches to compile (default: all)")
+    p.add_argument("--rebuild", action="store_true", help="Discard the compile cache first")
+    p.set_defaults(func=cmd_compile)
+
+    p = sub.add_parser("code", help="Query the store's code block index")
+    p.add_argument("--ident", default=None, help="Blocks using this identifier")
+    p.add_argument("--lang", default=None, help="Fence language (ts, tsx, css, plain, ...)")
+    p.add_argument("--min-lines", type=int, default=None)
+    p.add_argument("--max-lines", type=int, default=None)
+    p.add_argument("--batch", default=None, help="Restrict to one batch")
+    p.add_argument("--dupes", action="store_true", help="List code blocks shared by several questions")
+    p.add_argument("--limit", type=int, default=50, help="Max rows (default: 50)")
+    p.add_argument("--db", type=Path, default=None, help=db_help)
+    p.set_defaults(func=cmd_code)
+
+    p = sub.add_parser("pack", help="Write the dictionary-compressed bank file")
+    p.add_argument("batches", nargs="*", help="Batches to include (default: all)")
+    p.add_argument("--codec", choices=["zstd", "zlib"], default=None,
+                   help="Default: zstd if the zstandard package is installed, else zlib")
+    p.add_argument("--out", type=Path, default=None, help="Output path (default: .bank/bank.pack)")
+    p.add_argument("--no-bench", action="store_true", help="Skip the random-access timing")
+    p.set_defaults(func=cmd_pack)
+
+    p = sub.add_parser("get", help="Print one question from the pack by id")
+    p.add_argument("id", help="Question id, e.g. batch6/testing#12")
+    p.add_argument("--pack", type=Path, default=None, help="Pack path (default: .bank/bank.pack)")
+    p.set_defaults(func=cmd_get)
+
+    p = sub.add_parser("tokens", help="Approximate token counts (heuristic, cached by fingerprint)")
+    p.add_argument("batches", nargs="*", help="Batches to count (default: all)")
+    p.set_defaults(func=cmd_tokens)
+
+    p = sub.add_parser("stats", help="Corpus statistics report (HTML or Markdown)")
+    p.add_argument("batches", nargs="*", help="Batches to include (default: all)")
+    p.add_argument("--out", type=Path, default=None,
+                   help="Report path; .md writes Markdown, anything else HTML (default: .bank/stats.html)")
+    p.add_argument("--threshold", type=float, default=0.5,
+                   help="MinHash similarity counted as a near duplicate (default: 0.5)")
+    p.add_argument("--no-numpy", action="store_true", help="Use the pure-Python engine even if NumPy is installed")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("export", help="Static HTML site with a prebuilt search index (incremental)")
+    p.add_argument("batches", nargs="*", help="Batches to include (default: all)")
+    p.add_argument("--out", type=Path, default=None, help="Site directory (default: .bank/site)")
+    p.add_argument("--rebuild", action="store_true", help="Discard the previous build and render everything")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("serve", help="Read-only HTTP/JSON service over the pack (ETags, keep-alive)")
+    p.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Port (default: 8765; 0 picks a free one)")
+    p.add_argument("--pack", type=Path, default=None,
+                   help="Pack to serve as is (default: .bank/bank.pack, rebuilt first if stale)")
+    p.add_argument("--verbose", action="store_true", help="Log every request")
+    p.set_defaults(func=cmd_serve)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    try:
+        return args.func(args) or 0
+    except (ValueError, sqlite3.Error) as exc:
+        print(f"[Bank] ERROR: {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+bank/client.py — Client for the local bank service (`python -m bank serve`).
+
+Imports nothing but socket, json and urllib.parse, so a consumer pays for
+neither the bank nor http.client (which pulls in the email package):
+
+    from bank.client import BankClient
+
+    bank = BankClient()                       # http://127.0.0.1:8765
+    q = bank.question("batch6/testing#12")["text"]
+    hits = bank.search("useSyncExternalStore", batch="batch6,live")
+    picks = bank.sample(3, theme="testing", max_tokens=400)
+
+It speaks just enough HTTP/1.1 for that server, which always sends a
+Content-Length. One connection is kept alive across calls. Every response
+that carries an ETag is cached, and repeating the request only costs a 304
+while the bank is unchanged.
+"""
+
+import json
+import socket
+from typing import Dict
+from urllib.parse import quote, urlencode, urlsplit
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+
+class BankClient:
+    """
+    Keep-alive client for a running `python -m bank serve`; not thread-safe
+    (use one per thread).
+
+    Responses are cached by request with their ETag; repeating a request
+    sends If-None-Match and reuses the cached (shared, don't mutate) result
+    on a 304.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 10.0) -> None:
+        parts = urlsplit(url)
+        self._address = (parts.hostname or "127.0.0.1", parts.port or 80)
+        self._timeout = timeout
+        self._sock: socket.socket | None = None
+        self._file = None
+        self._cache: Dict[str, tuple[str, object]] = {}
+        self.not_modified = 0
+
+    def _exchange(self, target: str, etag: str | None) -> tuple[int, Dict[str, str], bytes]:
+        if self._sock is None:
+            self._sock = socket.create_connection(self._address, timeout=self._timeout)
+            self._file = self._sock.makefile("rb")
+        head = f"GET {target} HTTP/1.1\r\nHost: {self._address[0]}:{self._address[1]}\r\n"
+        if etag:
+            head += f"If-None-Match: {etag}\r\n"
+        self._sock.sendall((head + "\r\n").encode("latin-1"))
+        status_line = self._file.readline()
+        if not status_line:
+            raise ConnectionError("the server closed the connection")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = self._file.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = self._file.read(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, headers, body
+
+    def get(self, path: str, **params) -> dict:
+        """
+        GET `path` with query `params` (lists repeat the key) and return the
+        decoded JSON. Raises KeyError on 404 and ValueError on any other error.
+        """
+        query = urlencode({k: v for k, v in params.items() if v is not None}, doseq=True)
+        target = path + ("?" + query if query else "")
+        cached = self._cache.get(target)
+        for attempt in (1, 2):
+            try:
+                status, headers, body = self._exchange(target, cached[0] if cached else None)
+                break
+            except (ConnectionError, socket.timeout):
+                self.close()  # e.g. the server dropped an idle connection
+                if attempt == 2:
+                    raise
+        if status == 304 and cached:
+            self.not_modified += 1
+            return cached[1]
+        data = json.loads(body) if body else {}
+        if status == 404:
+            raise KeyError(data.get("error", target))
+        if status != 200:
+            raise ValueError(data.get("error", f"HTTP {status} for {target}"))
+        if "etag" in headers:
+            self._cache[target] = (headers["etag"], data)
+        return data
+
+    def question(self, qid: str) -> dict:
+        return self.get("/questions/" + quote(qid, safe="/"))
+
+    def search(self, query: str, **filters) -> list[dict]:
+        return self.get("/search", q=query, **filters)["questions"]
+
+    def sample(self, n: int = 1, **filters) -> list[dict]:
+        return self.get("/random", n=n, **filters)["questions"]
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
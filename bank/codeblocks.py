@@ -0,0 +1,108 @@
+"""
+bank/codeblocks.py — Pull fenced code blocks out of question markdown.
+
+Used by the store build to index every block separately from the prose:
+language, line count, the identifiers it uses, and a fingerprint of the code
+alone, so dedup can compare code and prose independently.
+"""
+
+import hashlib
+import re
+from typing import Tuple
+
+_FENCE_RE = re.compile(r"^[ \t]*```[ \t]*([\w+#.-]*)[ \t]*$")
+_IDENT_RE = re.compile(r"[A-Za-z_$][\w$]*")
+_SPACE_RE = re.compile(r"\s+")
+
+# Fence tags that name the same language
+LANG_ALIASES = {
+    "typescript": "ts",
+    "javascript": "js",
+    "jsx":        "js",
+    "shell":      "bash",
+    "sh":         "bash",
+    "yml":        "yaml",
+}
+UNTAGGED = "plain"
+
+# Language keywords and literals not worth indexing as identifiers
+_KEYWORDS = frozenset("""
+    abstract any as async await boolean break case catch class const constructor
+    continue debugger declare default delete do else enum export extends false
+    finally for from function get if implements import in infer instanceof
+    interface is keyof let module namespace never new null number object of
+    private protected public readonly return satisfies set static string super
+    switch symbol this throw true try type typeof undefined unique unknown var
+    void while with yield
+""".split())
+
+
+def normalize_lang(tag: str) -> str:
+    tag = tag.strip().lower()
+    if not tag:
+        return UNTAGGED
+    return LANG_ALIASES.get(tag, tag)
+
+
+def extract_blocks(text: str) -> list[Tuple[str, str]]:
+    """
+    Return (language, code) for every closed fence, in order.
+
+    An unclosed fence at the end of a question is ignored (the lint stage
+    reports it).
+    """
+    blocks = []
+    lang = None
+    body: list[str] = []
+    for line in text.splitlines():
+        m = _FENCE_RE.match(line)
+        if lang is None:
+            if m is not None:
+                lang = normalize_lang(m.group(1))
+                body = []
+        elif m is not None and not m.group(1):
+            blocks.append((lang, "\n".join(body)))
+            lang = None
+        else:
+            body.append(line)
+    return blocks
+
+
+def strip_blocks(text: str) -> str:
+    """Return the prose of a question with every closed code block removed."""
+    out: list[str] = []
+    held: list[str] = []
+    in_block = False
+    for line in text.splitlines():
+        m = _FENCE_RE.match(line)
+        if not in_block:
+            if m is not None:
+                in_block = True
+                held = [line]
+            else:
+                out.append(line)
+        elif m is not None and not m.group(1):
+            in_block = False
+        else:
+            held.append(line)
+    if in_block:
+        out.extend(held)  # unclosed fence: keep it as prose
+    return "\n".join(out)
+
+
+def identifiers(code: str) -> set[str]:
+    """Identifiers used in a block (keywords and one-letter names dropped)."""
+    return {
+        name for name in _IDENT_RE.findall(code)
+        if len(name) > 1 and name not in _KEYWORDS
+    }
+
+
+def code_fingerprint(code: str) -> str:
+    """Whitespace-insensitive fingerprint of a block's code."""
+    cleaned = _SPACE_RE.sub(" ", code).strip()
+    return hashlib.sha1(cleaned.encode("utf-8")).hexdigest()[:16]
+
+
+def line_count(code: str) -> int:
+    return code.count("\n") + 1 if code else 0
@@ -0,0 +1,88 @@
+"""
+bank/diff.py — Compare two batches through their index records.
+
+Only index records are read (fingerprints + MinHash signatures), never the
+question text, so a diff costs the same however large the batches are:
+
+    moved      same fingerprint, different theme
+    rewritten  fingerprint changed but MinHash similarity >= threshold
+    removed    only in A
+    added      only in B
+
+Rewrite candidates come from LSH banding over the signatures, so only pairs
+sharing at least one band are ever compared.
+"""
+
+from typing import Dict, Tuple
+
+from bank.fingerprint import MINHASH_BINS, minhash_from_hex, similarity
+from bank.source import question_id
+
+LSH_BANDS = 16
+_ROWS = MINHASH_BINS // LSH_BANDS
+
+DEFAULT_THRESHOLD = 0.5
+
+
+def _bands(sig: list[int]) -> list[Tuple[int, ...]]:
+    return [(i, *sig[i * _ROWS:(i + 1) * _ROWS]) for i in range(LSH_BANDS)]
+
+
+def label(entry: dict) -> str:
+    return question_id(entry["batch"], entry["theme"], entry["index"])
+
+
+def diff_entries(a: list[dict], b: list[dict], threshold: float = DEFAULT_THRESHOLD) -> Dict[str, list]:
+    """
+    Diff two batches' index records.
+
+    Returns a dict with "unchanged" (int) and lists "moved" [(a, b)],
+    "rewritten" [(a, b, similarity)], "removed" [a] and "added" [b].
+    """
+    by_fp_a = {e["fp"]: e for e in a}
+    by_fp_b = {e["fp"]: e for e in b}
+    common = by_fp_a.keys() & by_fp_b.keys()
+
+    moved = [
+        (by_fp_a[fp], by_fp_b[fp])
+        for fp in common
+        if by_fp_a[fp]["theme"] != by_fp_b[fp]["theme"]
+    ]
+    only_a = [e for e in a if e["fp"] not in common]
+    only_b = [e for e in b if e["fp"] not in common]
+
+    # LSH: bucket A's leftovers by band, probe with B's leftovers
+    sigs_a = [minhash_from_hex(e["mh"]) for e in only_a]
+    buckets: Dict[Tuple[int, ...], list[int]] = {}
+    for i, sig in enumerate(sigs_a):
+        for band in _bands(sig):
+            buckets.setdefault(band, []).append(i)
+
+    scored = []
+    for j, e in enumerate(only_b):
+        sig = minhash_from_hex(e["mh"])
+        candidates = {i for band in _bands(sig) for i in buckets.get(band, ())}
+        for i in candidates:
+            sim = similarity(sigs_a[i], sig)
+            if sim >= threshold:
+                scored.append((sim, i, j))
+
+    # Greedy one-to-one matching, most similar pairs first
+    scored.sort(key=lambda t: -t[0])
+    matched_a: set[int] = set()
+    matched_b: set[int] = set()
+    rewritten = []
+    for sim, i, j in scored:
+        if i in matched_a or j in matched_b:
+            continue
+        matched_a.add(i)
+        matched_b.add(j)
+        rewritten.append((only_a[i], only_b[j], sim))
+
+    return {
+        "unchanged": len(common) - len(moved),
+        "moved": moved,
+        "rewritten": rewritten,
+        "removed": [e for i, e in enumerate(only_a) if i not in matched_a],
+        "added": [e for j, e in enumerate(only_b) if j not in matched_b],
+    }
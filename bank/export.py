@@ -0,0 +1,576 @@
+"""
+bank/export.py — Static, searchable HTML export of the whole bank.
+
+`python -m bank export` writes a self-contained site (default .bank/site/)
+that any static file server can host:
+
+    index.html                 batches and themes, with the search box
+    t/<batch>/<theme>.html     every question of one theme, in order
+    q/<hash>.html              one question, named by its content hash
+    search/<xx>.json           inverted index shard: term → [doc numbers]
+                               for the terms starting with "xx"
+    search/docs/<k>.json       doc number → [title, content hash, ids] for
+                               docs k*DOC_SHARD_SIZE ... (k+1)*DOC_SHARD_SIZE-1
+    search.js, style.css       the search client and the stylesheet
+    manifest.json              what the build knows about the files above
+
+Code blocks are highlighted at build time (a small tokenizer, no JavaScript
+library), so pages are plain HTML. A search only fetches the index shards of
+its terms' first two characters and the doc shards of the results it shows;
+a term matches every indexed term it is a prefix of. A doc is one distinct
+question text: exact duplicates across batches share it and list every id.
+
+Builds are incremental by content hash: the "hash" of the exact text that
+the bank index records next to each question, not the dedup fingerprint,
+which ignores the whitespace, case and fence tags a page shows. The
+manifest maps each content hash to its doc number, ids and index shard
+keys, so a rebuild only renders questions whose hash is new, deletes the
+pages of hashes that are gone, and rewrites just the index shards, doc
+shards and theme pages those touch. Only batches holding a new hash are
+read as text — after a small edit that is one batch, and the build takes
+milliseconds.
+Serve the directory over HTTP (`python -m http.server -d .bank/site`):
+browsers don't let pages fetch the shards from file:// URLs.
+"""
+
+import hashlib
+import html
+import json
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+from bank.codeblocks import normalize_lang, strip_blocks
+from bank.source import CACHE_DIR, LIVE_BATCH, parse_question_id, question_id
+
+SITE_DIR = CACHE_DIR / "site"
+MANIFEST_NAME = "manifest.json"
+
+# Bump when page markup or the index layout changes: forces a full rebuild
+EXPORT_VERSION = 2
+
+# Index shards are keyed by the first SHARD_PREFIX characters of a term
+SHARD_PREFIX = 2
+DOC_SHARD_SIZE = 256
+MAX_TERM_LEN = 40
+TITLE_CHARS = 140
+
+_TERM_RE = re.compile(r"[a-z0-9_$]{2,}")
+_SHARD_KEY_RE = re.compile(r"[^a-z0-9]")
+_FENCE_RE = re.compile(r"^[ \t]*```[ \t]*([\w+#.-]*)[ \t]*$")
+_LIST_RE = re.compile(r"^\s*(?:[-*+]|(\d+)[.)])\s+(.*)$")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+_HEADER_RE = re.compile(r"^\*\*([^*]+?):?\*\*\s*")
+
+# Words too common to be worth an index entry
+_STOPWORDS = frozenset("""
+    an and are as at be by can do does for from has have how if in into is it
+    its of on or that the their then there these this to was what when where
+    which while why will with you your
+""".split())
+
+
+# ─── Syntax highlighting ──────────────────────────────────────────────────────
+
+_HASH_COMMENT_LANGS = frozenset({"bash", "yaml", "python", "py", "toml", "dockerfile", "ini"})
+_MARKUP_LANGS = frozenset({"html", "xml", "svg", "vue"})
+_PLAIN_LANGS = frozenset({"plain", "text", "txt", "diff", "md", "markdown"})
+_DIFF_CLASSES = {"+": "add", "-": "del", "@": "cm"}
+
+_CODE_TOKEN_RE = re.compile(r"""
+      (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z)|<!--.*?(?:-->|\Z))
+    | (?P<string>"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?|`(?:\\.|[^`\\])*`?)
+    | (?P<number>\b\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?(?:[a-z]{1,4}|%)?(?![\w$])|\#[0-9a-fA-F]{3,8}\b)
+    | (?P<word>@?[A-Za-z_$][\w$-]*)
+""", re.S | re.X)
+_HASH_TOKEN_RE = re.compile(r"""
+      (?P<comment>\#[^\n]*)
+    | (?P<string>"(?:\\.|[^"\\\n])*"?|'[^'\n]*'?)
+    | (?P<number>\b\d+(?:\.\d+)?\b)
+    | (?P<word>[A-Za-z_$][\w$-]*)
+""", re.X)
+
+_CODE_KEYWORDS = frozenset("""
+    abstract as async await break case catch class const continue debugger
+    declare default delete do else enum export extends false finally for from
+    function get if implements import in infer instanceof interface is keyof
+    let namespace new null of private protected public readonly return
+    satisfies set static super switch this throw true try type typeof
+    undefined var void while yield
+    @media @import @layer @supports @keyframes @container @font-face @property
+    def elif except lambda None pass raise True False with
+    fi then esac done echo local
+""".split())
+
+
+def highlight(code: str, lang: str) -> str:
+    """
+    HTML for one code block: comments, strings, numbers, keywords and
+    capitalized names (types, components) wrapped in classed spans.
+    """
+    if lang in _PLAIN_LANGS:
+        if lang != "diff":
+            return html.escape(code)
+        return "\n".join(
+            f'<span class="{_DIFF_CLASSES[line[0]]}">{html.escape(line)}</span>'
+            if line[:1] in _DIFF_CLASSES else html.escape(line)
+            for line in code.split("\n")
+        )
+    pattern = _HASH_TOKEN_RE if lang in _HASH_COMMENT_LANGS else _CODE_TOKEN_RE
+    out: list[str] = []
+    pos = 0
+    for m in pattern.finditer(code):
+        kind = m.lastgroup
+        text = m.group()
+        out.append(html.escape(code[pos:m.start()]))
+        pos = m.end()
+        if kind == "word":
+            if text in _CODE_KEYWORDS:
+                kind = "kw"
+            elif text[0].isupper() and lang not in _MARKUP_LANGS:
+                kind = "ty"
+            else:
+                out.append(html.escape(text))
+                continue
+        else:
+            kind = {"comment": "cm", "string": "st", "number": "nu"}[kind]
+        out.append(f'<span class="{kind}">{html.escape(text)}</span>')
+    out.append(html.escape(code[pos:]))
+    return "".join(out)
+
+
+# ─── Question markup ──────────────────────────────────────────────────────────
+
+_INLINE_CODE_RE = re.compile(r"(`[^`\n]+`)")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"(?<![\w*])\*([^*\s][^*]*?)\*(?![\w*])")
+
+
+def _inline(text: str) -> str:
+    out = []
+    for part in _INLINE_CODE_RE.split(text):
+        if part.startswith("`") and part.endswith("`") and len(part) > 1:
+            out.append(f"<code>{html.escape(part[1:-1])}</code>")
+        else:
+            part = _BOLD_RE.sub(r"<strong>\1</strong>", html.escape(part, quote=False))
+            out.append(_ITALIC_RE.sub(r"<em>\1</em>", part))
+    return "".join(out)
+
+
+def _prose(lines: list[str]) -> str:
+    """One blank-line separated paragraph: headings, lists and text runs."""
+    out: list[str] = []
+    run: list[str] = []
+    items: list[str] = []
+    ordered = False
+
+    def flush() -> None:
+        nonlocal run, items
+        if run:
+            out.append("<p>" + "<br>\n".join(_inline(line) for line in run) + "</p>")
+            run = []
+        if items:
+            tag = "ol" if ordered else "ul"
+            out.append(f"<{tag}>" + "".join(f"<li>{_inline(i)}</li>" for i in items) + f"</{tag}>")
+            items = []
+
+    for line in lines:
+        heading = _HEADING_RE.match(line)
+        item = _LIST_RE.match(line)
+        if heading:
+            flush()
+            level = min(len(heading.group(1)) + 2, 6)
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif item:
+            if run or (items and ordered != bool(item.group(1))):
+                flush()
+            ordered = bool(item.group(1))
+            items.append(item.group(2))
+        elif items and line.startswith((" ", "\t")):
+            items[-1] += " " + line.strip()
+        else:
+            if items:
+                flush()
+            run.append(line)
+    flush()
+    return "\n".join(out)
+
+
+def render_question(text: str) -> str:
+    """The body HTML of one question: prose paragraphs and highlighted code."""
+    out: list[str] = []
+    para: list[str] = []
+    lines = text.split("\n")
+    i = 0
+    while i < len(lines):
+        m = _FENCE_RE.match(lines[i])
+        if m is None:
+            if lines[i].strip():
+                para.append(lines[i])
+            elif para:
+                out.append(_prose(para))
+                para = []
+            i += 1
+            continue
+        if para:
+            out.append(_prose(para))
+            para = []
+        lang = normalize_lang(m.group(1))
+        body: list[str] = []
+        i += 1
+        while i < len(lines):
+            close = _FENCE_RE.match(lines[i])
+            if close is not None and not close.group(1):
+                break
+            body.append(lines[i])
+            i += 1
+        i += 1
+        out.append(f'<pre class="code" data-lang="{html.escape(lang)}"><code>'
+                   f"{highlight(chr(10).join(body), lang)}</code></pre>")
+    if para:
+        out.append(_prose(para))
+    return "\n".join(out)
+
+
+def title(text: str) -> str:
+    """A one-line summary: the question's first prose after its bold header."""
+    prose = _HEADER_RE.sub("", strip_blocks(text).strip(), count=1)
+    line = " ".join(prose.split())
+    line = line.replace("**", "").replace("`", "")
+    return line if len(line) <= TITLE_CHARS else line[:TITLE_CHARS - 1].rstrip() + "…"
+
+
+# ─── Search terms ─────────────────────────────────────────────────────────────
+
+def terms(text: str) -> set[str]:
+    """Indexed terms of a question: lowercase words and identifiers, 2+ chars."""
+    return {
+        t for t in _TERM_RE.findall(text.lower())
+        if t not in _STOPWORDS and len(t) <= MAX_TERM_LEN
+    }
+
+
+def shard_key(term: str) -> str:
+    """Index shard holding `term` (mirrored by shardKey() in search.js)."""
+    return _SHARD_KEY_RE.sub("_", term[:SHARD_PREFIX])
+
+
+# ─── Pages ────────────────────────────────────────────────────────────────────
+
+_PAGE = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<link rel="stylesheet" href="{root}style.css">
+</head>
+<body>
+<header><a href="{root}index.html">Question bank</a>{crumbs}</header>
+<main>
+{body}
+</main>
+{scripts}</body>
+</html>
+"""
+
+STYLE = """\
+body { font: 15px/1.55 system-ui, sans-serif; color: #1f2328; margin: 0; background: #fafbfc; }
+header { padding: .7em 1.5em; background: #24292f; color: #d0d7de; }
+header a { color: #fff; text-decoration: none; font-weight: 600; }
+main { max-width: 980px; margin: 0 auto; padding: 1em 1.5em 4em; }
+article { background: #fff; border: 1px solid #d0d7de; border-radius: 6px; padding: .2em 1.2em; margin: 1.2em 0; }
+article > .id { font: 12px ui-monospace, monospace; color: #57606a; margin: .8em 0 0; }
+article > .id a { color: inherit; }
+code { font: 13px/1.45 ui-monospace, SFMono-Regular, Menlo, monospace; background: #eff1f3; padding: 0 .25em; border-radius: 3px; }
+pre.code { background: #f6f8fa; border: 1px solid #d8dee4; border-radius: 6px; padding: .8em 1em; overflow-x: auto; position: relative; }
+pre.code code { background: none; padding: 0; }
+pre.code::after { content: attr(data-lang); position: absolute; top: .3em; right: .6em; font: 11px sans-serif; color: #8c959f; }
+.kw { color: #cf222e; } .st { color: #0a3069; } .nu { color: #0550ae; }
+.cm { color: #6e7781; font-style: italic; } .ty { color: #8250df; }
+.add { color: #116329; background: #dafbe1; } .del { color: #82071e; background: #ffebe9; }
+table { border-collapse: collapse; } td, th { padding: .2em .8em; text-align: left; }
+td.n { text-align: right; color: #57606a; }
+#q { width: 100%; font-size: 16px; padding: .5em .7em; box-sizing: border-box; border: 1px solid #afb8c1; border-radius: 6px; }
+#results li { margin: .5em 0; } #results .ids { font: 12px ui-monospace, monospace; color: #57606a; }
+#status { color: #57606a; font-size: 13px; }
+"""
+
+SEARCH_JS = """\
+// Client for the prebuilt index: fetches only the shards a query needs.
+(() => {
+  const PREFIX = %(prefix)d, DOC_SHARD = %(doc_shard)d, SHOWN = 50;
+  const STOP = new Set(%(stopwords)s);
+  const cache = new Map();
+  const load = (path) => {
+    if (!cache.has(path)) cache.set(path, fetch(path).then((r) => (r.ok ? r.json() : {})).catch(() => ({})));
+    return cache.get(path);
+  };
+  const shardKey = (t) => t.slice(0, PREFIX).replace(/[^a-z0-9]/g, "_");
+  const words = (q) => (q.toLowerCase().match(/[a-z0-9_$]{2,}/g) || []).filter((t) => !STOP.has(t));
+  const esc = (s) => s.replace(/[&<>"]/g, (c) => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})[c]);
+
+  async function matches(term) {
+    const shard = await load(`search/${shardKey(term)}.json`);
+    const docs = new Set();
+    for (const [t, postings] of Object.entries(shard)) if (t.startsWith(term)) postings.forEach((n) => docs.add(n));
+    return docs;
+  }
+
+  async function search(q) {
+    const ts = words(q);
+    if (!ts.length) return null;
+    let hits = null;
+    for (const set of await Promise.all(ts.map(matches))) {
+      hits = hits === null ? set : new Set([...hits].filter((n) => set.has(n)));
+    }
+    const found = [...hits].sort((a, b) => a - b);
+    const docs = await Promise.all(found.slice(0, SHOWN).map(async (n) =>
+      (await load(`search/docs/${Math.floor(n / DOC_SHARD)}.json`))[n]));
+    return {total: found.length, docs: docs.filter(Boolean)};
+  }
+
+  function link(id) {
+    const m = /^(.+)\\/(.+)#(\\d+)$/.exec(id);
+    return m ? `<a href="t/${m[1]}/${m[2]}.html#q${m[3]}">${esc(id)}</a>` : esc(id);
+  }
+
+  const input = document.getElementById("q"), list = document.getElementById("results"),
+        status = document.getElementById("status");
+  let seq = 0;
+  async function run() {
+    const mine = ++seq, q = input.value;
+    history.replaceState(null, "", q ? `#${encodeURIComponent(q)}` : location.pathname);
+    const res = await search(q);
+    if (mine !== seq) return;
+    if (!res) { list.innerHTML = ""; status.textContent = ""; return; }
+    status.textContent = `${res.total} question(s)` + (res.total > SHOWN ? `, first ${SHOWN} shown` : "");
+    list.innerHTML = res.docs.map(([title, key, ids]) =>
+      `<li><a href="q/${key}.html">${esc(title)}</a><br><span class="ids">${ids.map(link).join(" · ")}</span></li>`
+    ).join("");
+  }
+  input.addEventListener("input", run);
+  if (location.hash.length > 1) { input.value = decodeURIComponent(location.hash.slice(1)); run(); }
+})();
+"""
+
+
+def _page(title_text: str, body: str, root: str, crumbs: str = "", scripts: str = "") -> str:
+    return _PAGE.format(title=html.escape(title_text), body=body, root=root,
+                        crumbs=crumbs, scripts=scripts)
+
+
+def _question_page(key: str, text: str) -> str:
+    article = f'<article>\n{render_question(text)}\n</article>'
+    return _page(title(text) or key, article, root="../")
+
+
+def _article(site: Path, key: str) -> str:
+    """The <article> of a rendered question page."""
+    page = (site / "q" / f"{key}.html").read_text(encoding="utf-8")
+    start = page.index("<article>") + len("<article>")
+    return page[start:page.rindex("</article>")]
+
+
+def _theme_page(site: Path, batch: str, theme: str, questions: list[Tuple[int, str]]) -> str:
+    parts = []
+    for index, key in questions:
+        qid = question_id(batch, theme, index)
+        parts.append(f'<article id="q{index}">\n<p class="id"><a href="#q{index}">{html.escape(qid)}</a>'
+                     f' · <a href="../../q/{key}.html">{key}</a></p>{_article(site, key)}</article>')
+    crumbs = f" / {html.escape(batch)} / {html.escape(theme)}"
+    heading = f"<h1>{html.escape(batch)} · {html.escape(theme)}</h1>"
+    return _page(f"{batch} / {theme}", heading + "\n" + "\n".join(parts), root="../../", crumbs=crumbs)
+
+
+def _index_page(groups: Dict[str, list], docs: int) -> str:
+    rows: Dict[str, list[str]] = {}
+    for key, questions in groups.items():
+        batch, theme = key.split("/", 1)
+        rows.setdefault(batch, []).append(
+            f'<tr><td><a href="t/{html.escape(batch)}/{html.escape(theme)}.html">{html.escape(theme)}</a></td>'
+            f'<td class="n">{len(questions)}</td></tr>'
+        )
+    tables = "\n".join(
+        f"<h2>{html.escape(batch)}</h2>\n<table>{''.join(lines)}</table>" for batch, lines in rows.items()
+    )
+    total = sum(len(q) for q in groups.values())
+    body = (f'<input id="q" type="search" placeholder="Search {total} questions '
+            f'({docs} distinct)…" autofocus>\n<p id="status"></p>\n<ol id="results"></ol>\n{tables}')
+    return _page("Question bank", body, root="", scripts='<script src="search.js"></script>\n')
+
+
+# ─── Build ────────────────────────────────────────────────────────────────────
+
+def _write(path: Path, text: str) -> bool:
+    """Write `text` unless the file already holds it; True if written."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False), encoding="utf-8")
+
+
+def _entries(batches: Iterable[str], errors: list[str] | None = None) -> list[dict]:
+    """
+    Index records of `batches`, reading the archive index once. `errors` is
+    passed to live_entries().
+    """
+    from bank.index import backfill, live_entries, load_index
+
+    batches = list(batches)
+    backfill()
+    archived = load_index([b for b in batches if b != LIVE_BATCH])
+    out = []
+    for batch in batches:
+        out.extend(live_entries(errors) if batch == LIVE_BATCH else archived.get(batch, []))
+    if out and "hash" not in out[0]:
+        raise ValueError("Archive index predates content hashes (run: python -m bank index --rebuild)")
+    return out
+
+
+def export_site(batches: Iterable[str], site: Path = SITE_DIR, rebuild: bool = False,
+                errors: list[str] | None = None) -> dict:
+    """
+    Bring the static site in `site` up to date with `batches`.
+
+    Returns counts of what the build did: questions, docs, rendered,
+    removed, shards (index + doc shards rewritten), pages (theme pages
+    rewritten) and seconds. A live module that fails to parse raises,
+    unless an `errors` list is given — then its theme is left out.
+    """
+    from bank.pack import collect
+
+    start = time.perf_counter()
+    manifest_path = site / MANIFEST_NAME
+    manifest = {} if rebuild else _read_json(manifest_path)
+    if manifest.get("version") != EXPORT_VERSION:
+        for sub in ("q", "t", "search"):
+            shutil.rmtree(site / sub, ignore_errors=True)
+        manifest = {"version": EXPORT_VERSION, "next": 0, "docs": {}, "pages": {}}
+    docs: Dict[str, list] = manifest["docs"]  # content hash → [doc number, ids, shard keys]
+
+    # Current ids per content hash, and theme pages as (index, hash) lists
+    ids: Dict[str, list[str]] = {}
+    groups: Dict[str, list[Tuple[int, str]]] = {}
+    for e in _entries(batches, errors):
+        ids.setdefault(e["hash"], []).append(question_id(e["batch"], e["theme"], e["index"]))
+        groups.setdefault(f"{e['batch']}/{e['theme']}", []).append((e["index"], e["hash"]))
+
+    added = [key for key in ids if key not in docs]
+    removed = [key for key in docs if key not in ids]
+    postings: Dict[str, Dict[str, list[int]]] = {}  # shard key → term → new doc numbers
+    dropped: Dict[str, set[int]] = {}               # shard key → doc numbers to drop
+    doc_rows: Dict[int, Dict[int, list | None]] = {}  # doc shard → doc number → row (None: drop)
+    doc_ids: Dict[int, Dict[int, list[str]]] = {}     # doc shard → doc number → moved ids
+
+    for key in removed:
+        n, _, shard_keys = docs.pop(key)
+        for shard in shard_keys:
+            dropped.setdefault(shard, set()).add(n)
+        doc_rows.setdefault(n // DOC_SHARD_SIZE, {})[n] = None
+        (site / "q" / f"{key}.html").unlink(missing_ok=True)
+
+    for key, row in docs.items():
+        if row[1] != ids[key]:
+            row[1] = ids[key]
+            doc_ids.setdefault(row[0] // DOC_SHARD_SIZE, {})[row[0]] = row[1]
+
+    if added:
+        wanted = {parse_question_id(ids[key][0])[0] for key in added}
+        texts = collect(sorted(wanted), errors=[])
+        for key in added:
+            text = texts.get(ids[key][0], "")
+            n = manifest["next"]
+            manifest["next"] += 1
+            by_shard: Dict[str, list[str]] = {}
+            for term in terms(text):
+                by_shard.setdefault(shard_key(term), []).append(term)
+            for shard, shard_terms in by_shard.items():
+                shard_postings = postings.setdefault(shard, {})
+                for term in shard_terms:
+                    shard_postings.setdefault(term, []).append(n)
+            docs[key] = [n, ids[key], sorted(by_shard)]
+            doc_rows.setdefault(n // DOC_SHARD_SIZE, {})[n] = [title(text), key, ids[key]]
+            _write(site / "q" / f"{key}.html", _question_page(key, text))
+
+    # Patch only the index shards and doc shards that changed
+    shards = 0
+    for key in sorted(set(postings) | set(dropped)):
+        path = site / "search" / f"{key}.json"
+        shard = _read_json(path)
+        gone = dropped.get(key, set())
+        for term, new in postings.get(key, {}).items():
+            shard[term] = shard.get(term, []) + new
+        if gone:
+            shard = {t: [n for n in ns if n not in gone] for t, ns in shard.items()}
+        shard = {t: ns for t, ns in sorted(shard.items()) if ns}
+        if shard:
+            _write_json(path, shard)
+        else:
+            path.unlink(missing_ok=True)
+        shards += 1
+    for k in sorted(set(doc_rows) | set(doc_ids)):
+        path = site / "search" / "docs" / f"{k}.json"
+        shard = _read_json(path)
+        for n, row in doc_rows.get(k, {}).items():
+            if row is None:
+                shard.pop(str(n), None)
+            else:
+                shard[str(n)] = row
+        for n, moved in doc_ids.get(k, {}).items():
+            if str(n) in shard:  # keep the stored title
+                shard[str(n)][2] = moved
+        _write_json(path, dict(sorted(shard.items(), key=lambda kv: int(kv[0]))))
+        shards += 1
+
+    # Theme pages whose question list changed, then the shared files
+    pages = 0
+    old_pages: Dict[str, str] = manifest["pages"]
+    new_pages: Dict[str, str] = {}
+    for key, questions in groups.items():
+        batch, theme = key.split("/", 1)
+        sig = hashlib.sha1(" ".join(f"{i}:{key}" for i, key in questions).encode()).hexdigest()[:16]
+        new_pages[key] = sig
+        path = site / "t" / batch / f"{theme}.html"
+        if old_pages.get(key) != sig or not path.exists():
+            _write(path, _theme_page(site, batch, theme, questions))
+            pages += 1
+    for key in set(old_pages) - set(new_pages):
+        batch, theme = key.split("/", 1)
+        (site / "t" / batch / f"{theme}.html").unlink(missing_ok=True)
+    manifest["pages"] = new_pages
+
+    pages += _write(site / "index.html", _index_page(groups, len(docs)))
+    _write(site / "style.css", STYLE)
+    _write(site / "search.js", SEARCH_JS % {
+        "prefix": SHARD_PREFIX, "doc_shard": DOC_SHARD_SIZE, "stopwords": json.dumps(sorted(_STOPWORDS)),
+    })
+    _write_json(manifest_path.with_suffix(".tmp"), manifest)
+    manifest_path.with_suffix(".tmp").replace(manifest_path)
+
+    return {
+        "questions": sum(len(v) for v in ids.values()),
+        "docs": len(docs),
+        "rendered": len(added),
+        "removed": len(removed),
+        "shards": shards,
+        "pages": pages,
+        "seconds": time.perf_counter() - start,
+    }
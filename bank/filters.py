@@ -0,0 +1,169 @@
+"""
+bank/filters.py — Block and allow lists, compiled to per-theme bitmasks.
+
+Instead of deleting a question from its Q_* list (which shifts every later
+index and with it the saved session state), list it in question_filters.json
+at the project root:
+
+    {
+      "allow": ["batch:live", "tag:msw"],
+      "block": ["fp:3f0c9a1b2c3d4e5f", "id:batch6/testing#12", "tag:flaky-tests"]
+    }
+
+Rules are `kind:value`:
+
+    fp:<fingerprint>   a question's content fingerprint (bank/fingerprint.py),
+                       so the rule follows the question if it moves
+    id:<question id>   one position, "batch/theme#index"
+    tag:<tag>          markdown questions carrying the tag (bank/markdown.py)
+    batch:<name>       a whole batch ("templates" for --templates questions)
+
+With an allow list, only questions matching at least one allow rule are
+asked; a block rule always wins. Both lists are optional.
+
+compile_masks() turns the rules into one int per theme whose bit i is set
+when the theme's i-th question may be asked. SessionMemory keeps its
+available pool as the same per-theme bitmasks, so applying the filters is a
+few AND operations per pick. Saved progress never refers to the filters, so
+editing them never invalidates it.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+from bank.source import ROOT, parse_subtopic, question_id, question_meta
+
+FILTER_FILE = ROOT / "question_filters.json"
+
+RULE_KINDS = ("fp", "tag", "batch", "id")
+TEMPLATE_BATCH = "templates"
+
+Pair = Tuple[str, str]
+Rules = Dict[str, list[Tuple[str, str]]]
+
+
+def parse_rules(data: dict, where: str = "filters") -> Rules:
+    """
+    Validate raw filters ({"allow": [...], "block": [...]}) into
+    {"allow": [(kind, value), ...], "block": [...]}. Raises ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"{where}: expected an object with 'allow' and/or 'block' lists")
+    unknown = set(data) - {"allow", "block"}
+    if unknown:
+        raise ValueError(f"{where}: unknown key(s) {', '.join(sorted(unknown))} (expected allow, block)")
+    rules: Rules = {}
+    for key in ("allow", "block"):
+        entries = data.get(key, [])
+        if not isinstance(entries, list):
+            raise ValueError(f"{where}: {key} must be a list")
+        parsed = []
+        for i, entry in enumerate(entries):
+            kind, sep, value = str(entry).partition(":")
+            if not sep or kind not in RULE_KINDS or not value.strip():
+                raise ValueError(f"{where}: {key}[{i}]: expected one of "
+                                 f"{', '.join(k + ':...' for k in RULE_KINDS)}, got {entry!r}")
+            parsed.append((kind, value.strip().lower() if kind in ("fp", "tag") else value.strip()))
+        rules[key] = parsed
+    return rules
+
+
+def load_rules(path: Path = FILTER_FILE) -> Rules | None:
+    """Read and validate a filter file; None if it doesn't exist."""
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as exc:
+        raise ValueError(f"{path}: {exc}") from None
+    return parse_rules(data, where=str(path))
+
+
+def rule_count(rules: Rules) -> int:
+    return sum(len(entries) for entries in rules.values())
+
+
+# ─── Compiling ────────────────────────────────────────────────────────────────
+
+def _fingerprints(batches: Iterable[str]) -> Dict[str, str]:
+    """
+    Question id → fingerprint, from the bank index (archives indexed on
+    demand). A live module that fails to parse is reported and its questions
+    left without a fingerprint, so fp: rules never match them.
+    """
+    from bank.index import backfill, batch_entries
+
+    backfill()
+    out = {}
+    errors: list[str] = []
+    for batch in batches:
+        for e in batch_entries(batch, errors):
+            out[question_id(e["batch"], e["theme"], e["index"])] = e["fp"]
+    for err in errors:
+        print(f"[Bank] WARNING: no fingerprints for fp: rules: {err}")
+    return out
+
+
+def _tags(batches: Iterable[str]) -> Dict[str, set]:
+    """Question id → tags, for the markdown questions of `batches`."""
+    out = {}
+    for batch in batches:
+        for qid, meta in question_meta(batch, errors=[]).items():
+            out[qid] = set(meta["tags"])
+    return out
+
+
+def _locate(pair: Pair) -> Tuple[str, str | None]:
+    """(batch, question id) of a session pair; template pairs have no id."""
+    theme, subtopic = pair
+    if subtopic.startswith("tpl:"):
+        return TEMPLATE_BATCH, None
+    batch, index = parse_subtopic(subtopic)
+    return batch, question_id(batch, theme, index)
+
+
+def compile_masks(theme_pairs: Dict[str, list[Pair]], rules: Rules) -> Dict[str, int]:
+    """
+    Return theme → bitmask of the pairs in `theme_pairs[theme]` that the
+    rules let through (bit i ⇔ theme_pairs[theme][i]).
+
+    Fingerprints and tags are only looked up when a rule needs them.
+    """
+    allow = rules.get("allow", [])
+    block = rules.get("block", [])
+    kinds = {kind for kind, _ in allow + block}
+    batches = {
+        _locate(pair)[0] for pairs in theme_pairs.values() for pair in pairs
+    } - {TEMPLATE_BATCH}
+    fps = _fingerprints(sorted(batches)) if "fp" in kinds else {}
+    tags = _tags(sorted(batches)) if "tag" in kinds else {}
+
+    def by_kind(entries) -> Dict[str, set]:
+        out: Dict[str, set] = {kind: set() for kind in RULE_KINDS}
+        for kind, value in entries:
+            out[kind].add(value)
+        return out
+
+    def matches(sets: Dict[str, set], batch: str, qid: str | None) -> bool:
+        if batch in sets["batch"]:
+            return True
+        if qid is None:
+            return False
+        return (qid in sets["id"]
+                or fps.get(qid) in sets["fp"]
+                or not sets["tag"].isdisjoint(tags.get(qid, ())))
+
+    allowed, blocked = by_kind(allow), by_kind(block)
+    masks: Dict[str, int] = {}
+    for theme, pairs in theme_pairs.items():
+        bits = bytearray((len(pairs) + 7) // 8)
+        for i, pair in enumerate(pairs):
+            batch, qid = _locate(pair)
+            if allow and not matches(allowed, batch, qid):
+                continue
+            if matches(blocked, batch, qid):
+                continue
+            bits[i >> 3] |= 1 << (i & 7)
+        masks[theme] = int.from_bytes(bits, "little")
+    return masks
@@ -0,0 +1,99 @@
+"""
+bank/fingerprint.py — Content fingerprints for questions.
+
+A fingerprint identifies a question by its text rather than its position, so
+it survives reordering, re-batching and whitespace-only edits. The
+normalisation follows the dedup scripts (`_count_batch7.py`): fence markers
+are dropped, whitespace is collapsed and case is folded.
+"""
+
+import hashlib
+import re
+
+_FENCE_RE = re.compile(r"```[\w-]*")
+_SPACE_RE = re.compile(r"\s+")
+_HEADER_RE = re.compile(r"^\*\*([^*]+?):?\*\*")
+
+# Leading bold marker → short header kind
+HEADER_KINDS = {
+    "Task (Code Generation)":  "task",
+    "Tasks (Code Generation)": "task",
+    "Debug Scenario":          "debug",
+    "Context":                 "context",
+}
+
+
+def normalize(text: str) -> str:
+    """Return the comparison form of a question."""
+    cleaned = _FENCE_RE.sub("", text)
+    return _SPACE_RE.sub(" ", cleaned).strip().lower()
+
+
+def fingerprint(text: str) -> str:
+    """Return a 16-hex-digit fingerprint of the question's normalised text."""
+    return hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()[:16]
+
+
+def header_kind(text: str) -> str:
+    """Classify a question by its leading bold header ("task", "debug", ...)."""
+    m = _HEADER_RE.match(text.lstrip())
+    if m is None:
+        return "other"
+    return HEADER_KINDS.get(m.group(1).rstrip(":"), "other")
+
+
+# ─── MinHash ──────────────────────────────────────────────────────────────────
+# One-permutation MinHash: every word 3-gram is hashed once and routed to one
+# of MINHASH_BINS bins by its low bits; each bin keeps its minimum. Empty bins
+# borrow from the next filled bin (rotation densification) so signatures of
+# short questions stay comparable. Matching bins / MINHASH_BINS estimates the
+# Jaccard similarity of the two shingle sets.
+
+MINHASH_BINS = 64
+SHINGLE_WORDS = 3
+_MH_MASK = 0xFFFFFFFF
+_MH_EMPTY = _MH_MASK
+_MH_ROTATE = 0x9E3779B1
+
+
+def _shingles(text: str) -> set[str]:
+    words = normalize(text).split()
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text: str) -> list[int]:
+    """Return the MINHASH_BINS-value signature of a question."""
+    bins: list[int | None] = [None] * MINHASH_BINS
+    for sh in _shingles(text):
+        h = int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "big")
+        b = h % MINHASH_BINS
+        v = (h >> 6) & _MH_MASK
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+
+    if all(v is None for v in bins):
+        return [_MH_EMPTY] * MINHASH_BINS
+    sig = []
+    for i in range(MINHASH_BINS):
+        j, dist = i, 0
+        while bins[j] is None:
+            j = (j + 1) % MINHASH_BINS
+            dist += 1
+        sig.append((bins[j] + dist * _MH_ROTATE) & _MH_MASK)
+    return sig
+
+
+def minhash_hex(sig: list[int]) -> str:
+    """Pack a signature into the compact hex form stored in indexes."""
+    return "".join(f"{v:08x}" for v in sig)
+
+
+def minhash_from_hex(packed: str) -> list[int]:
+    return [int(packed[i:i + 8], 16) for i in range(0, len(packed), 8)]
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / MINHASH_BINS
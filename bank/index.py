@@ -0,0 +1,200 @@
+"""
+bank/index.py — Persistent, append-only index of archived batches.
+
+Each archived batch contributes one "batch" record followed by one
+"question" record per question:
+
+    {"kind": "batch", "batch": "batch6", "count": 500, "archived_at": ..., "notes": {...}}
+    {"kind": "question", "batch": "batch6", "theme": "css_rendering", "index": 0,
+     "fp": "3f0c...", "hash": "9a1e...", "header": "task", "chars": 812,
+     "mh": "<MinHash, hex>"}
+
+"fp" is the dedup fingerprint (bank/fingerprint.py), blind to whitespace,
+case and fence tags; "hash" is a hash of the exact source text, for caches
+that must notice any edit.
+
+Archives are immutable, so a batch is indexed exactly once: rotation appends
+the batch it archives and nothing ever rewrites earlier lines.
+
+The live batch changes while it is being written, so its records are kept in
+a separate per-theme cache keyed by each module's mtime and size and the
+content hashes of the theme's markdown questions.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Iterable
+
+from bank.fingerprint import fingerprint, header_kind, minhash, minhash_hex
+from bank.markdown import content_hash
+from bank.source import (
+    CACHE_DIR,
+    LIVE_BATCH,
+    THEME_SOURCES,
+    archived_batches,
+    compile_markdown,
+    load_batch,
+    read_theme_file,
+    theme_path,
+)
+
+INDEX_FILE = CACHE_DIR / "archive_index.jsonl"
+LIVE_CACHE_FILE = CACHE_DIR / "live_index.json"
+# Bump when the question record shape changes so the live cache is discarded
+LIVE_CACHE_VERSION = 1
+
+
+def question_entries(batch: str, questions: Dict[str, list[str]]) -> list[dict]:
+    """Build the per-question index records for one batch."""
+    return [
+        {
+            "kind": "question",
+            "batch": batch,
+            "theme": theme,
+            "index": i,
+            "fp": fingerprint(text),
+            "hash": content_hash(text.encode("utf-8")),
+            "header": header_kind(text),
+            "chars": len(text),
+            "mh": minhash_hex(minhash(text)),
+        }
+        for theme, qs in questions.items()
+        for i, text in enumerate(qs)
+    ]
+
+
+def iter_records() -> Iterable[dict]:
+    """Yield every record in the index file (nothing if it doesn't exist)."""
+    if not INDEX_FILE.exists():
+        return
+    with INDEX_FILE.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def indexed_batches() -> list[str]:
+    """Return the names of batches already present in the index."""
+    return [r["batch"] for r in iter_records() if r["kind"] == "batch"]
+
+
+def load_index(batches: Iterable[str] | None = None) -> Dict[str, list[dict]]:
+    """Return batch → question records, optionally restricted to `batches`."""
+    wanted = set(batches) if batches is not None else None
+    out: Dict[str, list[dict]] = {}
+    for r in iter_records():
+        if r["kind"] != "question":
+            continue
+        if wanted is not None and r["batch"] not in wanted:
+            continue
+        out.setdefault(r["batch"], []).append(r)
+    return out
+
+
+def append_batch(batch: str, entries: list[dict], notes: Dict[str, str]) -> None:
+    """Append one batch (header + question records) to the index."""
+    if batch in indexed_batches():
+        raise ValueError(f"{batch} is already in the archive index")
+    header = {
+        "kind": "batch",
+        "batch": batch,
+        "count": len(entries),
+        "archived_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "notes": notes,
+    }
+    INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with INDEX_FILE.open("a", encoding="utf-8") as f:
+        for record in [header, *entries]:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def backfill(rebuild: bool = False) -> list[str]:
+    """
+    Index every archived batch that isn't in the index yet.
+
+    Only the missing batches are read from disk; `rebuild` starts the index
+    over from scratch. Returns the names of the batches indexed.
+    """
+    if rebuild and INDEX_FILE.exists():
+        INDEX_FILE.unlink()
+    done = set(indexed_batches())
+    added = []
+    for batch in archived_batches():
+        if batch in done:
+            continue
+        questions, notes = load_batch(batch)
+        append_batch(batch, question_entries(batch, questions), notes)
+        added.append(batch)
+    return added
+
+
+def live_entries(errors: list[str] | None = None) -> list[dict]:
+    """
+    Return index records for the live batch.
+
+    Themes whose module and markdown files haven't changed since the last
+    call are served from the cache; only edited themes are re-read and
+    re-fingerprinted. A module or markdown file that fails to parse raises,
+    unless an `errors` list is given — then, as in load_batch(), the message
+    is appended and the theme (or single markdown file) skipped.
+    """
+    try:
+        data = json.loads(LIVE_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    cache = data.get("themes", {}) if data.get("version") == LIVE_CACHE_VERSION else {}
+
+    entries: list[dict] = []
+    fresh: Dict[str, dict] = {}
+    dirty = False
+    markdown, _ = compile_markdown(LIVE_BATCH, errors)
+    for theme, (_, varname) in THEME_SOURCES.items():
+        path = theme_path(LIVE_BATCH, theme)
+        records = markdown.get(theme, [])
+        if not path.exists() and not records:
+            continue
+        st = path.stat() if path.exists() else None
+        stamp = [st.st_mtime_ns, st.st_size] if st else None
+        hashes = [r["hash"] for r in records]
+        cached = cache.get(theme)
+        if cached is None or cached["stamp"] != stamp or cached.get("markdown", []) != hashes:
+            try:
+                qs = read_theme_file(path, varname)[1] if st else []
+            except ValueError as exc:
+                if errors is None:
+                    raise
+                errors.append(str(exc))
+                continue
+            qs += [r["text"] for r in records]
+            cached = {
+                "stamp": stamp,
+                "markdown": hashes,
+                "entries": question_entries(LIVE_BATCH, {theme: qs}),
+            }
+            dirty = True
+        fresh[theme] = cached
+        entries.extend(cached["entries"])
+
+    if dirty or fresh.keys() != cache.keys():
+        LIVE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = LIVE_CACHE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": LIVE_CACHE_VERSION, "themes": fresh}), encoding="utf-8")
+        os.replace(tmp, LIVE_CACHE_FILE)
+    return entries
+
+
+def batch_entries(batch: str, errors: list[str] | None = None) -> list[dict]:
+    """
+    Return the index records of any batch, live or archived. `errors` is
+    passed to live_entries() (archived batches are never re-read).
+    """
+    if batch == LIVE_BATCH:
+        return live_entries(errors)
+    entries = load_index([batch]).get(batch)
+    if entries is None:
+        raise ValueError(f"{batch} is not in the archive index (run: python -m bank index)")
+    if entries and "mh" not in entries[0]:
+        raise ValueError("Archive index predates MinHash signatures (run: python -m bank index --rebuild)")
+    return entries
@@ -0,0 +1,41 @@
+"""
+bank/layout.py — Normalizes older question layouts to the current one.
+
+batch1 questions use labelled sections:
+
+    **Context:**        what the product / codebase looks like
+    **Code:**           optional fenced snippet
+    **Observed Issue:** what goes wrong
+    **Specific Ask:**   the actual question
+
+Every later batch opens with a single `**Debug Scenario:**` (or
+`**Task (Code Generation):**`) marker followed by plain paragraphs. The
+compiled bank (bank/pack.py) stores the normalized form, so every question
+the runtime can serve reads the same way, whichever batch it came from.
+Source files are never rewritten.
+"""
+
+import re
+
+# Bumped whenever normalize_layout() changes its output; packs built with an
+# older version are rebuilt (see bank.pack.pack_stale)
+LAYOUT_VERSION = 1
+
+# Section labels of the legacy layout
+_SECTIONS = ("Context", "Code", "Observed Issue", "Specific Ask")
+_LABEL_RE = re.compile(r"^\*\*(?:" + "|".join(map(re.escape, _SECTIONS)) + r"):\*\*[ \t]*$", re.MULTILINE)
+
+
+def normalize_layout(text: str) -> str:
+    """
+    Return `text` in the current layout.
+
+    A **Context:** question becomes a **Debug Scenario:** made of the same
+    sections, in their original order, with the labels dropped. Anything
+    else is returned unchanged.
+    """
+    stripped = text.strip()
+    if not stripped.startswith("**Context:**"):
+        return text
+    parts = [part.strip() for part in _LABEL_RE.split(stripped)]
+    return "**Debug Scenario:**\n" + "\n\n".join(p for p in parts if p)
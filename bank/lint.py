@@ -0,0 +1,198 @@
+"""
+bank/lint.py — Structural checks for question markdown and code fences.
+
+Catches the breakage that used to surface only after the fact (see
+`_fix_quotes.py`, `_diagnose.py`):
+
+    module    theme module does not parse                        error
+    fence     unclosed code fence                                error
+    brackets  unbalanced () [] {} in a ts/tsx/js/css block       error
+    header    no leading **Task**/**Debug Scenario**/**Context** warning
+    ask       **Context:** layout without **Specific Ask:**      warning
+    lang      untagged or unknown fence language                 warning
+    length    shorter than MIN_CHARS / longer than MAX_CHARS     warning
+
+Questions are linted in a process pool. Results are cached in
+.bank/lint_cache.json keyed by a hash of the exact text (the dedup
+fingerprint ignores whitespace, which fences care about) plus LINT_VERSION,
+so re-linting an unchanged corpus does no work.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Tuple
+
+from bank.codeblocks import LANG_ALIASES, UNTAGGED, extract_blocks
+from bank.fingerprint import header_kind
+from bank.markdown import content_hash
+from bank.source import CACHE_DIR, ROOT, list_batches, load_batch, question_id
+
+CACHE_FILE = CACHE_DIR / "lint_cache.json"
+
+# Bump when a check changes so cached results are discarded
+LINT_VERSION = 1
+
+MIN_CHARS = 120
+MAX_CHARS = 6000
+
+# Languages whose blocks get the bracket-balance check
+CODE_LANGS = {"ts", "tsx", "js", "css"}
+KNOWN_LANGS = CODE_LANGS | set(LANG_ALIASES.values()) | {
+    UNTAGGED, "html", "json", "bash", "diff", "graphql", "sql", "dockerfile", "text",
+}
+
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+Issue = Tuple[str, str, str]   # (severity, check, message)
+
+
+# ─── Checks ───────────────────────────────────────────────────────────────────
+
+def _strip_code(code: str, css: bool) -> str:
+    """Blank out comments and string literals so brackets inside them don't count."""
+    out = []
+    i, n = 0, len(code)
+    while i < n:
+        c = code[i]
+        two = code[i:i + 2]
+        if two == "/*":
+            end = code.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif two == "//" and not css and (i == 0 or code[i - 1] != ":"):
+            end = code.find("\n", i)
+            i = n if end < 0 else end
+        elif c in "'\"" or (c == "`" and not css):
+            # Skip to the closing quote; ' and " never span lines
+            j = i + 1
+            while j < n and code[j] != c and (c == "`" or code[j] != "\n"):
+                j += 2 if code[j] == "\\" else 1
+            i = j + 1
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+
+def bracket_error(code: str, lang: str) -> str | None:
+    """Describe the first bracket mismatch in a block, or None if balanced."""
+    stack: list[str] = []
+    for c in _strip_code(code, css=(lang == "css")):
+        if c in "([{":
+            stack.append(c)
+        elif c in ")]}":
+            if not stack or stack[-1] != _PAIRS[c]:
+                return f"unexpected '{c}'"
+            stack.pop()
+    if stack:
+        return f"unclosed '{stack[-1]}'"
+    return None
+
+
+def lint_text(text: str) -> list[Issue]:
+    """Run every per-question check on one question."""
+    issues: list[Issue] = []
+
+    fences = [line for line in text.splitlines() if line.lstrip().startswith("```")]
+    if len(fences) % 2:
+        issues.append(("error", "fence", f"{len(fences)} fence lines (unclosed code block)"))
+
+    for ordinal, (lang, code) in enumerate(extract_blocks(text)):
+        if lang == UNTAGGED:
+            issues.append(("warning", "lang", f"block {ordinal} has no language tag"))
+        elif lang not in KNOWN_LANGS:
+            issues.append(("warning", "lang", f"block {ordinal} has unknown language {lang!r}"))
+        if lang in CODE_LANGS:
+            err = bracket_error(code, lang)
+            if err is not None:
+                issues.append(("error", "brackets", f"block {ordinal} ({lang}): {err}"))
+
+    kind = header_kind(text)
+    if kind == "other":
+        issues.append(("warning", "header", "missing leading **Task**/**Debug Scenario**/**Context** marker"))
+    elif kind == "context" and "**Specific Ask:**" not in text:
+        issues.append(("warning", "ask", "**Context:** layout without **Specific Ask:**"))
+
+    if len(text) < MIN_CHARS:
+        issues.append(("warning", "length", f"{len(text)} chars (< {MIN_CHARS})"))
+    elif len(text) > MAX_CHARS:
+        issues.append(("warning", "length", f"{len(text)} chars (> {MAX_CHARS})"))
+    return issues
+
+
+def _lint_chunk(texts: list[str]) -> list[list[Issue]]:
+    return [lint_text(t) for t in texts]
+
+
+# ─── Corpus run ───────────────────────────────────────────────────────────────
+
+def _load_cache() -> Dict[str, list]:
+    try:
+        data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != LINT_VERSION:
+        return {}
+    return data.get("results", {})
+
+
+def _save_cache(results: Dict[str, list]) -> None:
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": LINT_VERSION, "results": results}), encoding="utf-8")
+    os.replace(tmp, CACHE_FILE)
+
+
+def lint_corpus(
+    batches: Iterable[str] | None = None, workers: int | None = None
+) -> Tuple[Dict[str, list[Issue]], dict]:
+    """
+    Lint every question of `batches` (default: all).
+
+    Returns (question id or module path → issues, run stats). Questions with
+    identical text are linted once; only bodies whose content hash is not in
+    the cache are linted, spread over a process pool of `workers` (default:
+    CPU count; 1 lints in-process). The stats count questions and unique
+    bodies separately: checked + cached == unique.
+    """
+    module_errors: list[str] = []
+    texts: Dict[str, str] = {}
+    for batch in batches if batches is not None else list_batches():
+        questions, _ = load_batch(batch, errors=module_errors)
+        for theme, qs in questions.items():
+            for i, text in enumerate(qs):
+                texts[question_id(batch, theme, i)] = text
+
+    cache = _load_cache()
+    hashes = {qid: content_hash(t.encode("utf-8")) for qid, t in texts.items()}
+    todo = sorted({h: qid for qid, h in hashes.items() if h not in cache}.items())
+
+    if todo:
+        todo_texts = [texts[qid] for _, qid in todo]
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(todo_texts) > 64:
+            size = -(-len(todo_texts) // (workers * 4))
+            chunks = [todo_texts[i:i + size] for i in range(0, len(todo_texts), size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                linted = [r for chunk in pool.map(_lint_chunk, chunks) for r in chunk]
+        else:
+            linted = _lint_chunk(todo_texts)
+        for (h, _), issues in zip(todo, linted):
+            cache[h] = issues
+        if batches is None:
+            # Full run: drop entries for questions that no longer exist
+            cache = {h: cache[h] for h in set(hashes.values())}
+        _save_cache(cache)
+
+    results: Dict[str, list[Issue]] = {}
+    for err in module_errors:
+        path, _, message = err.partition(": ")
+        results[os.path.relpath(path, ROOT)] = [("error", "module", message)]
+    for qid, h in hashes.items():
+        if cache[h]:
+            results[qid] = [tuple(issue) for issue in cache[h]]
+
+    unique = len(set(hashes.values()))
+    stats = {"questions": len(texts), "unique": unique,
+             "checked": len(todo), "cached": unique - len(todo)}
+    return results, stats
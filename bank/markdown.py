@@ -0,0 +1,219 @@
+"""
+bank/markdown.py — One-question-per-file markdown source, compiled incrementally.
+
+Besides the Q_* lists, a batch directory may hold a `questions/` folder of
+markdown files, one question each, with a small front-matter header:
+
+    ---
+    theme: testing
+    tags: [msw, flaky-tests]
+    difficulty: hard
+    ---
+    **Task:** ...
+
+`theme` is required; `tags` (a [list] or comma-separated) and `difficulty`
+are optional. Files may be grouped in sub-folders; within a theme they follow
+the theme's Q_* list in order of their file name's numeric prefix
+(`007-msw-handlers.md`), whatever folder they are in, and files without a
+prefix come last, in path order. A question's index therefore stays put as
+long as new files take a higher number than the existing ones — inserting one
+in the middle shifts every id after it.
+
+A broken file only loses that one question, never the whole theme, and
+not its place either: it compiles to an empty placeholder in its theme (the
+one it had when it last compiled, or the one its `theme:` line names), so the
+questions after it keep their indexes, and generate() refuses it. The
+compiler streams the folder one file at a time and keeps a cache of every
+compiled file keyed by mtime and size, falling back to a content hash, so
+only new or edited files are read and parsed again.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+# Bump when the compiled record shape changes so caches are discarded
+COMPILE_VERSION = 1
+
+DIFFICULTIES = ("easy", "medium", "hard")
+_FRONT_MATTER_KEYS = {"theme", "tags", "difficulty"}
+_DELIMITER = "---"
+_PREFIX = re.compile(r"\d+")
+_THEME_LINE = re.compile(r"^[ \t]*theme[ \t]*:[ \t]*['\"]?([\w-]+)", re.MULTILINE | re.IGNORECASE)
+
+
+def content_hash(raw: bytes) -> str:
+    import hashlib  # deferred: only changed files are hashed
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+def _parse_tags(value: str) -> list[str]:
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        value = value[1:-1]
+    tags = [t.strip().strip("'\"").lower() for t in value.split(",")]
+    return [t for t in tags if t]
+
+
+def _order_key(rel: str) -> tuple:
+    """Sort key of a question file: its numeric prefix, then its path."""
+    prefix = _PREFIX.match(rel.rsplit("/", 1)[-1])
+    return (0, int(prefix.group()), rel) if prefix else (1, 0, rel)
+
+
+def _placeholder_theme(raw: bytes, cached: dict | None, themes: set) -> str | None:
+    """The theme a file that fails to parse belongs to, if it can be told."""
+    if cached is not None:
+        return cached["theme"]
+    m = _THEME_LINE.search(raw.decode("utf-8", errors="replace"))
+    return m.group(1) if m and m.group(1) in themes else None
+
+
+def _decode(raw: bytes, path: Path) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValueError(f"{path}: line 1: not valid UTF-8") from None
+
+
+def parse_question(text: str, path: Path, themes: Iterable[str]) -> dict:
+    """
+    Parse one question file into {"theme", "tags", "difficulty", "text"}.
+
+    Raises ValueError ("path: line N: message") on a malformed file.
+    """
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != _DELIMITER:
+        raise ValueError(f"{path}: line 1: expected '{_DELIMITER}' front-matter header")
+
+    meta: Dict[str, str] = {}
+    where: Dict[str, int] = {}   # key → line number, for error messages
+    for lineno, line in enumerate(lines[1:], start=2):
+        if line.strip() == _DELIMITER:
+            body = "\n".join(lines[lineno:]).strip()
+            break
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        key = key.strip().lower()
+        if not sep:
+            raise ValueError(f"{path}: line {lineno}: expected 'key: value'")
+        if key not in _FRONT_MATTER_KEYS:
+            raise ValueError(f"{path}: line {lineno}: unknown front-matter key {key!r}")
+        meta[key] = value.strip()
+        where[key] = lineno
+    else:
+        raise ValueError(f"{path}: line {len(lines)}: unterminated front-matter header")
+
+    theme = meta.get("theme", "")
+    if not theme:
+        raise ValueError(f"{path}: line 1: front-matter has no theme")
+    if theme not in themes:
+        raise ValueError(f"{path}: line {where['theme']}: unknown theme {theme!r}")
+    difficulty = meta.get("difficulty", "").lower() or None
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(
+            f"{path}: line {where['difficulty']}: difficulty must be one of "
+            f"{', '.join(DIFFICULTIES)}, got {difficulty!r}"
+        )
+    if not body:
+        raise ValueError(f"{path}: line {len(lines)}: question body is empty")
+    return {
+        "theme": theme,
+        "tags": _parse_tags(meta.get("tags", "")),
+        "difficulty": difficulty,
+        "text": body,
+    }
+
+
+def _load_cache(cache_file: Path | None) -> Dict[str, dict]:
+    if cache_file is None:
+        return {}
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != COMPILE_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def _save_cache(cache_file: Path, files: Dict[str, dict]) -> None:
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": COMPILE_VERSION, "files": files}), encoding="utf-8")
+    os.replace(tmp, cache_file)
+
+
+def compile_dir(
+    src_dir: Path,
+    themes: Iterable[str],
+    cache_file: Path | None = None,
+    errors: list[str] | None = None,
+) -> Tuple[Dict[str, list[dict]], dict]:
+    """
+    Compile every `*.md` question under `src_dir`.
+
+    Returns (theme → records in _order_key() order, run stats). Each record is
+    {"text", "tags", "difficulty", "source", "hash"}. Files whose mtime and
+    size (or, failing that, content hash) match `cache_file` are not parsed
+    again. A malformed file raises, unless an `errors` list is given — then
+    the message is appended and the file compiles to a placeholder record
+    with empty "text", which keeps its slot in its theme (skipped altogether
+    only if its theme can't be told).
+    """
+    themes = set(themes)
+    stats = {"files": 0, "compiled": 0, "reused": 0, "broken": 0}
+    if not src_dir.is_dir():
+        return {}, stats
+
+    cache = _load_cache(cache_file)
+    fresh: Dict[str, dict] = {}
+    by_theme: Dict[str, list[dict]] = {}
+    for path in sorted(src_dir.rglob("*.md")):
+        rel = path.relative_to(src_dir).as_posix()
+        st = path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = cache.get(rel)
+        stats["files"] += 1
+
+        if entry is None or entry["stamp"] != stamp:
+            raw = path.read_bytes()
+            digest = content_hash(raw)
+            if entry is not None and entry["hash"] == digest:
+                entry = dict(entry, stamp=stamp)   # touched, not edited
+            else:
+                try:
+                    parsed = parse_question(_decode(raw, path), path, themes)
+                except ValueError as exc:
+                    if errors is None:
+                        raise
+                    errors.append(str(exc))
+                    stats["broken"] += 1
+                    theme = _placeholder_theme(raw, entry, themes)
+                    if entry is not None:
+                        fresh[rel] = entry  # remember its theme until it is fixed
+                    if theme is not None:
+                        by_theme.setdefault(theme, []).append({
+                            "text": "", "tags": [], "difficulty": None, "source": rel, "hash": digest,
+                        })
+                    continue
+                entry = dict(parsed, stamp=stamp, hash=digest)
+                stats["compiled"] += 1
+        fresh[rel] = entry
+        by_theme.setdefault(entry["theme"], []).append({
+            "text": entry["text"],
+            "tags": entry["tags"],
+            "difficulty": entry["difficulty"],
+            "source": rel,
+            "hash": entry["hash"],
+        })
+    for recs in by_theme.values():
+        recs.sort(key=lambda r: _order_key(r["source"]))
+    stats["reused"] = stats["files"] - stats["compiled"] - stats["broken"]
+
+    if cache_file is not None and fresh != cache:
+        _save_cache(cache_file, fresh)
+    return by_theme, stats
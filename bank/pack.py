@@ -0,0 +1,478 @@
+"""
+bank/pack.py — Compressed bank file with per-question random access.
+
+Every question is compressed on its own against one shared dictionary
+trained over the whole corpus, so the boilerplate repeated in every question
+(headers, product context, TSX idioms) costs almost nothing, yet any single
+question can be decoded without touching the others.
+
+Questions are stored in the current layout (bank/layout.py), so a pack of
+every batch is one uniform bank; each id ("batch3/testing#4") records which
+batch a question came from.
+
+Codec: zstd with a trained dictionary when the optional `zstandard` package
+is installed, otherwise stdlib zlib with a preset dictionary (`zdict`).
+
+File layout (little-endian):
+    b"QBPK1\\n"                magic
+    u32 header length + JSON  {"codec", "dict_size", "layout", "tokens", "fps", "sources",
+                              "groups" or "ids"}
+    dictionary bytes
+    u64[count + 1]            blob offsets, relative to the blob area
+    u32[count]                approximate token count per question (bank/tokens.py),
+                              present when the header has "tokens": true
+    u64[count]                fingerprint of each question's source text, as the
+                              bank index has it (the stored text is normalized, so
+                              it would hash differently); present with "fps": true
+    blobs
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+import subprocess
+import sys
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable
+
+from bank.fingerprint import fingerprint
+from bank.layout import LAYOUT_VERSION, normalize_layout
+from bank.tokens import token_counts
+from bank.source import (
+    CACHE_DIR,
+    LIVE_BATCH,
+    ROOT,
+    THEME_SOURCES,
+    list_batches,
+    load_batch,
+    markdown_dir,
+    parse_question_id,
+    question_id,
+    theme_path,
+)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+PACK_FILE = CACHE_DIR / "bank.pack"
+# The live batch alone, for the lean runtime (main.py --lean)
+LIVE_PACK_FILE = CACHE_DIR / "live.pack"
+
+_MAGIC = b"QBPK1\n"
+_ZLIB_DICT_SIZE = 32 * 1024     # zlib only looks back 32 KiB
+_ZSTD_DICT_SIZE = 64 * 1024
+# Dictionaries are trained on at most this many questions, evenly spaced
+_TRAIN_SAMPLE = 4000
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def train_zlib_dictionary(texts: list[str], size: int = _ZLIB_DICT_SIZE) -> bytes:
+    """
+    Build a zlib preset dictionary from fragments repeated across questions.
+
+    Candidates are whole lines plus runs of 3, 6 and 12 words. Each is scored
+    by the bytes it would save (questions it appears in beyond the first ×
+    length); fragments already contained in the dictionary are skipped. The
+    best ones go last, because zlib encodes nearer matches more cheaply.
+    """
+    counts: Counter = Counter()
+    for text in texts:
+        data = text.encode("utf-8")
+        fragments = set(data.splitlines(keepends=True))
+        words = data.split(b" ")
+        for n in (3, 6, 12):
+            fragments.update(b" ".join(words[i:i + n]) + b" " for i in range(len(words) - n + 1))
+        counts.update(fragments)
+
+    scored = sorted(
+        ((n - 1) * len(frag), frag) for frag, n in counts.items() if n > 1 and len(frag) > 3
+    )
+    picked: list[bytes] = []
+    blob = b""
+    for _, frag in reversed(scored):
+        if len(blob) + len(frag) > size or frag in blob:
+            continue
+        picked.append(frag)
+        blob += frag
+    return b"".join(reversed(picked))
+
+
+def _train(codec: str, texts: list[str]) -> bytes:
+    if len(texts) > _TRAIN_SAMPLE:
+        step = len(texts) / _TRAIN_SAMPLE
+        texts = [texts[int(i * step)] for i in range(_TRAIN_SAMPLE)]
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("codec 'zstd' needs the zstandard package (pip install zstandard)")
+        samples = [t.encode("utf-8") for t in texts]
+        return zstandard.train_dictionary(_ZSTD_DICT_SIZE, samples).as_bytes()
+    if codec == "zlib":
+        return train_zlib_dictionary(texts)
+    raise ValueError(f"Unknown codec: {codec!r}")
+
+
+def _compressor(codec: str, dictionary: bytes):
+    if codec == "zstd":
+        cctx = zstandard.ZstdCompressor(level=19, dict_data=zstandard.ZstdCompressionDict(dictionary))
+        return cctx.compress
+
+    def compress(data: bytes) -> bytes:
+        c = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=dictionary)
+        return c.compress(data) + c.flush()
+    return compress
+
+
+def _decompressor(codec: str, dictionary: bytes):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("this pack uses zstd; install the zstandard package to read it")
+        dctx = zstandard.ZstdDecompressor(dict_data=zstandard.ZstdCompressionDict(dictionary))
+        return dctx.decompress
+
+    def decompress(blob: bytes) -> bytes:
+        d = zlib.decompressobj(-15, zdict=dictionary)
+        return d.decompress(blob) + d.flush()
+    return decompress
+
+
+def collect(batches: Iterable[str] | None = None, errors: list[str] | None = None,
+            fps: Dict[str, str] | None = None) -> Dict[str, str]:
+    """
+    Return question id → normalized text for `batches` (default: all). A
+    `fps` dict is filled with id → fingerprint of the source text.
+    """
+    out: Dict[str, str] = {}
+    for batch in batches if batches is not None else list_batches():
+        questions, _ = load_batch(batch, errors=errors)
+        for theme, qs in questions.items():
+            for i, text in enumerate(qs):
+                qid = question_id(batch, theme, i)
+                out[qid] = normalize_layout(text)
+                if fps is not None:
+                    fps[qid] = fingerprint(text)
+    return out
+
+
+def _groups(ids: list[str]) -> list[list] | None:
+    """
+    Compress an id list of contiguous "batch/theme#0..n-1" runs into
+    [["batch/theme", n], ...], or None if the ids don't have that shape.
+    """
+    groups: list[list] = []
+    for qid in ids:
+        try:
+            batch, theme, index = parse_question_id(qid)
+        except ValueError:
+            return None
+        prefix = f"{batch}/{theme}"
+        if groups and groups[-1][0] == prefix and groups[-1][1] == index:
+            groups[-1][1] += 1
+        elif index == 0 and all(g[0] != prefix for g in groups):
+            groups.append([prefix, 1])
+        else:
+            return None
+    return groups
+
+
+def write_pack(questions: Dict[str, str], path: Path = PACK_FILE, codec: str | None = None,
+               sources: Dict[str, Dict[str, list[int]]] | None = None,
+               fps: Dict[str, str] | None = None) -> dict:
+    """
+    Compress `questions` (id → text) into a pack file. Returns size stats.
+    `sources` (from source_stamps(), taken before the questions were read)
+    is recorded for pack_stale(); `fps` (id → fingerprint, from collect())
+    is stored per question.
+    """
+    codec = codec or default_codec()
+    texts = list(questions.values())
+    dictionary = _train(codec, texts)
+    compress = _compressor(codec, dictionary)
+
+    blobs = [compress(t.encode("utf-8")) for t in texts]
+    offsets = array("Q", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    tokens = array("I", token_counts(texts))
+    if offsets.itemsize != 8 or tokens.itemsize != 4:
+        raise ValueError("platform has no 8-byte / 4-byte unsigned array types")
+    fp_values = array("Q", (int(fps[qid], 16) for qid in questions)) if fps is not None else None
+
+    # Bank-shaped ids are stored as per-theme counts, so opening a pack
+    # doesn't materialize one string per question
+    header = {"codec": codec, "dict_size": len(dictionary), "layout": LAYOUT_VERSION, "tokens": True}
+    if fp_values is not None:
+        header["fps"] = True
+    if sources is not None:
+        header["sources"] = sources
+    groups = _groups(list(questions))
+    if groups is not None:
+        header["groups"] = groups
+    else:
+        header["ids"] = list(questions)
+    header = json.dumps(header).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(dictionary)
+        f.write(offsets.tobytes())
+        f.write(tokens.tobytes())
+        if fp_values is not None:
+            f.write(fp_values.tobytes())
+        for blob in blobs:
+            f.write(blob)
+    tmp.replace(path)
+
+    return {
+        "codec": codec,
+        "count": len(texts),
+        "raw_bytes": sum(len(t.encode("utf-8")) for t in texts),
+        "pack_bytes": path.stat().st_size,
+        "dict_bytes": len(dictionary),
+    }
+
+
+class PackReader:
+    """Memory-mapped reader; only the requested question is ever decoded."""
+
+    def __init__(self, path: Path = PACK_FILE) -> None:
+        self.path = path
+        self._file = path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a question pack")
+
+        pos = len(_MAGIC)
+        (hlen,) = struct.unpack_from("<I", self._mm, pos)
+        pos += 4
+        header = json.loads(self._mm[pos:pos + hlen])
+        pos += hlen
+        dictionary = self._mm[pos:pos + header["dict_size"]]
+        pos += header["dict_size"]
+
+        self.codec = header["codec"]
+        self.layout = header.get("layout", 0)
+        # batch → {source file: [mtime_ns, size]} the pack was built from
+        self.sources: Dict[str, Dict[str, list[int]]] | None = header.get("sources")
+        if "groups" in header:
+            self._groups: Dict[str, tuple] | None = {}
+            first = 0
+            for prefix, count in header["groups"]:
+                self._groups[prefix] = (first, count)
+                first += count
+            self._count = first
+            self._slot: Dict[str, int] | None = None
+        else:
+            self._groups = None
+            self._slot = {qid: i for i, qid in enumerate(header["ids"])}
+            self._count = len(self._slot)
+        self._offsets = memoryview(self._mm)[pos:pos + 8 * (self._count + 1)].cast("Q")
+        pos += 8 * (self._count + 1)
+        self._tokens = None
+        if header.get("tokens"):
+            self._tokens = memoryview(self._mm)[pos:pos + 4 * self._count].cast("I")
+            pos += 4 * self._count
+        self._fps = None
+        if header.get("fps"):
+            self._fps = memoryview(self._mm)[pos:pos + 8 * self._count].cast("Q")
+            pos += 8 * self._count
+        self._blob_start = pos
+        self._decompress = _decompressor(self.codec, dictionary)
+
+    @property
+    def ids(self) -> list[str]:
+        """Every question id, in pack order (built on each call)."""
+        if self._groups is None:
+            return list(self._slot)
+        return [
+            f"{prefix}#{i}"
+            for prefix, (_, count) in self._groups.items()
+            for i in range(count)
+        ]
+
+    def batches(self) -> list[str]:
+        """Batch names present in the pack, in pack order."""
+        if self._groups is not None:
+            names = (prefix.partition("/")[0] for prefix in self._groups)
+        else:
+            names = (parse_question_id(qid)[0] for qid in self._slot)
+        return list(dict.fromkeys(names))
+
+    def theme_counts(self, batch: str) -> Dict[str, int]:
+        """Return theme → question count for one batch of the pack."""
+        if self._groups is not None:
+            return {
+                prefix.partition("/")[2]: count
+                for prefix, (_, count) in self._groups.items()
+                if prefix.partition("/")[0] == batch
+            }
+        counts: Dict[str, int] = {}
+        for qid in self._slot:
+            b, theme, _ = parse_question_id(qid)
+            if b == batch:
+                counts[theme] = counts.get(theme, 0) + 1
+        return counts
+
+    @property
+    def has_tokens(self) -> bool:
+        return self._tokens is not None
+
+    def token_counts(self, batch: str) -> Dict[str, list[int]]:
+        """Return theme → token count of each question (in index order) for one batch."""
+        if self._tokens is None:
+            raise ValueError(f"{self.path} has no token counts (rebuild it: python -m bank pack)")
+        if self._groups is not None:
+            return {
+                prefix.partition("/")[2]: self._tokens[first:first + count].tolist()
+                for prefix, (first, count) in self._groups.items()
+                if prefix.partition("/")[0] == batch
+            }
+        found: Dict[str, list[tuple]] = {}
+        for qid, i in self._slot.items():
+            b, theme, index = parse_question_id(qid)
+            if b == batch:
+                found.setdefault(theme, []).append((index, self._tokens[i]))
+        return {theme: [n for _, n in sorted(pairs)] for theme, pairs in found.items()}
+
+    def _index(self, qid: str) -> int | None:
+        if self._groups is None:
+            return self._slot.get(qid)
+        try:
+            batch, theme, index = parse_question_id(qid)
+        except ValueError:
+            return None
+        first, count = self._groups.get(f"{batch}/{theme}", (0, 0))
+        return first + index if 0 <= index < count else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, qid: str) -> bool:
+        return self._index(qid) is not None
+
+    @property
+    def has_fps(self) -> bool:
+        return self._fps is not None
+
+    def fingerprint(self, qid: str) -> str:
+        """The stored source-text fingerprint of one question (bank/fingerprint.py)."""
+        if self._fps is None:
+            raise ValueError(f"{self.path} has no fingerprints (rebuild it: python -m bank pack)")
+        i = self._index(qid)
+        if i is None:
+            raise KeyError(f"No question {qid!r} in {self.path}")
+        return f"{self._fps[i]:016x}"
+
+    def get(self, qid: str) -> str:
+        """Decode and return one question by id."""
+        i = self._index(qid)
+        if i is None:
+            raise KeyError(f"No question {qid!r} in {self.path}")
+        start = self._blob_start + self._offsets[i]
+        end = self._blob_start + self._offsets[i + 1]
+        return self._decompress(self._mm[start:end]).decode("utf-8")
+
+    def digest(self) -> str:
+        """SHA-1 of the whole mapped file: changes whenever the pack is rebuilt differently."""
+        return hashlib.sha1(self._mm).hexdigest()
+
+    def close(self) -> None:
+        for view in ("_offsets", "_tokens", "_fps"):
+            if getattr(self, view, None) is not None:
+                getattr(self, view).release()
+                setattr(self, view, None)
+        self._mm.close()
+        self._file.close()
+
+
+# ─── Compiled packs at runtime ────────────────────────────────────────────────
+
+def source_stamps(batches: Iterable[str]) -> Dict[str, Dict[str, list[int]]]:
+    """
+    batch → {source file relative to the repo: [mtime_ns, size]} for every
+    theme module and markdown file of `batches`.
+    """
+    out: Dict[str, Dict[str, list[int]]] = {}
+    for batch in batches:
+        paths = [theme_path(batch, theme) for theme in THEME_SOURCES]
+        if markdown_dir(batch).is_dir():
+            paths += sorted(markdown_dir(batch).rglob("*.md"))
+        files = {}
+        for p in paths:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files[p.relative_to(ROOT).as_posix()] = [st.st_mtime_ns, st.st_size]
+        out[batch] = files
+    return out
+
+
+def pack_stale(path: Path = PACK_FILE, batches: Iterable[str] | None = None) -> bool:
+    """
+    True when the pack at `path` must be rebuilt to serve `batches` (default:
+    all): it is missing, lacks one of them, predates the current layout,
+    token counts, fingerprints or source stamps, or one of their source
+    files was added, removed or changed (mtime or size) since it was built.
+    Stamps are compared for equality, not age: `rotate` installs files with
+    copy2, which keeps their old mtimes.
+    """
+    if not path.exists():
+        return True
+    batches = list(batches) if batches is not None else list_batches()
+    try:
+        reader = PackReader(path)
+    except (ValueError, OSError, KeyError, struct.error):
+        return True
+    try:
+        if (reader.layout != LAYOUT_VERSION or not reader.has_tokens or not reader.has_fps
+                or reader.sources is None
+                or not set(batches) <= set(reader.batches())):
+            return True
+        recorded = reader.sources
+    finally:
+        reader.close()
+    current = source_stamps(batches)
+    return any(recorded.get(batch) != current[batch] for batch in batches)
+
+
+def ensure_pack(path: Path = PACK_FILE, batches: Iterable[str] | None = None) -> bool:
+    """
+    Rebuild the pack of `batches` (default: all) if it is stale. Returns
+    True if it was rebuilt.
+
+    The build runs in a child process (`python -m bank pack ...`), so the
+    caller never holds the whole bank in memory, even once.
+    """
+    batches = list(batches) if batches is not None else list_batches()
+    if not pack_stale(path, batches):
+        return False
+    result = subprocess.run(
+        [sys.executable, "-m", "bank", "pack", *batches, "--out", str(path), "--no-bench"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise ValueError(f"Could not build {path}:\n{(result.stdout + result.stderr).strip()}")
+    return True
+
+
+def live_pack_stale(path: Path = LIVE_PACK_FILE) -> bool:
+    """True when the live pack is missing or older than any live source file."""
+    return pack_stale(path, [LIVE_BATCH])
+
+
+def ensure_live_pack(path: Path = LIVE_PACK_FILE) -> bool:
+    """Rebuild the live pack (main.py --lean) if it is stale."""
+    return ensure_pack(path, [LIVE_BATCH])
@@ -0,0 +1,226 @@
+"""
+bank/rotate.py — Archive the live batch and start the next one.
+
+One rotation, in a single pass over the live questions:
+  1. parse the live q_*.py files (and the staged replacements, if any),
+  2. move the live files (and questions/ markdown folder) to snippets/archive/batchN/,
+  3. install the staged files (or empty stubs) as the new live batch,
+  4. append batchN's fingerprints to the archive index,
+  5. migrate the saved session state (session_state.json and, if used, the
+     SQLite store) and its in-flight record from (theme, index) pairs by
+     fingerprint.
+
+Everything is validated before the first file is touched.
+"""
+
+import json
+import random
+import shutil
+from pathlib import Path
+from typing import Dict, Tuple
+
+from bank.fingerprint import fingerprint
+from bank.index import append_batch, indexed_batches, question_entries
+from bank.markdown import compile_dir
+from session_memory import (
+    _PENDING_FILE as PENDING_FILE,
+    _STATE_FILE as STATE_FILE,
+    _write_atomic,
+)
+from session_state import encode, upgrade
+from bank.source import (
+    LIVE_BATCH,
+    MARKDOWN_DIRNAME,
+    THEME_SOURCES,
+    batch_dir,
+    batch_number,
+    batch_subtopic,
+    load_batch,
+    markdown_dir,
+    next_batch_name,
+    read_theme_file,
+    theme_path,
+)
+
+# Human label used in the docstring of freshly stubbed theme modules
+THEME_LABELS = {
+    "react_internals":  "React",
+    "performance":      "Performance",
+    "nextjs_advanced":  "Next.js",
+    "typescript":       "TypeScript",
+    "architecture":     "Architecture",
+    "debugging":        "Debugging",
+    "state_management": "State Management",
+    "css_rendering":    "CSS/Styling",
+    "testing":          "Testing",
+}
+
+Pair = Tuple[str, str]
+
+
+def _stub_source(theme: str, batch_no: int) -> str:
+    stem, varname = THEME_SOURCES[theme]
+    return (
+        '"""\n'
+        f"snippets/{stem}.py — BATCH {batch_no}: new {THEME_LABELS[theme]} questions\n"
+        f"Zero overlap with batches 1-{batch_no - 1} archives.\n"
+        '"""\n\n'
+        f"{varname} = [\n]\n"
+    )
+
+
+def _read_staged(stage_dir: Path) -> Dict[str, list[str]]:
+    """Parse the staged replacement modules and markdown; missing themes are stubbed later."""
+    staged = {}
+    for theme, (stem, varname) in THEME_SOURCES.items():
+        path = stage_dir / f"{stem}.py"
+        if path.exists():
+            _, staged[theme] = read_theme_file(path, varname)
+    markdown, _ = compile_dir(stage_dir / MARKDOWN_DIRNAME, THEME_SOURCES)
+    for theme, records in markdown.items():
+        staged.setdefault(theme, []).extend(r["text"] for r in records)
+    if not staged:
+        raise ValueError(f"{stage_dir} contains no q_*.py theme modules or markdown questions")
+    return staged
+
+
+def _pair_fingerprints(questions: Dict[str, list[str]]) -> Dict[Pair, str]:
+    return {
+        (theme, str(i)): fingerprint(text)
+        for theme, qs in questions.items()
+        for i, text in enumerate(qs)
+    }
+
+
+def _rekey(data: dict, old_fps: Dict[Pair, str], new_fps: Dict[Pair, str],
+           archived_as: str | None, rng: random.Random) -> dict:
+    """One saved state (any format) re-keyed onto the new live batch."""
+    data, _ = upgrade(data)
+    asked = {old_fps[tuple(p)] for p in data.get("used", []) if tuple(p) in old_fps}
+
+    used = [p for p, fp in new_fps.items() if fp in asked]
+    used_set = set(used)
+    available = [p for p in new_fps if p not in used_set]
+    rng.shuffle(available)
+    # Subtopics that aren't a bare live index don't depend on the live batch
+    used += [p for p in data.get("used", []) if not p[1].isdigit()]
+    available += [p for p in data.get("available", []) if not p[1].isdigit()]
+    if archived_as is not None:
+        used += [[theme, batch_subtopic(archived_as, int(index))]
+                 for theme, index in data.get("used", []) if index.isdigit()]
+    return encode(available, used, data.get("last_theme"), data.get("cycle", 1))
+
+
+def _rekey_pending(record: dict | None, archived_as: str | None) -> dict | None:
+    """
+    The in-flight record after a rotation: a live question moves with its
+    batch ("12" → "batch7:12"), so recovery settles the question that was
+    actually being asked. Without an archive name it can only be dropped.
+    """
+    if record is None or not str(record.get("subtopic", "")).isdigit():
+        return record
+    if archived_as is None:
+        return None
+    return dict(record, subtopic=batch_subtopic(archived_as, int(record["subtopic"])))
+
+
+def migrate_state(old_fps: Dict[Pair, str], new_fps: Dict[Pair, str],
+                  archived_as: str | None = None, rng: random.Random | None = None,
+                  store=None) -> Dict[str, Tuple[int, int]]:
+    """
+    Re-key the saved session state onto the new live batch: session_state.json
+    and, with a BankStore, the state kept in the store — each together with
+    its in-flight (pending) record.
+
+    A question counts as already asked in the new batch when a question with
+    the same fingerprint was asked from the old one. Everything else goes back
+    into the available pool, shuffled with `rng` (main.py derives one from
+    --seed). Pairs of archived batches and templates are kept as they are, and
+    with `archived_as` the old live questions already asked stay asked under
+    their archived subtopic ("batch7:12"). Returns {"file" / "store":
+    (carried-over used, available)} for each state that existed.
+    """
+    rng = rng or random.Random()
+    out: Dict[str, Tuple[int, int]] = {}
+    if STATE_FILE.exists():
+        data = _rekey(json.loads(STATE_FILE.read_text(encoding="utf-8")),
+                      old_fps, new_fps, archived_as, rng)
+        _write_atomic(STATE_FILE, json.dumps(data, separators=(",", ":")))
+        out["file"] = (len(data["used"]), len(data["available"]))
+    if PENDING_FILE.exists():
+        try:
+            record = json.loads(PENDING_FILE.read_text(encoding="utf-8"))
+        except ValueError:
+            record = None  # torn write: nothing was sent yet
+        record = _rekey_pending(record, archived_as)
+        if record is None:
+            PENDING_FILE.unlink()
+        else:
+            _write_atomic(PENDING_FILE, json.dumps(record))
+    if store is not None:
+        data = store.load_state()
+        if data is not None:
+            data = _rekey(data, old_fps, new_fps, archived_as, rng)
+            store.save_state(data)
+            out["store"] = (len(data["used"]), len(data["available"]))
+        store.save_pending(_rekey_pending(store.load_pending(), archived_as))
+    return out
+
+
+def rotate(stage_dir: Path | None = None, dry_run: bool = False,
+           rng: random.Random | None = None, store=None) -> dict:
+    """
+    Archive the live batch and start the next one. Returns a summary dict.
+
+    `stage_dir` may hold the next batch's q_*.py files; without it the new
+    live batch starts as empty stubs. `rng` and `store` are passed on to
+    migrate_state().
+    """
+    archive_name = next_batch_name()
+    dest = batch_dir(archive_name)
+    if dest.exists():
+        raise ValueError(f"{dest} already exists")
+    if archive_name in indexed_batches():
+        raise ValueError(f"{archive_name} is already in the archive index")
+
+    live, notes = load_batch(LIVE_BATCH)
+    if not live:
+        raise ValueError("No live q_*.py modules to archive")
+    staged = _read_staged(stage_dir) if stage_dir is not None else {}
+
+    entries = question_entries(archive_name, live)
+    old_fps = {(e["theme"], str(e["index"])): e["fp"] for e in entries}
+    new_batch_no = batch_number(archive_name) + 1
+    new_live = {theme: staged.get(theme, []) for theme in THEME_SOURCES}
+    new_fps = _pair_fingerprints(new_live)
+
+    summary = {
+        "archived_as": archive_name,
+        "archived_questions": len(entries),
+        "new_live_questions": len(new_fps),
+        "carried_over": len(set(old_fps.values()) & set(new_fps.values())),
+        "state": {},
+    }
+    if dry_run:
+        return summary
+
+    dest.mkdir(parents=True)
+    for theme in live:
+        source = theme_path(LIVE_BATCH, theme)
+        if source.exists():
+            shutil.move(str(source), str(dest / source.name))
+    if markdown_dir(LIVE_BATCH).is_dir():
+        shutil.move(str(markdown_dir(LIVE_BATCH)), str(dest / MARKDOWN_DIRNAME))
+
+    for theme, (stem, _) in THEME_SOURCES.items():
+        target = theme_path(LIVE_BATCH, theme)
+        if stage_dir is not None and (stage_dir / f"{stem}.py").exists():
+            shutil.copy2(stage_dir / f"{stem}.py", target)
+        else:
+            target.write_text(_stub_source(theme, new_batch_no), encoding="utf-8")
+    if stage_dir is not None and (stage_dir / MARKDOWN_DIRNAME).is_dir():
+        shutil.copytree(stage_dir / MARKDOWN_DIRNAME, markdown_dir(LIVE_BATCH))
+
+    append_batch(archive_name, entries, notes)
+    summary["state"] = migrate_state(old_fps, new_fps, archived_as=archive_name, rng=rng, store=store)
+    return summary
@@ -0,0 +1,384 @@
+"""
+bank/serve.py — Read-only local HTTP/JSON service over the compiled bank.
+
+Scripts that want questions would otherwise import question_generator,
+which loads every snippet module into their own process. `python -m bank
+serve` maps the pack once (bank/pack.py) and answers them all over HTTP:
+
+    GET /                          bank hash, question count, batch → theme → count
+    GET /questions/<id>            one question with its text; the "#" of the id
+                                   is sent as %23 (/questions/batch6/testing%2312)
+    GET /questions?<filters>       metadata of the matching questions
+                                   (offset, limit)
+    GET /search?q=...&<filters>    questions containing every query word (a word
+                                   matches the terms it prefixes, as in the static
+                                   site's search); limit, text=1 to include texts
+    GET /random?n=3&<filters>      a random sample with texts; seed=... makes it
+                                   repeatable (and cacheable)
+
+Filters: batch, theme, header, tag (comma-separated or repeated; any value
+matches), fp, min_tokens / max_tokens, min_chars / max_chars.
+
+Every deterministic response carries an ETag derived from the pack's hash
+and is revalidated with If-None-Match, so a client that repeats a request
+after the bank is unchanged gets an empty 304. Connections are HTTP/1.1
+keep-alive. Request threads share one Bank: the mmap-backed reader, the
+per-question metadata (index records, pack token counts, markdown tags) and
+a term index built on the first search. When the pack file is replaced
+(`python -m bank pack`) the next request past RELOAD_CHECK seconds loads
+the new one; requests already running finish on the old one, which is
+closed (its mmap unmapped) when the last of them is done. A live module that
+fails to parse only leaves out the metadata of its theme; the modules
+skipped are logged at startup and on every reload.
+
+bank/client.py is the matching keep-alive client with an ETag cache.
+"""
+
+import bisect
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from bank.export import terms
+from bank.pack import PACK_FILE, PackReader
+from bank.source import parse_question_id
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Seconds between checks of the pack file for a rebuild
+RELOAD_CHECK = 1.0
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_SAMPLE = 100
+
+# Idle keep-alive connections are dropped after this many seconds
+IDLE_TIMEOUT = 30
+
+_LIST_FILTERS = ("batch", "theme", "header", "tag", "fp")
+_RANGE_FILTERS = ("tokens", "chars")
+
+
+def _stamp(path: Path) -> tuple:
+    st = os.stat(path)
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+# ─── Loaded bank ──────────────────────────────────────────────────────────────
+
+class Bank:
+    """One opened pack and the metadata of its questions, shared by every request thread."""
+
+    def __init__(self, path: Path = PACK_FILE) -> None:
+        from bank.index import backfill, batch_entries
+        from bank.source import question_id, question_meta
+
+        self.path = path
+        self.stamp = _stamp(path)
+        self.reader = PackReader(path)
+        self.digest = self.reader.digest()
+        self.etag = f'"{self.digest[:20]}"'
+        # The zstd decompressor must not be used by two threads at once
+        self._decode_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._terms: list[str] | None = None
+        self._postings: list[list[int]] = []
+        # Requests in flight; a retired Bank is closed when the last one ends
+        self._users_lock = threading.Lock()
+        self._users = 0
+        self._retired = False
+
+        batches = self.reader.batches()
+        backfill()
+        self.skipped: list[str] = []  # live modules that could not be read
+        entries = {
+            question_id(e["batch"], e["theme"], e["index"]): e
+            for batch in batches for e in batch_entries(batch, self.skipped)
+        }
+        tags = {
+            qid: meta["tags"]
+            for batch in batches for qid, meta in question_meta(batch, errors=[]).items()
+        }
+        tokens: Dict[str, int] = {}
+        if self.reader.has_tokens:
+            for batch in batches:
+                for theme, counts in self.reader.token_counts(batch).items():
+                    for i, n in enumerate(counts):
+                        tokens[question_id(batch, theme, i)] = n
+
+        self.records: list[dict] = []
+        for qid in self.reader.ids:
+            batch, theme, index = parse_question_id(qid)
+            e = entries.get(qid, {})
+            self.records.append({
+                "id": qid, "batch": batch, "theme": theme, "index": index,
+                "fp": e.get("fp"), "header": e.get("header"), "chars": e.get("chars"),
+                "tokens": tokens.get(qid), "tags": tags.get(qid, []),
+            })
+        self.slot = {r["id"]: i for i, r in enumerate(self.records)}
+
+    def text(self, i: int) -> str:
+        with self._decode_lock:
+            return self.reader.get(self.records[i]["id"])
+
+    def question(self, qid: str) -> dict:
+        """One question's record with its text. Raises KeyError."""
+        i = self.slot.get(qid)
+        if i is None:
+            raise KeyError(f"No question {qid!r}")
+        return dict(self.records[i], text=self.text(i))
+
+    def summary(self) -> dict:
+        batches: Dict[str, Dict[str, int]] = {}
+        for r in self.records:
+            themes = batches.setdefault(r["batch"], {})
+            themes[r["theme"]] = themes.get(r["theme"], 0) + 1
+        return {"bank": self.digest, "questions": len(self.records),
+                "codec": self.reader.codec, "batches": batches}
+
+    # ─── Queries ──────────────────────────────────────────────────────────────
+
+    def select(self, params: Dict[str, list[str]]) -> list[int]:
+        """Positions of the records matching the filters in `params`. Raises ValueError."""
+        wanted = {}
+        for key in _LIST_FILTERS:
+            values = {v.strip() for raw in params.get(key, ()) for v in raw.split(",") if v.strip()}
+            if values:
+                wanted[key] = values
+        bounds = []
+        for key in _RANGE_FILTERS:
+            for side in ("min", "max"):
+                if f"{side}_{key}" in params:
+                    bounds.append((key, side, _int(params, f"{side}_{key}", 0)))
+        if "batch" in wanted:
+            unknown = wanted["batch"] - {r["batch"] for r in self.records}
+            if unknown:
+                raise ValueError(f"Unknown batch(es): {', '.join(sorted(unknown))}")
+
+        def keep(r: dict) -> bool:
+            for key, values in wanted.items():
+                if key == "tag":
+                    if values.isdisjoint(r["tags"]):
+                        return False
+                elif r[key] not in values:
+                    return False
+            for key, side, limit in bounds:
+                value = r[key]
+                if value is None or (value < limit if side == "min" else value > limit):
+                    return False
+            return True
+
+        if not wanted and not bounds:
+            return list(range(len(self.records)))
+        return [i for i, r in enumerate(self.records) if keep(r)]
+
+    def _build_terms(self) -> None:
+        index: Dict[str, list[int]] = {}
+        for i in range(len(self.records)):
+            for term in terms(self.text(i)):
+                index.setdefault(term, []).append(i)
+        self._postings = [index[t] for t in sorted(index)]
+        self._terms = sorted(index)
+
+    def search(self, query: str, candidates: Iterable[int]) -> list[int]:
+        """Candidates containing every word of `query` (prefix match), in bank order."""
+        words = terms(query)
+        if not words:
+            raise ValueError("q: no searchable words (2+ letters or digits)")
+        with self._index_lock:
+            if self._terms is None:
+                self._build_terms()
+        hits = set(candidates)
+        for word in words:
+            lo = bisect.bisect_left(self._terms, word)
+            hi = bisect.bisect_left(self._terms, word + "\uffff")
+            matched = set()
+            for postings in self._postings[lo:hi]:
+                matched.update(postings)
+            hits &= matched
+        return sorted(hits)
+
+    # ─── Lifetime ─────────────────────────────────────────────────────────────
+
+    def acquire(self) -> bool:
+        """Register one request; False once the Bank is retired (use the new one)."""
+        with self._users_lock:
+            if self._retired:
+                return False
+            self._users += 1
+            return True
+
+    def release(self) -> None:
+        """End a request started with acquire()."""
+        with self._users_lock:
+            self._users -= 1
+            last = self._retired and self._users == 0
+        if last:
+            self.close()
+
+    def retire(self) -> None:
+        """Take no new requests; close now, or when the last running one ends."""
+        with self._users_lock:
+            self._retired = True
+            idle = self._users == 0
+        if idle:
+            self.close()
+
+    def close(self) -> None:
+        self.reader.close()
+
+
+def _int(params: Dict[str, list[str]], key: str, default: int, low: int = 0, high: int | None = None) -> int:
+    if key not in params:
+        return default
+    try:
+        value = int(params[key][-1])
+    except ValueError:
+        raise ValueError(f"{key}: expected an integer, got {params[key][-1]!r}") from None
+    if value < low or (high is not None and value > high):
+        raise ValueError(f"{key}: must be between {low} and {high if high is not None else '∞'}")
+    return value
+
+
+def _flag(params: Dict[str, list[str]], key: str) -> bool:
+    return params.get(key, ["0"])[-1].lower() in ("1", "true", "yes")
+
+
+# ─── HTTP ─────────────────────────────────────────────────────────────────────
+
+class BankHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive; every response sets Content-Length
+    server_version = "QuestionBank/1"
+    timeout = IDLE_TIMEOUT
+    # Headers and body go out as separate writes; with Nagle on, a kept-alive
+    # connection waits for the client's delayed ACK (~40 ms) on every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        bank = self.server.bank()
+        try:
+            self._respond(bank, url.path, params)
+        finally:
+            bank.release()
+
+    def _respond(self, bank: Bank, path: str, params: Dict[str, list[str]]) -> None:
+        cacheable = path != "/random" or "seed" in params
+        try:
+            status, payload = 200, self._route(bank, path, params)
+        except KeyError as exc:
+            status, payload = 404, {"error": exc.args[0]}
+        except ValueError as exc:
+            status, payload = 400, {"error": str(exc)}
+        # Only a successful answer is revalidated: errors always go out in full
+        if cacheable and status == 200 and self._not_modified(bank.etag):
+            self.send_response(304)
+            self.send_header("ETag", bank.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if cacheable and status == 200:
+            self.send_header("ETag", bank.etag)
+            self.send_header("Cache-Control", "no-cache")
+        else:
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag: str) -> bool:
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+        return "*" in tags or etag in tags
+
+    def _route(self, bank: Bank, path: str, params: Dict[str, list[str]]) -> dict:
+        if path in ("/", ""):
+            return bank.summary()
+        if path.startswith("/questions/"):
+            qid = unquote(path[len("/questions/"):])
+            if "#" not in qid and qid.count("/") == 2:  # batch/theme/index
+                qid = "{}/{}#{}".format(*qid.split("/"))
+            return bank.question(qid)
+        if path == "/questions":
+            found = bank.select(params)
+            offset = _int(params, "offset", 0)
+            limit = _int(params, "limit", DEFAULT_LIMIT, high=MAX_LIMIT)
+            return {"total": len(found), "questions": [bank.records[i] for i in found[offset:offset + limit]]}
+        if path == "/search":
+            query = params.get("q", [""])[-1]
+            found = bank.search(query, bank.select(params))
+            limit = _int(params, "limit", DEFAULT_LIMIT, high=MAX_LIMIT)
+            with_text = _flag(params, "text")
+            return {"total": len(found), "questions": [
+                dict(bank.records[i], text=bank.text(i)) if with_text else bank.records[i]
+                for i in found[:limit]
+            ]}
+        if path == "/random":
+            found = bank.select(params)
+            n = _int(params, "n", 1, low=1, high=MAX_SAMPLE)
+            rng = random.Random(params["seed"][-1]) if "seed" in params else random.Random()
+            picked = rng.sample(found, min(n, len(found)))
+            return {"total": len(found), "questions": [dict(bank.records[i], text=bank.text(i)) for i in picked]}
+        raise KeyError(f"No such endpoint: {path}")
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class BankServer(ThreadingHTTPServer):
+    """Threaded server over one shared Bank, reloaded when the pack file is replaced."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, path: Path = PACK_FILE, verbose: bool = False) -> None:
+        self.pack_path = path
+        self.verbose = verbose
+        self._bank = self._load()
+        self._reload_lock = threading.Lock()
+        self._checked = time.monotonic()
+        super().__init__(address, BankHandler)
+
+    def _load(self) -> Bank:
+        bank = Bank(self.pack_path)
+        for err in bank.skipped:
+            print(f"[Bank] SKIPPED {err}")
+        return bank
+
+    def bank(self) -> Bank:
+        """
+        The current Bank, acquired for one request (release() it when done),
+        swapped for a fresh one if the pack was rebuilt.
+        """
+        if time.monotonic() - self._checked >= RELOAD_CHECK:
+            with self._reload_lock:
+                if time.monotonic() - self._checked >= RELOAD_CHECK:
+                    self._checked = time.monotonic()
+                    try:
+                        if _stamp(self.pack_path) != self._bank.stamp:
+                            old, self._bank = self._bank, self._load()
+                            old.retire()  # closed once its last request finishes
+                            print(f"[Bank] Reloaded {self.pack_path} (bank {self._bank.digest[:12]})")
+                    except (OSError, ValueError) as exc:
+                        print(f"[Bank] WARNING: keeping the loaded bank, could not reload: {exc}")
+        while True:
+            bank = self._bank
+            if bank.acquire():  # fails only if it was retired meanwhile
+                return bank
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._bank.retire()
@@ -0,0 +1,233 @@
+"""
+bank/source.py — Locates question batches on disk and reads their Q_* lists.
+
+Batch files are parsed with `ast` instead of being imported, so one broken
+theme module never takes the rest of the bank down with it. Nothing here is
+read at import time: main.py imports this module on every run.
+
+Batch names:
+    live      snippets/q_*.py               (what main.py asks from)
+    batch1    snippets/archive/q_*.py       (the original 252-question set)
+    batchN    snippets/archive/batchN/q_*.py
+
+Each batch directory may also hold a `questions/` folder of one-question
+markdown files (see bank/markdown.py); they follow the theme's Q_* list.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Tuple
+
+from bank.markdown import compile_dir
+
+# ─── Locations ────────────────────────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parent.parent
+SNIPPETS_DIR = ROOT / "snippets"
+ARCHIVE_DIR = SNIPPETS_DIR / "archive"
+
+# Derived artifacts (indexes, caches) — safe to delete, rebuilt on demand
+CACHE_DIR = ROOT / ".bank"
+
+LIVE_BATCH = "live"
+
+# Per-batch folder of one-question markdown files
+MARKDOWN_DIRNAME = "questions"
+
+# theme → (module stem, list variable)
+THEME_SOURCES: Dict[str, Tuple[str, str]] = {
+    "react_internals":  ("q_react",        "Q_REACT"),
+    "performance":      ("q_performance",  "Q_PERFORMANCE"),
+    "nextjs_advanced":  ("q_nextjs",       "Q_NEXTJS"),
+    "typescript":       ("q_typescript",   "Q_TYPESCRIPT"),
+    "architecture":     ("q_architecture", "Q_ARCHITECTURE"),
+    "debugging":        ("q_debugging",    "Q_DEBUGGING"),
+    "state_management": ("q_state",        "Q_STATE"),
+    "css_rendering":    ("q_css",          "Q_CSS"),
+    "testing":          ("q_testing",      "Q_TESTING"),
+}
+
+_BATCH_DIR_RE = re.compile(r"^batch(\d+)$")
+
+
+# ─── Batch discovery ──────────────────────────────────────────────────────────
+
+def batch_dir(batch: str) -> Path:
+    """Return the directory holding the theme modules of `batch`."""
+    if batch == LIVE_BATCH:
+        return SNIPPETS_DIR
+    if batch == "batch1":
+        return ARCHIVE_DIR
+    if not _BATCH_DIR_RE.match(batch):
+        raise ValueError(f"Unknown batch name: {batch!r}")
+    return ARCHIVE_DIR / batch
+
+
+def batch_number(batch: str) -> int:
+    """Return N for "batchN"; the live batch sorts after every archive."""
+    if batch == LIVE_BATCH:
+        return 1 << 30
+    m = _BATCH_DIR_RE.match(batch)
+    if m is None:
+        raise ValueError(f"Unknown batch name: {batch!r}")
+    return int(m.group(1))
+
+
+def archived_batches() -> list[str]:
+    """Return archived batch names in chronological order."""
+    batches = []
+    if any(theme_path("batch1", t).exists() for t in THEME_SOURCES):
+        batches.append("batch1")
+    if ARCHIVE_DIR.is_dir():
+        for child in ARCHIVE_DIR.iterdir():
+            if child.is_dir() and _BATCH_DIR_RE.match(child.name):
+                batches.append(child.name)
+    return sorted(set(batches), key=batch_number)
+
+
+def list_batches() -> list[str]:
+    """Return every batch name, oldest first, with the live set last."""
+    return archived_batches() + [LIVE_BATCH]
+
+
+def next_batch_name() -> str:
+    """Return the archive name the live batch gets on its next rotation."""
+    archived = archived_batches()
+    last = batch_number(archived[-1]) if archived else 0
+    return f"batch{last + 1}"
+
+
+def question_id(batch: str, theme: str, index: int) -> str:
+    """Stable id of a question across every bank tool: "batch6/testing#12"."""
+    return f"{batch}/{theme}#{index}"
+
+
+def parse_question_id(qid: str) -> Tuple[str, str, int]:
+    """Split "batch6/testing#12" into ("batch6", "testing", 12)."""
+    try:
+        batch, rest = qid.split("/", 1)
+        theme, index = rest.split("#", 1)
+        return batch, theme, int(index)
+    except ValueError:
+        raise ValueError(f"Malformed question id: {qid!r} (expected batch/theme#index)") from None
+
+
+def batch_subtopic(batch: str, index: int) -> str:
+    """
+    Session-state subtopic of a question: the bare index for the live batch
+    ("12"), prefixed with the batch for an archived one ("batch3:12").
+    """
+    return str(index) if batch == LIVE_BATCH else f"{batch}:{index}"
+
+
+def parse_subtopic(subtopic: str) -> Tuple[str, int]:
+    """Split a subtopic from batch_subtopic() into (batch, index)."""
+    batch, sep, index = subtopic.rpartition(":")
+    try:
+        return (batch if sep else LIVE_BATCH), int(index)
+    except ValueError:
+        raise ValueError(f"subtopic must be a numeric index string, got: {subtopic!r}") from None
+
+
+def theme_path(batch: str, theme: str) -> Path:
+    stem, _ = THEME_SOURCES[theme]
+    return batch_dir(batch) / f"{stem}.py"
+
+
+def markdown_dir(batch: str) -> Path:
+    return batch_dir(batch) / MARKDOWN_DIRNAME
+
+
+def markdown_cache_file(batch: str) -> Path:
+    return CACHE_DIR / f"markdown_{batch}.json"
+
+
+# ─── Reading ──────────────────────────────────────────────────────────────────
+
+def read_theme_file(path: Path, varname: str) -> Tuple[str, list[str]]:
+    """
+    Parse one theme module and return (module docstring, question list).
+
+    Raises ValueError if the file does not parse or has no `varname` list.
+    """
+    import ast  # only needed when a module is actually read
+
+    src = path.read_text(encoding="utf-8")
+    try:
+        tree = ast.parse(src, filename=str(path))
+    except SyntaxError as exc:
+        raise ValueError(f"{path}: line {exc.lineno}: {exc.msg}") from None
+
+    doc = ast.get_docstring(tree) or ""
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name) and target.id == varname:
+                try:
+                    questions = ast.literal_eval(node.value)
+                except ValueError:
+                    raise ValueError(f"{path}: {varname} is not a literal list") from None
+                return doc, [q.strip() for q in questions]
+    raise ValueError(f"{path}: no {varname} list found")
+
+
+def compile_markdown(
+    batch: str, errors: list[str] | None = None
+) -> Tuple[Dict[str, list[dict]], dict]:
+    """Compile `batch`'s markdown questions (incrementally); see compile_dir()."""
+    return compile_dir(markdown_dir(batch), THEME_SOURCES, markdown_cache_file(batch), errors)
+
+
+def markdown_questions(batch: str, errors: list[str] | None = None) -> Dict[str, list[str]]:
+    """Return theme → question texts from `batch`'s markdown files only."""
+    records, _ = compile_markdown(batch, errors)
+    return {theme: [r["text"] for r in recs] for theme, recs in records.items()}
+
+
+def load_batch(
+    batch: str, errors: list[str] | None = None
+) -> Tuple[Dict[str, list[str]], Dict[str, str]]:
+    """
+    Read every theme module of `batch`, then its markdown questions.
+
+    Returns (theme → questions, theme → first docstring line). Themes with
+    neither a module nor markdown files are skipped. A module or markdown
+    file that fails to parse raises, unless an `errors` list is given — then
+    the message is appended and the module (or single file) skipped.
+    """
+    questions: Dict[str, list[str]] = {}
+    notes: Dict[str, str] = {}
+    markdown = markdown_questions(batch, errors)
+    for theme, (_, varname) in THEME_SOURCES.items():
+        path = theme_path(batch, theme)
+        if path.exists():
+            try:
+                doc, qs = read_theme_file(path, varname)
+            except ValueError as exc:
+                if errors is None:
+                    raise
+                errors.append(str(exc))
+                continue
+            questions[theme] = qs
+            notes[theme] = doc.splitlines()[0] if doc else ""
+        if theme in markdown:
+            questions.setdefault(theme, []).extend(markdown[theme])
+            notes.setdefault(theme, "")
+    return questions, notes
+
+
+def question_meta(batch: str, errors: list[str] | None = None) -> Dict[str, dict]:
+    """
+    Return question id → {"tags", "difficulty", "source"} for `batch`'s
+    markdown questions (Q_* list entries carry no metadata).
+    """
+    questions, _ = load_batch(batch, errors=[])
+    records, _ = compile_markdown(batch, errors)
+    meta = {}
+    for theme, recs in records.items():
+        first = len(questions.get(theme, [])) - len(recs)
+        for offset, r in enumerate(recs):
+            meta[question_id(batch, theme, first + offset)] = {
+                "tags": r["tags"], "difficulty": r["difficulty"], "source": r["source"],
+            }
+    return meta
@@ -0,0 +1,499 @@
+"""
+bank/stats.py — Corpus statistics over the metadata index, as HTML or Markdown.
+
+Everything is computed from index records (bank/index.py: theme, batch,
+chars, header kind, MinHash signature) plus each question's fenced code
+block languages, which are cached in .bank/code_stats.json by the index's
+content hash (the fingerprint ignores fence tags, so a block whose language
+changes would keep its old entry) — so only new or edited questions are
+ever read back as text.
+
+For every batch × theme (and per batch, per theme) the report gives:
+
+    length      mean / median / p90 / max characters
+    code        mean and max fenced blocks, questions without any
+    languages   block language mix
+    headers     header kind mix (task, debug, context, other)
+    duplicates  share of questions with a near duplicate anywhere in the
+                selection (MinHash similarity >= threshold, LSH banding as
+                in bank/diff.py), and the mean number of them
+
+Outliers are questions whose length or block count is far from their
+theme's (robust z-score, |0.6745 (x - median) / MAD| > OUTLIER_Z), plus the
+most near-duplicated questions.
+
+With NumPy installed the columns are arrays and every statistic is a
+vectorized group-by (bincount / lexsort); without it the same numbers come
+from plain Python, just slower. Both engines produce identical reports.
+"""
+
+import html
+import json
+import math
+import time
+from collections import Counter
+from typing import Dict, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from bank.codeblocks import extract_blocks
+from bank.diff import DEFAULT_THRESHOLD, LSH_BANDS
+from bank.fingerprint import MINHASH_BINS, minhash_from_hex
+from bank.source import CACHE_DIR, question_id
+
+CODE_STATS_FILE = CACHE_DIR / "code_stats.json"
+STATS_FILE = CACHE_DIR / "stats.html"
+
+# Bump when the cached per-question code summary changes shape
+CODE_STATS_VERSION = 2
+
+# Robust z-score above which a question is an outlier in its theme
+OUTLIER_Z = 3.5
+
+# Most near-duplicated questions listed in the report
+TOP_DUPLICATED = 15
+
+_ROWS = MINHASH_BINS // LSH_BANDS
+HEADER_ORDER = ("task", "debug", "context", "other")
+
+
+# ─── Metadata ─────────────────────────────────────────────────────────────────
+
+def _load_code_cache() -> Dict[str, list[str]]:
+    try:
+        data = json.loads(CODE_STATS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CODE_STATS_VERSION:
+        return {}
+    return data.get("langs", {})
+
+
+def _save_code_cache(cache: Dict[str, list[str]]) -> None:
+    CODE_STATS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CODE_STATS_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": CODE_STATS_VERSION, "langs": cache}), encoding="utf-8")
+    tmp.replace(CODE_STATS_FILE)
+
+
+def load_rows(batches: Iterable[str], errors: list[str] | None = None) -> list[dict]:
+    """
+    Index records of `batches`, each with "langs": its code block languages.
+    Only batches with questions missing from the code cache are read as text.
+    A live module that fails to parse raises, unless an `errors` list is
+    given — then its theme is skipped (see bank.index.live_entries).
+    """
+    from bank.index import backfill, batch_entries
+    from bank.pack import collect
+
+    backfill()
+    rows = [e for batch in batches for e in batch_entries(batch, errors)]
+    if rows and "hash" not in rows[0]:
+        raise ValueError("Archive index predates content hashes (run: python -m bank index --rebuild)")
+    cache = _load_code_cache()
+    missing = {e["batch"] for e in rows if e["hash"] not in cache}
+    for batch in sorted(missing):
+        texts = collect([batch], errors=[])
+        for e in rows:
+            if e["batch"] == batch and e["hash"] not in cache:
+                text = texts.get(question_id(batch, e["theme"], e["index"]), "")
+                cache[e["hash"]] = [lang for lang, _ in extract_blocks(text)]
+    if missing:
+        _save_code_cache(cache)
+    for e in rows:
+        e["langs"] = cache[e["hash"]]
+    return rows
+
+
+def _threshold_bins(threshold: float) -> int:
+    """Matching MinHash bins needed for a similarity of at least `threshold`."""
+    return math.ceil(threshold * MINHASH_BINS - 1e-9)
+
+
+# ─── Python engine ────────────────────────────────────────────────────────────
+
+def _near_duplicates_py(sigs: list[list[int]], need: int) -> list[int]:
+    """Per question, how many others share >= `need` MinHash bins with it."""
+    buckets: Dict[tuple, list[int]] = {}
+    for i, sig in enumerate(sigs):
+        for b in range(LSH_BANDS):
+            buckets.setdefault((b, *sig[b * _ROWS:(b + 1) * _ROWS]), []).append(i)
+    pairs = {
+        (members[x], members[y])
+        for members in buckets.values() if len(members) > 1
+        for x in range(len(members)) for y in range(x + 1, len(members))
+    }
+    counts = [0] * len(sigs)
+    for i, j in pairs:
+        if sum(a == b for a, b in zip(sigs[i], sigs[j])) >= need:
+            counts[i] += 1
+            counts[j] += 1
+    return counts
+
+
+def _pick(sorted_values: list, q: float):
+    n = len(sorted_values)
+    return sorted_values[min(int(n * q), n - 1)]
+
+
+def _groups_py(keys: list, chars: list[int], blocks: list[int], headers: list[str],
+               langs: list[list[str]], dups: list[int]) -> Dict[object, dict]:
+    members: Dict[object, list[int]] = {}
+    for i, key in enumerate(keys):
+        members.setdefault(key, []).append(i)
+    out = {}
+    for key, idx in members.items():
+        n = len(idx)
+        lengths = sorted(chars[i] for i in idx)
+        out[key] = {
+            "n": n,
+            "chars_mean": sum(lengths) / n,
+            "chars_median": _pick(lengths, 0.5),
+            "chars_p90": _pick(lengths, 0.9),
+            "chars_max": lengths[-1],
+            "blocks_mean": sum(blocks[i] for i in idx) / n,
+            "blocks_max": max(blocks[i] for i in idx),
+            "no_code": sum(1 for i in idx if blocks[i] == 0),
+            "headers": dict(Counter(headers[i] for i in idx)),
+            "langs": dict(Counter(lang for i in idx for lang in langs[i])),
+            "with_dups": sum(1 for i in idx if dups[i]),
+            "dups_mean": sum(dups[i] for i in idx) / n,
+        }
+    return out
+
+
+def _robust_z_py(keys: list, values: list[int]) -> list[float]:
+    """Robust z-score of each value within its key's group (0 where MAD is 0)."""
+    by_key: Dict[object, list[int]] = {}
+    for key, v in zip(keys, values):
+        by_key.setdefault(key, []).append(v)
+    centre = {}
+    for key, vs in by_key.items():
+        med = _pick(sorted(vs), 0.5)
+        mad = _pick(sorted(abs(v - med) for v in vs), 0.5)
+        centre[key] = (med, mad)
+    return [
+        0.6745 * (v - centre[key][0]) / centre[key][1] if centre[key][1] else 0.0
+        for key, v in zip(keys, values)
+    ]
+
+
+def _summarize_py(rows: list[dict], need: int) -> dict:
+    sigs = [minhash_from_hex(e["mh"]) for e in rows]
+    cols = {
+        "chars": [e["chars"] for e in rows],
+        "blocks": [len(e["langs"]) for e in rows],
+        "headers": [e["header"] for e in rows],
+        "langs": [e["langs"] for e in rows],
+        "dups": _near_duplicates_py(sigs, need),
+    }
+    themes = [e["theme"] for e in rows]
+    args = (cols["chars"], cols["blocks"], cols["headers"], cols["langs"], cols["dups"])
+    return {
+        "dups": cols["dups"],
+        "chars": cols["chars"],
+        "blocks": cols["blocks"],
+        "by_batch_theme": _groups_py([(e["batch"], e["theme"]) for e in rows], *args),
+        "by_batch": _groups_py([e["batch"] for e in rows], *args),
+        "by_theme": _groups_py(themes, *args),
+        "z_chars": _robust_z_py(themes, cols["chars"]),
+        "z_blocks": _robust_z_py(themes, cols["blocks"]),
+    }
+
+
+# ─── NumPy engine ─────────────────────────────────────────────────────────────
+
+def _near_duplicates_np(sigs, need: int):
+    """Vectorized _near_duplicates_py over an (N, MINHASH_BINS) uint32 array."""
+    n = len(sigs)
+    keys = []
+    for b in range(LSH_BANDS):
+        band = np.ascontiguousarray(sigs[:, b * _ROWS:(b + 1) * _ROWS])
+        band = band.view(np.dtype((np.void, band.dtype.itemsize * _ROWS))).ravel()
+        _, inverse, counts = np.unique(band, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        shared = np.nonzero(counts[inverse] > 1)[0]
+        if not len(shared):
+            continue
+        order = np.argsort(inverse[shared], kind="stable")
+        shared = shared[order]
+        _, starts, sizes = np.unique(inverse[shared], return_index=True, return_counts=True)
+        for start, size in zip(starts, sizes):
+            members = shared[start:start + size]
+            x, y = np.triu_indices(size, 1)
+            keys.append(members[x].astype(np.int64) * n + members[y])
+    dups = np.zeros(n, dtype=np.int64)
+    if not keys:
+        return dups
+    pairs = np.unique(np.concatenate(keys))
+    i, j = pairs // n, pairs % n
+    close = (sigs[i] == sigs[j]).sum(axis=1) >= need
+    dups += np.bincount(i[close], minlength=n)
+    dups += np.bincount(j[close], minlength=n)
+    return dups
+
+
+def _codes(values: list):
+    """(labels in first-seen order, int code per value)."""
+    labels = list(dict.fromkeys(values))
+    index = {v: k for k, v in enumerate(labels)}
+    return labels, np.fromiter((index[v] for v in values), dtype=np.int64, count=len(values))
+
+
+def _percentiles_np(gid, counts, values, qs):
+    """Per group, the value at sorted position min(int(n * q), n - 1) for each q."""
+    order = np.lexsort((values, gid))
+    ranked = values[order]
+    starts = np.cumsum(counts) - counts
+    return [ranked[starts + np.minimum((counts * q).astype(np.int64), counts - 1)] for q in qs]
+
+
+def _groups_np(keys: list, chars, blocks, header_codes, header_labels, lang_matrix,
+               lang_labels, dups) -> Dict[object, dict]:
+    labels, gid = _codes(keys)
+    g = len(labels)
+    counts = np.bincount(gid, minlength=g)
+    median, p90 = _percentiles_np(gid, counts, chars, (0.5, 0.9))
+    chars_max = np.zeros(g, dtype=np.int64)
+    np.maximum.at(chars_max, gid, chars)
+    blocks_max = np.zeros(g, dtype=np.int64)
+    np.maximum.at(blocks_max, gid, blocks)
+    header_counts = np.bincount(gid * len(header_labels) + header_codes,
+                                minlength=g * len(header_labels)).reshape(g, -1)
+    lang_counts = np.zeros((g, len(lang_labels)), dtype=np.int64)
+    np.add.at(lang_counts, gid, lang_matrix)
+    sums = {
+        "chars": np.bincount(gid, weights=chars, minlength=g),
+        "blocks": np.bincount(gid, weights=blocks, minlength=g),
+        "no_code": np.bincount(gid, weights=blocks == 0, minlength=g),
+        "with_dups": np.bincount(gid, weights=dups > 0, minlength=g),
+        "dups": np.bincount(gid, weights=dups, minlength=g),
+    }
+    out = {}
+    for k, key in enumerate(labels):
+        n = int(counts[k])
+        out[key] = {
+            "n": n,
+            "chars_mean": float(sums["chars"][k]) / n,
+            "chars_median": int(median[k]),
+            "chars_p90": int(p90[k]),
+            "chars_max": int(chars_max[k]),
+            "blocks_mean": float(sums["blocks"][k]) / n,
+            "blocks_max": int(blocks_max[k]),
+            "no_code": int(sums["no_code"][k]),
+            "headers": {h: int(c) for h, c in zip(header_labels, header_counts[k]) if c},
+            "langs": {lang: int(c) for lang, c in zip(lang_labels, lang_counts[k]) if c},
+            "with_dups": int(sums["with_dups"][k]),
+            "dups_mean": float(sums["dups"][k]) / n,
+        }
+    return out
+
+
+def _robust_z_np(keys: list, values):
+    labels, gid = _codes(keys)
+    counts = np.bincount(gid, minlength=len(labels))
+    (median,) = _percentiles_np(gid, counts, values, (0.5,))
+    (mad,) = _percentiles_np(gid, counts, np.abs(values - median[gid]), (0.5,))
+    scale = mad[gid].astype(np.float64)
+    z = np.zeros(len(values))
+    np.divide(0.6745 * (values - median[gid]), scale, out=z, where=scale > 0)
+    return z
+
+
+def _summarize_np(rows: list[dict], need: int) -> dict:
+    packed = bytes.fromhex("".join(e["mh"] for e in rows))
+    sigs = np.frombuffer(packed, dtype=">u4").astype(np.uint32).reshape(-1, MINHASH_BINS)
+    chars = np.fromiter((e["chars"] for e in rows), dtype=np.int64, count=len(rows))
+    blocks = np.fromiter((len(e["langs"]) for e in rows), dtype=np.int64, count=len(rows))
+    header_labels, header_codes = _codes([e["header"] for e in rows])
+    lang_labels = sorted({lang for e in rows for lang in e["langs"]})
+    lang_index = {lang: k for k, lang in enumerate(lang_labels)}
+    lang_matrix = np.zeros((len(rows), len(lang_labels)), dtype=np.int64)
+    for i, e in enumerate(rows):
+        for lang in e["langs"]:
+            lang_matrix[i, lang_index[lang]] += 1
+    dups = _near_duplicates_np(sigs, need)
+    themes = [e["theme"] for e in rows]
+    args = (chars, blocks, header_codes, header_labels, lang_matrix, lang_labels, dups)
+    return {
+        "dups": dups.tolist(),
+        "chars": chars.tolist(),
+        "blocks": blocks.tolist(),
+        "by_batch_theme": _groups_np([(e["batch"], e["theme"]) for e in rows], *args),
+        "by_batch": _groups_np([e["batch"] for e in rows], *args),
+        "by_theme": _groups_np(themes, *args),
+        "z_chars": _robust_z_np(themes, chars).tolist(),
+        "z_blocks": _robust_z_np(themes, blocks).tolist(),
+    }
+
+
+# ─── Report ───────────────────────────────────────────────────────────────────
+
+def corpus_stats(rows: list[dict], threshold: float = DEFAULT_THRESHOLD,
+                 use_numpy: bool = True, skipped: Iterable[str] = ()) -> dict:
+    """
+    Distributions, near-duplicate density and outliers of `rows` (see
+    load_rows). `skipped` lists the modules left out, for the report.
+    """
+    start = time.perf_counter()
+    engine = "numpy" if use_numpy and np is not None else "python"
+    need = _threshold_bins(threshold)
+    stats = (_summarize_np if engine == "numpy" else _summarize_py)(rows, need)
+
+    ids = [question_id(e["batch"], e["theme"], e["index"]) for e in rows]
+    outliers = []
+    for metric, z_key, values in (("chars", "z_chars", stats["chars"]),
+                                  ("blocks", "z_blocks", stats["blocks"])):
+        for i, z in enumerate(stats[z_key]):
+            if abs(z) > OUTLIER_Z:
+                outliers.append({
+                    "id": ids[i], "metric": metric, "value": values[i],
+                    "median": stats["by_theme"][rows[i]["theme"]][f"{metric}_median"]
+                    if metric == "chars" else None,
+                    "z": round(z, 1),
+                })
+    outliers.sort(key=lambda o: -abs(o["z"]))
+    ranked = sorted(range(len(rows)), key=lambda i: (-stats["dups"][i], ids[i]))
+    duplicated = [{"id": ids[i], "near": stats["dups"][i]}
+                  for i in ranked[:TOP_DUPLICATED] if stats["dups"][i]]
+    return {
+        "engine": engine,
+        "threshold": threshold,
+        "questions": len(rows),
+        "by_batch_theme": stats["by_batch_theme"],
+        "by_batch": stats["by_batch"],
+        "by_theme": stats["by_theme"],
+        "outliers": outliers,
+        "duplicated": duplicated,
+        "skipped": list(skipped),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _mix(counts: dict, total: int, limit: int = 4) -> str:
+    """ "ts 52%, css 20%, ..." for the largest entries of `counts`."""
+    if not total:
+        return "-"
+    top = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+    return ", ".join(f"{k} {v / total:.0%}" for k, v in top)
+
+
+def _table_rows(groups: Dict[object, dict]) -> list[list[str]]:
+    rows = []
+    for key, g in groups.items():
+        label = " / ".join(key) if isinstance(key, tuple) else key
+        blocks = sum(g["langs"].values())
+        rows.append([
+            label, str(g["n"]),
+            f"{g['chars_mean']:,.0f}", f"{g['chars_median']:,}", f"{g['chars_p90']:,}", f"{g['chars_max']:,}",
+            f"{g['blocks_mean']:.1f}", str(g["no_code"]),
+            _mix(g["langs"], blocks), _mix(g["headers"], g["n"], limit=len(HEADER_ORDER)),
+            f"{g['with_dups'] / g['n']:.0%}", f"{g['dups_mean']:.2f}",
+        ])
+    return rows
+
+
+TABLE_HEAD = ["group", "n", "chars mean", "median", "p90", "max", "blocks", "no code",
+              "languages", "headers", "near-dup", "dups/q"]
+
+
+def _sections(report: dict) -> list[tuple[str, list[list[str]]]]:
+    return [
+        ("By batch", _table_rows(report["by_batch"])),
+        ("By theme", _table_rows(dict(sorted(report["by_theme"].items())))),
+        ("By batch and theme", _table_rows(report["by_batch_theme"])),
+    ]
+
+
+def _summary_line(report: dict) -> str:
+    return (f"{report['questions']:,} questions · near duplicates at MinHash similarity "
+            f">= {report['threshold']} · outliers at |robust z| > {OUTLIER_Z} · "
+            f"{report['engine']} engine, {report['seconds'] * 1000:.0f} ms")
+
+
+def render_markdown(report: dict) -> str:
+    lines = ["# Question bank statistics", "", _summary_line(report), ""]
+    if report["skipped"]:
+        lines += ["Skipped (could not be read):", ""]
+        lines += [f"- `{err}`" for err in report["skipped"]]
+        lines.append("")
+    for title, rows in _sections(report):
+        lines += [f"## {title}", "", "| " + " | ".join(TABLE_HEAD) + " |",
+                  "|" + "---|" * len(TABLE_HEAD)]
+        lines += ["| " + " | ".join(row) + " |" for row in rows]
+        lines.append("")
+    lines += ["## Outliers", ""]
+    if report["outliers"]:
+        lines += ["| question | metric | value | theme median | z |", "|---|---|---|---|---|"]
+        lines += [f"| {o['id']} | {o['metric']} | {o['value']:,} | "
+                  f"{'' if o['median'] is None else format(o['median'], ',')} | {o['z']} |"
+                  for o in report["outliers"]]
+    else:
+        lines.append("None.")
+    lines += ["", "## Most near-duplicated", ""]
+    if report["duplicated"]:
+        lines += ["| question | near duplicates |", "|---|---|"]
+        lines += [f"| {d['id']} | {d['near']} |" for d in report["duplicated"]]
+    else:
+        lines.append("None.")
+    return "\n".join(lines) + "\n"
+
+
+_CSS = """
+body { font: 14px/1.4 system-ui, sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin-bottom: 2em; }
+th, td { padding: 3px 8px; border-bottom: 1px solid #ddd; text-align: right; white-space: nowrap; }
+th:first-child, td:first-child, td.text { text-align: left; }
+th { background: #f4f4f4; position: sticky; top: 0; }
+.bar { display: inline-block; height: 8px; background: #d9534f; margin-right: 4px; }
+.meta { color: #666; }
+"""
+
+
+def render_html(report: dict) -> str:
+    esc = html.escape
+    parts = ["<!DOCTYPE html>", "<html><head><meta charset='utf-8'>",
+             "<title>Question bank statistics</title>", f"<style>{_CSS}</style></head><body>",
+             "<h1>Question bank statistics</h1>", f"<p class='meta'>{esc(_summary_line(report))}</p>"]
+    if report["skipped"]:
+        parts.append("<p class='meta'>Skipped (could not be read):</p><ul class='meta'>"
+                     + "".join(f"<li><code>{esc(err)}</code></li>" for err in report["skipped"])
+                     + "</ul>")
+    text_cols = {0, 8, 9}
+    for title, rows in _sections(report):
+        parts.append(f"<h2>{esc(title)}</h2><table><tr>"
+                     + "".join(f"<th>{esc(h)}</th>" for h in TABLE_HEAD) + "</tr>")
+        for row in rows:
+            cells = []
+            for k, cell in enumerate(row):
+                if k == 10:  # near-dup share, with a bar
+                    width = int(cell.rstrip("%"))
+                    cells.append(f"<td><span class='bar' style='width:{width}px'></span>{esc(cell)}</td>")
+                else:
+                    cls = " class='text'" if k in text_cols else ""
+                    cells.append(f"<td{cls}>{esc(cell)}</td>")
+            parts.append("<tr>" + "".join(cells) + "</tr>")
+        parts.append("</table>")
+    parts.append("<h2>Outliers</h2>")
+    if report["outliers"]:
+        parts.append("<table><tr><th>question</th><th>metric</th><th>value</th>"
+                     "<th>theme median</th><th>z</th></tr>")
+        for o in report["outliers"]:
+            median = "" if o["median"] is None else f"{o['median']:,}"
+            parts.append(f"<tr><td>{esc(o['id'])}</td><td class='text'>{o['metric']}</td>"
+                         f"<td>{o['value']:,}</td><td>{median}</td><td>{o['z']}</td></tr>")
+        parts.append("</table>")
+    else:
+        parts.append("<p>None.</p>")
+    parts.append("<h2>Most near-duplicated</h2>")
+    if report["duplicated"]:
+        parts.append("<table><tr><th>question</th><th>near duplicates</th></tr>")
+        parts += [f"<tr><td>{esc(d['id'])}</td><td>{d['near']}</td></tr>" for d in report["duplicated"]]
+        parts.append("</table>")
+    else:
+        parts.append("<p>None.</p>")
+    parts.append("</body></html>")
+    return "\n".join(parts) + "\n"
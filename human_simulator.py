@@ -1,26 +1,69 @@
 """
 human_simulator.py — OS-level keyboard automation using pyautogui + pyperclip.
 Uses clipboard paste for instant question delivery instead of char-by-char typing.
+
+Every random delay is drawn from one module-level generator, in a fixed
+order per question (see draw_timings()). seed() makes the whole sequence
+reproducible (main.py --seed), and a dry run can draw the same "virtual"
+timings without touching the keyboard. pyautogui is only imported once a
+keyboard or mouse action actually runs.
+
+Countdowns go through session_log: redrawn at most once a second on a
+terminal, and not at all when output is redirected.
 """
 
 import time
 import random
-import sys
-import pyautogui
-import pyperclip
+from functools import lru_cache
 
+import session_log
 from config import (
     WAIT_MIN_SECONDS,
     WAIT_MAX_SECONDS,
 )
 
-# pyautogui safety
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0
-
 # Saved position of the chat input box — captured during countdown
 _INPUT_POS: tuple[int, int] | None = None
 
+# Source of every random delay below
+_rng = random.Random()
+
+
+@lru_cache(maxsize=None)
+def _gui():
+    """Import and configure pyautogui + pyperclip on first use."""
+    import pyautogui
+    import pyperclip
+
+    # pyautogui safety
+    pyautogui.FAILSAFE = True
+    pyautogui.PAUSE = 0
+    return pyautogui, pyperclip
+
+
+# ─── Timing draws ─────────────────────────────────────────────────────────────
+
+def seed(value) -> None:
+    """Reseed the delay generator (any value random.Random accepts)."""
+    _rng.seed(value)
+
+
+def draw_timings(idle: bool = True,
+                 min_seconds: int = WAIT_MIN_SECONDS,
+                 max_seconds: int = WAIT_MAX_SECONDS) -> dict:
+    """
+    Draw every random delay of one question, always in the same order:
+    the two click delays, the pause before Enter, then (if `idle`) the wait
+    before the next question.
+    """
+    return {
+        "click": (_rng.uniform(0.3, 0.6), _rng.uniform(0.2, 0.4)),
+        "enter": _rng.uniform(0.3, 0.7),
+        "idle":  _rng.randint(min_seconds, max_seconds) if idle else None,
+    }
+
+
+# ─── Keyboard / mouse ─────────────────────────────────────────────────────────
 
 def type_humanly(text: str) -> None:
     """
@@ -30,6 +73,7 @@ def type_humanly(text: str) -> None:
     and pasted with Ctrl+V. Between lines, Shift+Enter inserts a newline
     without submitting. This avoids slow char-by-char typing entirely.
     """
+    pyautogui, pyperclip = _gui()
     lines = text.split("\n")
     for i, line in enumerate(lines):
         # Copy line to clipboard and paste it
@@ -43,9 +87,12 @@ def type_humanly(text: str) -> None:
             time.sleep(0.05)
 
 
-def press_enter() -> None:
-    """Press the Enter key to submit the message."""
-    time.sleep(random.uniform(0.3, 0.7))  # brief pause before submitting
+def press_enter(delay: float | None = None) -> None:
+    """Press the Enter key to submit the message (after `delay`, default: drawn)."""
+    pyautogui, _ = _gui()
+    if delay is None:
+        delay = _rng.uniform(0.3, 0.7)
+    time.sleep(delay)  # brief pause before submitting
     pyautogui.press("enter")
 
 
@@ -55,43 +102,53 @@ def countdown(seconds: int) -> None:
     Captures the mouse position at the end so we can re-click it automatically.
     """
     global _INPUT_POS
-    print(f"\n[WAIT] You have {seconds} seconds to click into the chat input box...")
-    for remaining in range(seconds, 0, -1):
-        sys.stdout.write(f"\r   > Starting in {remaining:2d} seconds...  ")
-        sys.stdout.flush()
-        time.sleep(1)
+    pyautogui, _ = _gui()
+    log = session_log.current()
+    log.record("wait", seconds=seconds)
+    _count_down(log, seconds, "   > Starting in {remaining:2d} seconds...")
     # Snapshot the cursor position — user should be hovering over / inside the input now
     _INPUT_POS = pyautogui.position()
-    sys.stdout.write(f"\r   > Typing now! (input locked at {_INPUT_POS.x},{_INPUT_POS.y})   \n\n")
-    sys.stdout.flush()
+    log.record("locked", x=_INPUT_POS.x, y=_INPUT_POS.y)
+    log.flush()
 
 
-def click_input() -> None:
+def click_input(delays: tuple[float, float] | None = None) -> None:
     """
     Click the saved input box position to re-focus it.
     Called automatically before every question after the first.
+    `delays` are the pauses before and after the click (default: drawn).
     """
     if _INPUT_POS is None:
         return  # no position saved yet (e.g. dry-run)
-    time.sleep(random.uniform(0.3, 0.6))  # small natural delay before clicking
+    pyautogui, _ = _gui()
+    if delays is None:
+        delays = (_rng.uniform(0.3, 0.6), _rng.uniform(0.2, 0.4))
+    time.sleep(delays[0])  # small natural delay before clicking
     pyautogui.click(_INPUT_POS.x, _INPUT_POS.y)
-    time.sleep(random.uniform(0.2, 0.4))  # let the UI register the focus
+    time.sleep(delays[1])  # let the UI register the focus
 
 
-def random_idle(min_seconds: int = WAIT_MIN_SECONDS, max_seconds: int = WAIT_MAX_SECONDS) -> None:
+def random_idle(min_seconds: int = WAIT_MIN_SECONDS, max_seconds: int = WAIT_MAX_SECONDS,
+                wait: int | None = None) -> None:
     """
-    Wait a random duration between questions.
+    Wait a random duration between questions (or exactly `wait` seconds).
     Displays a live countdown in the terminal so the user knows what's happening.
     """
-    wait = random.randint(min_seconds, max_seconds)
-    minutes, seconds = divmod(wait, 60)
-    print(f"\n[IDLE] Waiting {minutes}m {seconds}s before next question...")
-
-    for remaining in range(wait, 0, -1):
-        m, s = divmod(remaining, 60)
-        sys.stdout.write(f"\r   Next question in: {m:02d}:{s:02d}  ")
-        sys.stdout.flush()
+    if wait is None:
+        wait = _rng.randint(min_seconds, max_seconds)
+    log = session_log.current()
+    log.record("idle", seconds=wait)
+    _count_down(log, wait, "   Next question in: {minutes:02d}:{seconds:02d}")
+
+
+def _count_down(log: session_log.Logger, total: int, template: str) -> None:
+    """Sleep `total` seconds, redrawing `template` each second on a terminal."""
+    log.flush()
+    if not log.live_progress:
+        time.sleep(total)  # nothing to redraw: one sleep, no per-second writes
+        return
+    for remaining in range(total, 0, -1):
+        minutes, seconds = divmod(remaining, 60)
+        log.progress(template.format(remaining=remaining, minutes=minutes, seconds=seconds))
         time.sleep(1)
-
-    sys.stdout.write("\r                              \n")
-    sys.stdout.flush()
+    log.record("message", text="")
@@ -8,6 +8,15 @@ Usage:
     python main.py --countdown 15         # 15 second countdown before typing starts
     python main.py --difficulty 5         # question intensity (1-5, cosmetic label)
     python main.py --reset                # wipe saved state and start a fresh cycle
+    python main.py --db                   # keep state + asked history in .bank/bank.sqlite3
+    python main.py --templates            # also ask questions composed from snippet templates
+    python main.py --lean                 # keep the bank on disk, decode one question at a time
+    python main.py --batches live,batch3  # also ask questions from archived batches
+    python main.py --token-budget 20000   # plan the session to fit ~20k tokens
+    python main.py --filters my_filters.json  # block / allow lists (default: question_filters.json)
+    python main.py --dry-run --seed 42    # reproducible order + virtual timings
+    python main.py --plugin my_metrics    # subscribe a plugin to the session events
+    python main.py --log-format jsonl --log-file session.jsonl
     python main.py --dry-run --questions 3 --difficulty 4
 """
 
@@ -15,8 +24,9 @@ import argparse
 import sys
 
 from config import DEFAULT_MAX_QUESTIONS, DEFAULT_COUNTDOWN_SECONDS, DEFAULT_DIFFICULTY
-from session_memory import SessionMemory
-import question_generator as qgen
+
+# Everything else is imported inside main(), after argument parsing, so
+# --help and bad arguments return immediately (see _bench_import.py).
 
 # ---------------------------------------------------------------------------
 # CLI
@@ -55,6 +65,53 @@ Examples:
         "--reset", "-r", action="store_true",
         help="Delete saved session state and start a fresh question cycle"
     )
+    parser.add_argument(
+        "--db", nargs="?", const="", default=None, metavar="PATH",
+        help="Keep session state and asked history in a SQLite store "
+             "(default path: .bank/bank.sqlite3)"
+    )
+    parser.add_argument(
+        "--templates", action="store_true",
+        help="Add questions composed from snippets/templates.py to the pool"
+    )
+    parser.add_argument(
+        "--batches", default=None, metavar="LIST",
+        help="Comma-separated batches to ask from, e.g. live,batch3, or 'all' "
+             "(default: live; archived batches are served from .bank/bank.pack)"
+    )
+    parser.add_argument(
+        "--token-budget", type=int, default=None, metavar="TOKENS",
+        help="Plan the session to fit this many (approximate) tokens in total; "
+             "--questions becomes the upper limit"
+    )
+    parser.add_argument(
+        "--filters", default=None, metavar="PATH",
+        help="Block/allow lists by fingerprint, tag, batch or id "
+             "(default: question_filters.json, if present; see bank/filters.py)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Seed the question order and every simulated delay; the same seed and "
+             "saved state give the same session (dry runs print the virtual timings)"
+    )
+    parser.add_argument(
+        "--plugin", action="append", default=[], metavar="MODULE",
+        help="Import MODULE and call its register(bus) to hook session events "
+             "(repeatable; see session_events.py)"
+    )
+    parser.add_argument(
+        "--log-format", choices=["tty", "jsonl"], default="tty",
+        help="tty: human console layout; jsonl: one JSON record per event (default: tty)"
+    )
+    parser.add_argument(
+        "--log-file", default=None, metavar="PATH",
+        help="Write the session log to PATH (UTF-8) instead of stdout"
+    )
+    parser.add_argument(
+        "--lean", nargs="?", const="", default=None, metavar="PACK",
+        help="Serve questions from a memory-mapped pack instead of importing every list "
+             "(default path: .bank/live.pack, rebuilt when the live batch changes)"
+    )
     return parser.parse_args()
 
 
@@ -78,71 +135,188 @@ DIFFICULTY_LABELS = {
 def main() -> None:
     args = parse_args()
 
+    import contextlib
+    import session_log
+
+    log_file = open(args.log_file, "w", encoding="utf-8") if args.log_file else None
+    log = session_log.configure(args.log_format, log_file)
+    with contextlib.ExitStack() as stack:
+        if log_file is not None:
+            stack.enter_context(log_file)
+        # print() from other modules ("[Memory] ...") goes through the log too,
+        # so it stays in order with the buffered records and in the same file
+        stack.enter_context(contextlib.redirect_stdout(log.capture()))
+        stack.callback(log.flush)
+        run(args, log)
+
+
+def run(args: argparse.Namespace, log) -> None:
+    import random
+    from pathlib import Path
+    from session_events import EventBus, load_plugin
+    from session_memory import SessionMemory
+    import question_generator as qgen
+
+    bus = EventBus()
+    for name in args.plugin:
+        try:
+            load_plugin(bus, name)
+        except ValueError as exc:
+            log.record("error", message=str(exc))
+            log.flush()
+            sys.exit(1)
+
+    store = None
+    if args.db is not None:
+        from bank.store import BankStore, DB_FILE
+        store = BankStore(Path(args.db) if args.db else DB_FILE)
+
     # Handle --reset before creating SessionMemory (which loads state)
     if args.reset:
-        from session_memory import _STATE_FILE
-        if _STATE_FILE.exists():
-            _STATE_FILE.unlink()
-            print("[*] Session state wiped. Starting a fresh question cycle.\n")
+        from session_memory import _STATE_FILE, _PENDING_FILE
+        wiped = store.clear_state() if store is not None else False
+        for path in (_STATE_FILE, _PENDING_FILE):
+            if path.exists():
+                path.unlink()
+                wiped = True
+        if wiped:
+            log.record("notice", message="Session state wiped. Starting a fresh question cycle.")
         else:
-            print("[*] No saved state found — already starting fresh.\n")
+            log.record("notice", message="No saved state found — already starting fresh.")
 
-    memory = SessionMemory()
+    if args.lean is not None:
+        if qgen.use_pack(Path(args.lean) if args.lean else None):
+            log.record("notice", message="Live pack rebuilt from snippets/.")
 
-    SEP = "=" * 60
-    DIV = "-" * 60
-
-    print(SEP)
-    print("  [*] Frontend Question Automation System")
-    print(f"  Mode      : {'DRY RUN (no typing)' if args.dry_run else 'LIVE (keyboard control)'}")
-    print(f"  Questions : {args.questions}")
-    print(f"  Difficulty: {args.difficulty} - {DIFFICULTY_LABELS[args.difficulty]}")
-    print(f"  Countdown : {args.countdown}s")
-    print(SEP)
+    batches = None
+    if args.batches is not None:
+        from bank.source import LIVE_BATCH, list_batches
+        known = list_batches()
+        if args.batches == "all":
+            batches = known
+        else:
+            batches = list(dict.fromkeys(b.strip() for b in args.batches.split(",") if b.strip()))
+        unknown = [b for b in batches if b not in known]
+        if unknown or not batches:
+            log.record("error", message=f"Unknown batch(es) in --batches {args.batches!r} "
+                                        f"(available: {', '.join(known)})")
+            log.flush()
+            sys.exit(1)
+        if any(b != LIVE_BATCH for b in batches) and qgen.use_bank(batches):
+            log.record("notice", message="Bank pack rebuilt from every batch.")
 
-    if not args.dry_run:
+    # One generator per component, each derived from --seed, so e.g. a change
+    # in how many delays are drawn never shifts the question order
+    memory_rng = random.Random(f"{args.seed}:memory") if args.seed is not None else None
+    filters = None
+    try:
+        from bank.filters import FILTER_FILE, load_rules, rule_count
+        filters = load_rules(Path(args.filters) if args.filters else FILTER_FILE)
+        if filters is None and args.filters:
+            raise ValueError(f"Filter file not found: {args.filters}")
+        memory = SessionMemory(store=store, templates=args.templates, rng=memory_rng,
+                               batches=batches, filters=filters)
+    except ValueError as exc:
+        log.record("error", message=str(exc))
+        log.flush()
+        sys.exit(1)
+    planned = None
+    if args.token_budget is not None:
+        planned = memory.plan_tokens(args.token_budget, args.questions)
+        if not planned["questions"]:
+            log.record("error", message=f"No question fits a budget of {args.token_budget:,} tokens.")
+            log.flush()
+            sys.exit(1)
+        args.questions = planned["questions"]
+    if args.seed is not None or not args.dry_run:
         # Import here so dry-run works even if pyautogui is missing
         import human_simulator as hs
+        if args.seed is not None:
+            hs.seed(f"{args.seed}:simulator")
+    virtual_seconds = 0.0
+
+    rows = [
+        ("Mode", "DRY RUN (no typing)" if args.dry_run else "LIVE (keyboard control)"),
+        ("Questions", args.questions),
+        ("Difficulty", f"{args.difficulty} - {DIFFICULTY_LABELS[args.difficulty]}"),
+        ("Countdown", f"{args.countdown}s"),
+    ]
+    if args.seed is not None:
+        rows.append(("Seed", args.seed))
+    if args.lean is not None:
+        rows.append(("Bank", "memory-mapped pack (lean)"))
+    if batches is not None:
+        rows.append(("Batches", ", ".join(batches)))
+    if filters:
+        rows.append(("Filters", f"{rule_count(filters)} rule(s)"))
+    if planned is not None:
+        rows.append(("Token budget", f"{args.token_budget:,} (planned <= {planned['tokens']:,})"))
+    log.record("banner", title="Frontend Question Automation System", rows=rows)
+
+    if not args.dry_run:
+        log.flush()
         hs.countdown(args.countdown)
     else:
-        print("\n[DRY RUN] No keyboard actions will be taken.\n")
+        log.record("dry_run")
 
+    bus.session_start(questions=args.questions, dry_run=args.dry_run, seed=args.seed)
+    sent = 0
+    tokens_sent = 0
     for q_num in range(1, args.questions + 1):
         theme, subtopic = memory.pick_next_theme()
-
-        print(DIV)
-        print(f"  Q{q_num:02d}/{args.questions:02d} | Theme: {theme} > {subtopic}")
-        print(f"  {memory.stats()}")
-        print(DIV)
+        bus.picked(q_num=q_num, theme=theme, subtopic=subtopic)
+        log.record("picked", q_num=q_num, total=args.questions, theme=theme, subtopic=subtopic,
+                   stats=memory.stats())
 
         try:
             question = qgen.generate(theme, subtopic)
         except Exception as e:
-            print(f"  [ERROR] Failed to generate question: {e}")
-            memory.mark_used(theme, subtopic)
+            log.record("error", message=f"Failed to generate question: {e}")
+            memory.skip(theme, subtopic)  # out of this cycle, but never asked
             continue
+        bus.generated(q_num=q_num, theme=theme, subtopic=subtopic, question=question)
+        if planned is not None:
+            tokens_sent += memory.token_count(theme, subtopic) or 0
 
-        memory.mark_used(theme, subtopic)
+        timings = None
+        if args.seed is not None or not args.dry_run:
+            timings = hs.draw_timings(idle=q_num < args.questions)
 
         if args.dry_run:
-            print()
-            print(question)
-            print()
+            memory.mark_used(theme, subtopic)
+            sent += 1
+            bus.sent(q_num=q_num, theme=theme, subtopic=subtopic, dry_run=True)
+            log.record("question", text=question)
+            if timings is not None:
+                spent = sum(timings["click"]) + timings["enter"] + (timings["idle"] or 0)
+                virtual_seconds += spent
+                log.record("virtual", click=timings["click"], enter=timings["enter"],
+                           idle=timings["idle"] or 0)
+                if timings["idle"] is not None:
+                    bus.idle_start(q_num=q_num, seconds=timings["idle"], virtual=True)
         else:
-            import human_simulator as hs
-            print("  [Clicking input to re-focus...]")
-            hs.click_input()
-            print("  [Typing...]")
+            memory.record_intent(theme, subtopic)
+            log.record("step", message="Clicking input to re-focus...")
+            log.flush()
+            hs.click_input(timings["click"])
+            log.record("step", message="Typing...")
+            log.flush()
             hs.type_humanly(question)
-            hs.press_enter()
-            print("  [Enter pressed OK]")
+            hs.press_enter(timings["enter"])
+            memory.record_sent(theme, subtopic)
+            memory.mark_used(theme, subtopic)
+            sent += 1
+            bus.sent(q_num=q_num, theme=theme, subtopic=subtopic, dry_run=False)
+            log.record("step", message="Enter pressed OK")
 
-            if q_num < args.questions:
-                hs.random_idle()
+            if timings["idle"] is not None:
+                bus.idle_start(q_num=q_num, seconds=timings["idle"], virtual=False)
+                hs.random_idle(wait=timings["idle"])
 
-    print("\n" + SEP)
-    print(f"  [DONE] Session complete - {args.questions} question(s) sent.")
-    print(SEP + "\n")
+    bus.session_end(sent=sent, virtual_seconds=virtual_seconds)
+    log.record("done", sent=sent,
+               virtual_seconds=virtual_seconds if args.dry_run and args.seed is not None else None,
+               tokens=tokens_sent if planned is not None else None, token_budget=args.token_budget)
 
 
 if __name__ == "__main__":
@@ -3,31 +3,140 @@ question_generator.py - Returns questions from the expanded 252-question bank.
 
 Each theme has 28 questions pre-written in its snippets/q_<theme>.py file.
 The generate() function picks a question by index from the correct list.
+Subtopics starting with "tpl:" are rendered by question_templates instead.
 No LLM API required.
+
+By default the theme lists are imported on first use and stay resident.
+After use_pack() (main.py --lean) the bank stays on disk in a memory-mapped
+pack instead, and only the question being asked is ever decoded.
+
+Archived batches are served the same way, from the compiled bank of every
+batch (.bank/bank.pack, see bank/pack.py); their subtopics carry the batch
+("batch3:12"), so their modules are never imported.
 """
 
-from snippets.q_react       import Q_REACT
-from snippets.q_performance  import Q_PERFORMANCE
-from snippets.q_nextjs       import Q_NEXTJS
-from snippets.q_typescript   import Q_TYPESCRIPT
-from snippets.q_architecture import Q_ARCHITECTURE
-from snippets.q_debugging    import Q_DEBUGGING
-from snippets.q_state        import Q_STATE
-from snippets.q_css          import Q_CSS
-from snippets.q_testing      import Q_TESTING
-
-# Map theme name → question list
-_THEME_QUESTIONS: dict[str, list[str]] = {
-    "react_internals":  Q_REACT,
-    "performance":      Q_PERFORMANCE,
-    "nextjs_advanced":  Q_NEXTJS,
-    "typescript":       Q_TYPESCRIPT,
-    "architecture":     Q_ARCHITECTURE,
-    "debugging":        Q_DEBUGGING,
-    "state_management": Q_STATE,
-    "css_rendering":    Q_CSS,
-    "testing":          Q_TESTING,
-}
+from functools import lru_cache
+
+from bank.source import LIVE_BATCH, THEME_SOURCES, markdown_questions, parse_subtopic, question_id
+
+# Memory-mapped live pack (bank.pack.PackReader) when running lean
+_pack = None
+# Memory-mapped pack of every batch, opened once an archived batch is asked
+_bank = None
+
+
+@lru_cache(maxsize=None)
+def _theme_questions() -> dict[str, list[str]]:
+    """Map theme name → question list (imported once, on first use)."""
+    from snippets.q_react       import Q_REACT
+    from snippets.q_performance  import Q_PERFORMANCE
+    from snippets.q_nextjs       import Q_NEXTJS
+    from snippets.q_typescript   import Q_TYPESCRIPT
+    from snippets.q_architecture import Q_ARCHITECTURE
+    from snippets.q_debugging    import Q_DEBUGGING
+    from snippets.q_state        import Q_STATE
+    from snippets.q_css          import Q_CSS
+    from snippets.q_testing      import Q_TESTING
+
+    mapping = {
+        "react_internals":  Q_REACT,
+        "performance":      Q_PERFORMANCE,
+        "nextjs_advanced":  Q_NEXTJS,
+        "typescript":       Q_TYPESCRIPT,
+        "architecture":     Q_ARCHITECTURE,
+        "debugging":        Q_DEBUGGING,
+        "state_management": Q_STATE,
+        "css_rendering":    Q_CSS,
+        "testing":          Q_TESTING,
+    }
+    # One-question markdown files (snippets/questions/*.md) follow each theme's
+    # list; a malformed file is reported and left as an empty placeholder
+    # (generate() refuses it), never the whole bank
+    errors: list[str] = []
+    for theme, questions in markdown_questions(LIVE_BATCH, errors).items():
+        mapping[theme] = mapping[theme] + questions
+    for err in errors:
+        print(f"[Bank] WARNING: markdown question unavailable until fixed: {err}")
+    return mapping
+
+
+def use_pack(path=None) -> bool:
+    """
+    Serve questions from the live pack instead of the imported lists.
+
+    The pack (default .bank/live.pack) is rebuilt first if any live source
+    file is newer. Returns True if it had to be rebuilt.
+    """
+    global _pack
+    from bank.pack import LIVE_PACK_FILE, PackReader, ensure_live_pack
+
+    path = path or LIVE_PACK_FILE
+    rebuilt = ensure_live_pack(path)
+    _pack = PackReader(path)
+    theme_sizes.cache_clear()
+    batch_sizes.cache_clear()
+    token_counts.cache_clear()
+    return rebuilt
+
+
+def use_bank(batches=None, path=None) -> bool:
+    """
+    Serve archived batches from the compiled bank (default .bank/bank.pack).
+
+    The bank is rebuilt, with every batch, if it is missing one of `batches`
+    (default: all) or any of their source files changed (see
+    bank.pack.pack_stale). Returns True if it had to be rebuilt.
+    """
+    global _bank
+    from bank.pack import PACK_FILE, PackReader, ensure_pack, pack_stale
+
+    path = path or PACK_FILE
+    rebuilt = pack_stale(path, batches) and ensure_pack(path)
+    _bank = PackReader(path)
+    batch_sizes.cache_clear()
+    token_counts.cache_clear()
+    return rebuilt
+
+
+@lru_cache(maxsize=None)
+def batch_sizes(batch: str) -> dict[str, int]:
+    """Return theme → number of questions in `batch` (live or archived)."""
+    if batch == LIVE_BATCH:
+        return theme_sizes()
+    if _bank is None:
+        use_bank([batch])
+    counts = _bank.theme_counts(batch)
+    if not counts:
+        raise ValueError(f"Unknown batch: {batch!r} (not in {_bank.path})")
+    return {theme: counts.get(theme, 0) for theme in THEME_SOURCES}
+
+
+@lru_cache(maxsize=None)
+def theme_sizes() -> dict[str, int]:
+    """Return theme → number of indexed questions, from the pack or the lists."""
+    if _pack is not None:
+        counts = _pack.theme_counts(LIVE_BATCH)
+        return {theme: counts.get(theme, 0) for theme in THEME_SOURCES}
+    return {theme: len(qs) for theme, qs in _theme_questions().items()}
+
+
+@lru_cache(maxsize=None)
+def token_counts(batch: str) -> dict[str, list[int]]:
+    """
+    Return theme → approximate token count of each question of `batch`.
+    Packs store the counts; the imported live lists go through the
+    fingerprint cache of bank/tokens.py.
+    """
+    if batch != LIVE_BATCH:
+        batch_sizes(batch)  # opens the bank
+        return _bank.token_counts(batch)
+    if _pack is not None:
+        return _pack.token_counts(LIVE_BATCH)
+    from bank.tokens import token_counts as count
+
+    lists = _theme_questions()
+    counts = iter(count(q.strip() for qs in lists.values() for q in qs))
+    return {theme: [next(counts) for _ in qs] for theme, qs in lists.items()}
 
 
 def generate(theme: str, subtopic: str) -> str:
@@ -36,31 +145,74 @@ def generate(theme: str, subtopic: str) -> str:
 
     subtopic is a zero-padded integer string ("00", "01", ...) representing
     the index into the theme's question list. This is produced by
-    session_memory.py's THEME_REGISTRY which auto-generates index labels.
+    session_memory.py's registry which auto-generates index labels.
+    Questions of archived batches prefix the index with the batch
+    ("batch3:12"); see bank.source.batch_subtopic().
+
+    Template subtopics ("tpl:<template>:<choices>") are rendered from the
+    snippet libraries instead; see question_templates.py.
 
     Returns the question text, stripped of leading/trailing whitespace.
+    Raises ValueError for the empty placeholder of a markdown file that
+    doesn't parse (bank/markdown.py), which the session then skips.
     """
-    questions = _THEME_QUESTIONS.get(theme)
-    if questions is None:
-        raise ValueError(f"Unknown theme: {theme!r}")
+    if subtopic.startswith("tpl:"):  # question_templates.PREFIX, checked before importing it
+        import question_templates
+        return question_templates.render_subtopic(subtopic)
 
-    try:
-        idx = int(subtopic)
-    except (ValueError, TypeError):
+    if not isinstance(subtopic, str):
         raise ValueError(f"subtopic must be a numeric index string, got: {subtopic!r}")
+    batch, idx = parse_subtopic(subtopic)
+
+    size = batch_sizes(batch).get(theme)
+    if size is None:
+        raise ValueError(f"Unknown theme: {theme!r}")
 
-    if idx < 0 or idx >= len(questions):
+    if idx < 0 or idx >= size:
         raise IndexError(
             f"Index {idx} out of range for theme {theme!r} "
-            f"(has {len(questions)} questions)"
+            f"(has {size} questions)"
         )
 
-    return questions[idx].strip()
+    if batch != LIVE_BATCH:
+        text = _bank.get(question_id(batch, theme, idx)).strip()
+    elif _pack is not None:
+        text = _pack.get(question_id(LIVE_BATCH, theme, idx)).strip()
+    else:
+        text = _theme_questions()[theme][idx].strip()
+    if not text:  # a markdown file that doesn't parse keeps its slot, empty
+        raise ValueError(f"Question {question_id(batch, theme, idx)} is unavailable: its file does not parse")
+    return text
+
+
+def fingerprint(theme: str, subtopic: str) -> str:
+    """
+    Return the content fingerprint of the question generate() serves for
+    (theme, subtopic), as the bank index computes it: from the source text.
+    Packed questions carry it in the pack, since their stored text is
+    layout-normalized (bank/layout.py) and would hash differently. Raises
+    like generate().
+    """
+    from bank.fingerprint import fingerprint as text_fingerprint
+
+    if subtopic.startswith("tpl:"):
+        return text_fingerprint(generate(theme, subtopic))
+    batch, idx = parse_subtopic(subtopic)
+    size = batch_sizes(batch).get(theme)
+    if size is None:
+        raise ValueError(f"Unknown theme: {theme!r}")
+    if idx < 0 or idx >= size:
+        raise IndexError(f"Index {idx} out of range for theme {theme!r} (has {size} questions)")
+    if batch != LIVE_BATCH:
+        return _bank.fingerprint(question_id(batch, theme, idx))
+    if _pack is not None:
+        return _pack.fingerprint(question_id(LIVE_BATCH, theme, idx))
+    return text_fingerprint(_theme_questions()[theme][idx])
 
 
 def theme_size(theme: str) -> int:
     """Return the number of questions available for a given theme."""
-    questions = _THEME_QUESTIONS.get(theme)
-    if questions is None:
+    size = theme_sizes().get(theme)
+    if size is None:
         raise ValueError(f"Unknown theme: {theme!r}")
-    return len(questions)
+    return size
@@ -0,0 +1,137 @@
+"""
+question_templates.py - Composes questions from templates and snippet libraries.
+
+Templates (snippets/templates.py) are compiled once into render functions;
+each slot is filled from a pool built from snippets/react.py, nextjs.py,
+typescript.py and config.PRODUCT_CONTEXT. A templated question is addressed
+by a subtopic string that records every slot choice:
+
+    "tpl:react_rerender_audit:3.1"   →  template, then one pool index per slot
+
+so it can be stored in session state like any indexed question. Rendering is
+memoized on (template id, choices).
+"""
+
+import itertools
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, Tuple
+
+PREFIX = "tpl:"
+
+RenderFn = Callable[[Tuple[str, ...]], str]
+
+
+@lru_cache(maxsize=None)
+def _slot_pools() -> Dict[str, Tuple[str, ...]]:
+    from config import PRODUCT_CONTEXT
+    from snippets.nextjs import NEXTJS_SNIPPETS
+    from snippets.react import REACT_SNIPPETS
+    from snippets.typescript import TYPESCRIPT_SNIPPETS
+
+    return {
+        "react_code":  tuple(REACT_SNIPPETS),
+        "nextjs_code": tuple(NEXTJS_SNIPPETS),
+        "ts_code":     tuple(TYPESCRIPT_SNIPPETS),
+        "feature":     tuple(PRODUCT_CONTEXT["features"]),
+        "stack_item":  tuple(PRODUCT_CONTEXT["stack"]),
+        "product":     (PRODUCT_CONTEXT["product"],),
+        "daily_users": (PRODUCT_CONTEXT["daily_users"],),
+        "team_size":   (PRODUCT_CONTEXT["team_size"],),
+    }
+
+
+def _compile(template_id: str, text: str) -> Tuple[Tuple[str, ...], RenderFn]:
+    """
+    Compile one template into (slot names, render function).
+
+    The text is split once into literal chunks and slot positions; rendering
+    is then a single join over a prebuilt list with the values dropped in.
+    A slot used twice takes the same value both times.
+    """
+    pools = _slot_pools()
+    chunks: list[str] = []
+    positions: list[Tuple[int, int]] = []   # (index in chunks, slot number)
+    slots: list[str] = []
+    for literal, field, spec, conv in Formatter().parse(text):
+        chunks.append(literal)
+        if field is None:
+            continue
+        if field not in pools:
+            raise ValueError(f"Template {template_id!r}: unknown slot {{{field}}}")
+        if spec or conv:
+            raise ValueError(f"Template {template_id!r}: format specs are not supported")
+        if field not in slots:
+            slots.append(field)
+        positions.append((len(chunks), slots.index(field)))
+        chunks.append("")
+
+    def render(values: Tuple[str, ...]) -> str:
+        parts = chunks[:]
+        for at, slot in positions:
+            parts[at] = values[slot]
+        return "".join(parts).strip()
+
+    return tuple(slots), render
+
+
+@lru_cache(maxsize=None)
+def compiled() -> Dict[str, Tuple[str, Tuple[str, ...], RenderFn]]:
+    """Return template id → (theme, slot names, render fn), compiled once."""
+    from snippets.templates import Q_TEMPLATES
+
+    out = {}
+    for template_id, (theme, text) in Q_TEMPLATES.items():
+        slots, render = _compile(template_id, text)
+        out[template_id] = (theme, slots, render)
+    return out
+
+
+@lru_cache(maxsize=4096)
+def render(template_id: str, choices: Tuple[int, ...]) -> str:
+    """Render one template with one pool index per slot (memoized)."""
+    try:
+        _, slots, render_fn = compiled()[template_id]
+    except KeyError:
+        raise ValueError(f"Unknown template: {template_id!r}") from None
+    if len(choices) != len(slots):
+        raise ValueError(
+            f"Template {template_id!r} has {len(slots)} slot(s), got {len(choices)} choice(s)"
+        )
+    pools = _slot_pools()
+    # Checked explicitly: a negative index would silently count from the end
+    if any(not 0 <= i < len(pools[slot]) for slot, i in zip(slots, choices)):
+        raise ValueError(f"Choice out of range for template {template_id!r}: {choices}")
+    return render_fn(tuple(pools[slot][i] for slot, i in zip(slots, choices)))
+
+
+def subtopics(theme: str) -> list[str]:
+    """Every templated subtopic of `theme` (the full cross product of slot pools)."""
+    pools = _slot_pools()
+    out = []
+    for template_id, (t, slots, _) in compiled().items():
+        if t != theme:
+            continue
+        ranges = [range(len(pools[slot])) for slot in slots]
+        for combo in itertools.product(*ranges):
+            out.append(f"{PREFIX}{template_id}:" + ".".join(map(str, combo)))
+    return out
+
+
+def themes() -> list[str]:
+    """Themes that have at least one template."""
+    return sorted({theme for theme, _, _ in compiled().values()})
+
+
+def is_templated(subtopic: str) -> bool:
+    return subtopic.startswith(PREFIX)
+
+
+def render_subtopic(subtopic: str) -> str:
+    """Render a "tpl:<id>:<i>.<j>..." subtopic."""
+    try:
+        template_id, combo = subtopic[len(PREFIX):].rsplit(":", 1)
+        choices = tuple(int(c) for c in combo.split(".")) if combo else ()
+    except ValueError:
+        raise ValueError(f"Malformed template subtopic: {subtopic!r}") from None
+    return render(template_id, choices)
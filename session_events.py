@@ -0,0 +1,104 @@
+"""
+session_events.py — Event hooks around the main.py session loop.
+
+Plugins subscribe handlers to a fixed set of events:
+
+    session_start  questions, dry_run, seed
+    picked         q_num, theme, subtopic
+    generated      q_num, theme, subtopic, question
+    sent           q_num, theme, subtopic, dry_run
+    idle_start     q_num, seconds, virtual
+    session_end    sent, virtual_seconds
+
+Handlers are called with keyword arguments only. The loop calls each event
+as an attribute (`bus.picked(q_num=1, ...)`); that attribute is rebuilt on
+every subscribe/unsubscribe, so an event nobody listens to is a call to a
+no-op and a single listener is called directly, with no lookup or loop.
+
+A handler that raises is reported and skipped; it never stops the session.
+
+A plugin is any module with a `register(bus)` function:
+    python main.py --plugin my_metrics
+"""
+
+import importlib
+from typing import Callable, Dict
+
+EVENTS = ("session_start", "picked", "generated", "sent", "idle_start", "session_end")
+
+Handler = Callable[..., None]
+
+
+def _noop(**_payload) -> None:
+    pass
+
+
+def _guarded(event: str, handler: Handler) -> Handler:
+    def call(**payload) -> None:
+        try:
+            handler(**payload)
+        except Exception as exc:
+            name = getattr(handler, "__qualname__", repr(handler))
+            print(f"[Events] {name} failed on {event}: {exc}")
+    return call
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self._handlers: Dict[str, list[Handler]] = {event: [] for event in EVENTS}
+        for event in EVENTS:
+            self._compile(event)
+
+    def _compile(self, event: str) -> None:
+        """Precompute the dispatcher stored as this event's attribute."""
+        calls = tuple(_guarded(event, h) for h in self._handlers[event])
+        if not calls:
+            dispatch = _noop
+        elif len(calls) == 1:
+            dispatch = calls[0]
+        else:
+            def dispatch(**payload) -> None:
+                for call in calls:
+                    call(**payload)
+        setattr(self, event, dispatch)
+
+    def _check(self, event: str) -> None:
+        if event not in self._handlers:
+            raise ValueError(f"Unknown event {event!r} (expected one of: {', '.join(EVENTS)})")
+
+    def subscribe(self, event: str, handler: Handler | None = None):
+        """
+        Call `handler` on every `event`. Returns the handler, so it also
+        works as a decorator: `@bus.subscribe("sent")`.
+        """
+        self._check(event)
+        if handler is None:
+            return lambda fn: self.subscribe(event, fn)
+        self._handlers[event].append(handler)
+        self._compile(event)
+        return handler
+
+    def unsubscribe(self, event: str, handler: Handler) -> None:
+        self._check(event)
+        try:
+            self._handlers[event].remove(handler)
+        except ValueError:
+            return
+        self._compile(event)
+
+    def listened(self, event: str) -> bool:
+        """True if anything subscribes to `event` (to skip building costly payloads)."""
+        self._check(event)
+        return bool(self._handlers[event])
+
+
+def load_plugin(bus: EventBus, name: str) -> None:
+    """Import module `name` and call its register(bus)."""
+    try:
+        module = importlib.import_module(name)
+    except ImportError as exc:
+        raise ValueError(f"Cannot import plugin {name!r}: {exc}") from None
+    register = getattr(module, "register", None)
+    if not callable(register):
+        raise ValueError(f"Plugin {name!r} has no register(bus) function")
+    register(bus)
@@ -0,0 +1,140 @@
+"""
+session_history.py — Durable log of every question sent, with running rollups.
+
+Each send appends one JSON line to `session_history.jsonl`:
+
+    {"at": "2026-10-19T14:03:11", "session": "3f9c0a12b7de", "cycle": 4,
+     "theme": "css_rendering", "subtopic": "12", "fp": "9fc2b8a7971079e1"}
+
+`session_rollups.json` holds counts by theme, day and cycle, updated as each
+event is appended. Reports read only the rollups, so they cost the same after
+ten sends or a hundred thousand. The rollups remember the log offset they
+cover, so a crash between the two writes is caught up from the tail of the
+log on the next start rather than by rescanning it.
+
+(With the SQLite store, the same log and rollups live in its history tables.)
+"""
+
+import json
+import os
+from pathlib import Path
+
+_LOG_FILE = Path(__file__).parent / "session_history.jsonl"
+_ROLLUP_FILE = Path(__file__).parent / "session_rollups.json"
+
+_ROLLUP_VERSION = 1
+
+
+def _empty_rollups() -> dict:
+    return {
+        "version": _ROLLUP_VERSION,
+        "offset": 0,        # bytes of the log already applied
+        "events": 0,
+        "last": None,       # [cycle, theme, subtopic] of the last event applied
+        "by_theme": {},
+        "by_day": {},
+        "by_cycle": {},     # cycle → {"count", "first_at", "last_at"}
+    }
+
+
+def apply_event(rollups: dict, event: dict) -> None:
+    """Fold one event into the rollups."""
+    rollups["events"] += 1
+    rollups["last"] = [event["cycle"], event["theme"], event["subtopic"]]
+    theme = event["theme"]
+    day = event["at"][:10]
+    rollups["by_theme"][theme] = rollups["by_theme"].get(theme, 0) + 1
+    rollups["by_day"][day] = rollups["by_day"].get(day, 0) + 1
+    cycle = rollups["by_cycle"].setdefault(
+        str(event["cycle"]), {"count": 0, "first_at": event["at"], "last_at": event["at"]}
+    )
+    cycle["count"] += 1
+    cycle["last_at"] = event["at"]
+
+
+class HistoryLog:
+    """Append-only send log plus its incrementally maintained rollups."""
+
+    def __init__(self, log_path: Path = _LOG_FILE, rollup_path: Path = _ROLLUP_FILE) -> None:
+        self.log_path = log_path
+        self.rollup_path = rollup_path
+        self.rollups = self._load_rollups()
+        self._catch_up()
+
+    def _load_rollups(self) -> dict:
+        try:
+            data = json.loads(self.rollup_path.read_text(encoding="utf-8"))
+            if data.get("version") == _ROLLUP_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return _empty_rollups()  # missing or unreadable: rebuilt from the log below
+
+    def _catch_up(self) -> None:
+        """Apply log lines written after the rollups were last saved."""
+        if not self.log_path.exists():
+            return
+        size = self.log_path.stat().st_size
+        if size < self.rollups["offset"]:
+            self.rollups = _empty_rollups()  # log was replaced: start over
+        if size == self.rollups["offset"]:
+            return
+        with self.log_path.open("rb") as f:
+            f.seek(self.rollups["offset"])
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn final line: leave it for the next append to skip
+                line = raw.strip()
+                if line:
+                    apply_event(self.rollups, json.loads(line))
+                self.rollups["offset"] += len(raw)
+        self._save_rollups()
+
+    def _save_rollups(self) -> None:
+        tmp = self.rollup_path.with_name(self.rollup_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.rollups), encoding="utf-8")
+        os.replace(tmp, self.rollup_path)
+
+    def cycle_pairs(self) -> tuple[int, list[tuple[str, str]]]:
+        """
+        (latest cycle, the (theme, subtopic) pairs asked in it, in order),
+        read in one streaming pass over the log. Every line is parsed, so the
+        match does not depend on how an event happens to be serialized.
+        """
+        last = self.rollups["last"]
+        cycle = last[0] if last else 1
+        pairs = []
+        if not self.log_path.exists():
+            return cycle, pairs
+        with self.log_path.open("rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn final line
+                line = raw.strip()
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["cycle"] > cycle:
+                    cycle, pairs = event["cycle"], []
+                if event["cycle"] == cycle:
+                    pairs.append((event["theme"], event["subtopic"]))
+        return cycle, pairs
+
+    def record(self, event: dict) -> None:
+        """
+        Append one send event and update the rollups.
+
+        A repeat of the last event (same cycle, theme and subtopic), as a
+        crash-recovery replay can produce, is ignored.
+        """
+        if self.rollups["last"] == [event["cycle"], event["theme"], event["subtopic"]]:
+            return
+        with self.log_path.open("ab") as f:
+            if f.tell() != self.rollups["offset"]:
+                f.truncate(self.rollups["offset"])  # drop a torn line from a crash
+            f.write(json.dumps(event).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self.rollups["offset"] = f.tell()
+        apply_event(self.rollups, event)
+        self._save_rollups()
@@ -0,0 +1,187 @@
+"""
+session_log.py — Structured, buffered session output.
+
+main.py and human_simulator.py describe what happens as records
+(`log.record("picked", q_num=3, theme=..., ...)`) and a renderer turns them
+into text:
+
+    tty     the human console layout (banners, per-question dividers)
+    jsonl   one JSON object per record: {"at": ..., "kind": ..., <fields>}
+
+Output is collected in memory and written at flush() — before every wait,
+and at the end — instead of line by line. Progress redraws (countdowns) are
+rate-limited, and they are dropped entirely unless the tty renderer writes to
+a real terminal, so redirected logs contain one line per event instead of
+one per second.
+
+Stray print() output (e.g. "[Memory] ...") is captured as "message" records,
+so it keeps its place among the buffered records and jsonl output stays
+valid JSONL. --log-file
+writes UTF-8 directly, which avoids the UTF-16 files a PowerShell `>`
+redirect produces.
+"""
+
+import json
+import sys
+import time
+from typing import Callable, Dict, TextIO
+
+FORMATS = ("tty", "jsonl")
+
+# Write the buffer out once it grows past this many characters
+_FLUSH_CHARS = 64 * 1024
+
+SEP = "=" * 60
+DIV = "-" * 60
+
+# kind → TTY layout (str.format over the record's fields)
+TTY_TEMPLATES: Dict[str, str] = {
+    "notice":   "[*] {message}\n",
+    "dry_run":  "\n[DRY RUN] No keyboard actions will be taken.\n",
+    "picked":   DIV + "\n  Q{q_num:02d}/{total:02d} | Theme: {theme} > {subtopic}\n  {stats}\n" + DIV,
+    "error":    "  [ERROR] {message}",
+    "question": "\n{text}\n",
+    "virtual":  "  [virtual] click {click[0]:.2f}s + {click[1]:.2f}s, enter {enter:.2f}s, idle {idle}s",
+    "step":     "  [{message}]",
+    "wait":     "\n[WAIT] You have {seconds} seconds to click into the chat input box...",
+    "locked":   "   > Typing now! (input locked at {x},{y})\n",
+    "message":  "{text}",
+}
+
+
+def _render_banner(fields: dict) -> str:
+    width = max(len(label) for label, _ in fields["rows"])
+    lines = [SEP, f"  [*] {fields['title']}"]
+    lines += [f"  {label:<{width}}: {value}" for label, value in fields["rows"]]
+    lines.append(SEP)
+    return "\n".join(lines)
+
+
+def _render_idle(fields: dict) -> str:
+    minutes, seconds = divmod(fields["seconds"], 60)
+    return f"\n[IDLE] Waiting {minutes}m {seconds}s before next question..."
+
+
+def _render_done(fields: dict) -> str:
+    lines = ["", SEP, f"  [DONE] Session complete - {fields['sent']} question(s) sent."]
+    if fields.get("virtual_seconds") is not None:
+        minutes, seconds = divmod(round(fields["virtual_seconds"]), 60)
+        lines.append(f"  Virtual session time: {minutes}m {seconds}s")
+    if fields.get("tokens") is not None:
+        lines.append(f"  Tokens sent: ~{fields['tokens']:,} of a {fields['token_budget']:,} budget")
+    lines += [SEP, ""]
+    return "\n".join(lines)
+
+
+_TTY_RENDERERS: Dict[str, Callable[[dict], str]] = {
+    "banner": _render_banner,
+    "idle":   _render_idle,
+    "done":   _render_done,
+}
+
+
+class Logger:
+    """Buffers records and writes them with one renderer to one stream."""
+
+    def __init__(self, fmt: str = "tty", stream: TextIO | None = None,
+                 progress_interval: float = 1.0) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown log format {fmt!r} (expected one of: {', '.join(FORMATS)})")
+        self.format = fmt
+        self.stream = stream if stream is not None else sys.stdout
+        self._buffer: list[str] = []
+        self._size = 0
+        isatty = getattr(self.stream, "isatty", None)
+        # Redraws only make sense on a terminal, and only for humans
+        self.live_progress = fmt == "tty" and bool(isatty and isatty())
+        self._progress_interval = progress_interval
+        self._progress_at = 0.0
+        self._progress_open = False
+
+    # ── Records ──────────────────────────────────────────────────────────────
+
+    def record(self, kind: str, **fields) -> None:
+        if self.format == "jsonl":
+            line = json.dumps({"at": time.strftime("%Y-%m-%dT%H:%M:%S"), "kind": kind, **fields},
+                              ensure_ascii=False, default=str)
+        elif kind in _TTY_RENDERERS:
+            line = _TTY_RENDERERS[kind](fields)
+        else:
+            line = TTY_TEMPLATES.get(kind, "{kind}: {fields}").format(kind=kind, fields=fields, **fields)
+        self._end_progress()
+        self._write(line + "\n")
+
+    def _write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= _FLUSH_CHARS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._size = 0
+        self.stream.flush()
+
+    # ── Progress ─────────────────────────────────────────────────────────────
+
+    def progress(self, text: str, force: bool = False) -> None:
+        """Redraw a one-line status in place (rate-limited; terminals only)."""
+        if not self.live_progress:
+            return
+        now = time.monotonic()
+        if not force and self._progress_open and now - self._progress_at < self._progress_interval:
+            return
+        self._progress_at = now
+        self._progress_open = True
+        self._write(f"\r{text}  ")
+        self.flush()
+
+    def _end_progress(self) -> None:
+        if self._progress_open:
+            self._progress_open = False
+            self._write("\r" + " " * 40 + "\r")
+
+    # ── Capturing print() ────────────────────────────────────────────────────
+
+    def capture(self) -> "_PrintCapture":
+        """A file-like object for contextlib.redirect_stdout."""
+        return _PrintCapture(self)
+
+
+class _PrintCapture:
+    """Turns print() output into "message" records, one per line."""
+
+    def __init__(self, logger: Logger) -> None:
+        self._logger = logger
+        self._pending = ""
+
+    def write(self, text: str) -> int:
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            if line.strip() or self._logger.format == "tty":
+                self._logger.record("message", text=line.rstrip())
+        return len(text)
+
+    def flush(self) -> None:
+        self._logger.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+# The logger human_simulator and friends write to (main.py replaces it)
+_current = Logger()
+
+
+def current() -> Logger:
+    return _current
+
+
+def configure(fmt: str = "tty", stream: TextIO | None = None) -> Logger:
+    """Install and return the session-wide logger."""
+    global _current
+    _current = Logger(fmt, stream)
+    return _current
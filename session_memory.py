@@ -6,146 +6,562 @@ is marked used. On the next run the remaining pool is restored, so no question
 repeats until all 252 have been asked, even across restarts.
 
 When the pool is exhausted it resets automatically and starts a new cycle.
+
+The saved state carries a format version (session_state.py). A state saved
+by an older version is upgraded in one pass on load and rewritten at once;
+saved entries that match no question of the current run (another batch, a
+named topic of the first prototype) are carried along rather than dropped.
+If the state can't be read at all, a copy is kept aside and the current
+cycle is rebuilt from the asked-history log.
+
+Optionally a `bank.store.BankStore` can be passed in: state then lives in its
+SQLite database and every sent question is also written to its history table.
+An existing `session_state.json` is picked up on the store's first use.
+
+Sending is two-phase so a crash can neither lose nor repeat a question:
+    record_intent()  before typing    → pending = {pair, phase: "intent"}
+    record_sent()    after Enter      → pending phase becomes "sent"
+    mark_used()      commits the pair and clears the pending record
+On startup a "sent" record is committed and an "intent" record is re-offered
+first by pick_next_theme(). Both files are replaced atomically, so a crash
+mid-write leaves the previous version intact.
+
+The pool can span several batches (`batches=["live", "batch3"]`). Each
+batch's (theme, subtopic) pairs are precomputed once as its own pool, from
+question counts alone: archived batches are counted from the compiled bank's
+header, so none of their modules is imported. Questions of a batch added to
+the selection later join the current cycle.
+
+The available pool is mirrored as one bitmask per theme (bit i ⇔ the
+theme's i-th pair), and every restriction is a mask of the same shape:
+block/allow lists (`filters`, see bank/filters.py) and the token plan of
+plan_tokens(), which takes as many questions from each token-length bucket
+(bank/tokens.py) as fit the budget. A pick ANDs the masks and draws one set
+bit, so filtering never rebuilds a list and never touches saved progress.
+
+Every committed question is also appended to the asked-history log
+(session_history.py, or the store's history table) with its cycle number,
+session id and fingerprint.
 """
 
 import json
 import os
 import random
+import shutil
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Tuple, Dict, Set
+from typing import Iterable, Tuple, Dict, Set
+
+from session_state import STATE_VERSION, NewerStateError, encode, upgrade
 
 # ─── State file ───────────────────────────────────────────────────────────────
 _STATE_FILE = Path(__file__).parent / "session_state.json"
+# In-flight question between record_intent() and mark_used()
+_PENDING_FILE = Path(__file__).parent / "session_state.pending.json"
+
 
+def _write_atomic(path: Path, text: str) -> None:
+    """Write `text` to `path` so readers only ever see the old or new content."""
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
-def _build_registry() -> Dict[str, list[str]]:
+
+def _build_pools(batches: Iterable[str]) -> Dict[str, list[Tuple[str, str]]]:
     """
-    Build a registry where each theme maps to index strings for its questions.
-    Imports each snippet file to discover the actual question count.
+    Build batch → its (theme, subtopic) pairs, for every batch in `batches`.
+    Counts come from question_generator, so the lists (or the packs) are
+    only loaded once a SessionMemory is created.
     """
-    from snippets.q_react       import Q_REACT
-    from snippets.q_performance  import Q_PERFORMANCE
-    from snippets.q_nextjs       import Q_NEXTJS
-    from snippets.q_typescript   import Q_TYPESCRIPT
-    from snippets.q_architecture import Q_ARCHITECTURE
-    from snippets.q_debugging    import Q_DEBUGGING
-    from snippets.q_state        import Q_STATE
-    from snippets.q_css          import Q_CSS
-    from snippets.q_testing      import Q_TESTING
-
-    mapping = {
-        "react_internals":  Q_REACT,
-        "performance":      Q_PERFORMANCE,
-        "nextjs_advanced":  Q_NEXTJS,
-        "typescript":       Q_TYPESCRIPT,
-        "architecture":     Q_ARCHITECTURE,
-        "debugging":        Q_DEBUGGING,
-        "state_management": Q_STATE,
-        "css_rendering":    Q_CSS,
-        "testing":          Q_TESTING,
+    import question_generator as qgen
+    from bank.source import batch_subtopic
+    return {
+        batch: [
+            (theme, batch_subtopic(batch, i))
+            for theme, n in qgen.batch_sizes(batch).items()
+            for i in range(n)
+        ]
+        for batch in batches
     }
-    return {theme: [str(i) for i in range(len(qs))] for theme, qs in mapping.items()}
 
 
-# Build at module load time once
-THEME_REGISTRY: Dict[str, list[str]] = _build_registry()
+def _nth_set_bit(mask: int, n: int) -> int:
+    """Position of the n-th (0-based) set bit of `mask`."""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for start in range(0, len(data), 8):
+        word = int.from_bytes(data[start:start + 8], "little")
+        count = word.bit_count()
+        if n < count:
+            for _ in range(n):
+                word &= word - 1  # drop the lowest set bit
+            return start * 8 + (word & -word).bit_length() - 1
+        n -= count
+    raise ValueError("mask has too few set bits")
+
+
+def _question_fingerprint(theme: str, subtopic: str) -> str | None:
+    """
+    Content fingerprint of a question for the history log (None if unknown).
+
+    It is the one the bank index has, computed from the source text: packed
+    questions carry theirs in the pack, so no index is read or written while
+    a session runs.
+    """
+    import question_generator as qgen
+    try:
+        return qgen.fingerprint(theme, subtopic)
+    except (ValueError, IndexError, KeyError):
+        return None
 
 
 class SessionMemory:
-    def __init__(self) -> None:
+    def __init__(self, store=None, templates: bool = False, rng: random.Random | None = None,
+                 batches: Iterable[str] | None = None, filters: dict | None = None,
+                 history=None) -> None:
+        # Every shuffle and pick draws from this generator; pass a seeded one
+        # (main.py --seed) for a reproducible question order
+        self._rng = rng if rng is not None else random.Random()
+        self._store = store
+        if store is not None:
+            self.session_id = store.session_id
+            self._history = None
+        else:
+            import uuid
+            self.session_id = uuid.uuid4().hex[:12]
+            if history is None:
+                from session_history import HistoryLog
+                history = HistoryLog()
+            self._history = history
+        if batches is None:
+            from bank.source import LIVE_BATCH
+            batches = [LIVE_BATCH]
+        # batch → its pairs; the pool of one cycle is all of them together
+        self._pools = _build_pools(batches)
         self._all_pairs: list[Tuple[str, str]] = [
-            (theme, subtopic)
-            for theme, subtopics in THEME_REGISTRY.items()
-            for subtopic in subtopics
+            pair for pool in self._pools.values() for pair in pool
         ]
+        if templates:
+            # Add every composed question from question_templates.py to the pool
+            import question_templates
+            self._all_pairs += [
+                (theme, subtopic)
+                for theme in question_templates.themes()
+                for subtopic in question_templates.subtopics(theme)
+            ]
+        # theme → its pairs; bit i of every per-theme mask stands for pairs[i]
+        self._theme_pairs: Dict[str, list[Tuple[str, str]]] = {}
+        self._bit_of: Dict[Tuple[str, str], int] = {}
+        for pair in self._all_pairs:
+            pairs = self._theme_pairs.setdefault(pair[0], [])
+            self._bit_of[pair] = len(pairs)
+            pairs.append(pair)
+        # Questions the block/allow lists let through (None: no filters)
+        self._allowed: Dict[str, int] | None = None
+        if filters:
+            from bank.filters import compile_masks
+            self._allowed = compile_masks(self._theme_pairs, filters)
+            if not any(self._allowed.values()):
+                raise ValueError("The question filters exclude every question")
         self._used: Set[Tuple[str, str]] = set()
+        # Saved pairs outside this run's pool, written back untouched
+        self._kept: Dict[str, list[Tuple[str, str]]] = {"available": [], "used": []}
+        # The saved state was in an older format (rewritten below)
+        self._upgraded = False
         self._last_theme: str | None = None
+        self._cycle = 1
+        # Interrupted before delivery was confirmed — offered again first
+        self._resume: Tuple[str, str] | None = None
+        # Once plan_tokens() has run: token-length bucket of each pair, theme →
+        # bucket → mask, quota left per bucket and the mask of those buckets
+        self._bucket_of: Dict[Tuple[str, str], int] = {}
+        self._bucket_bits: Dict[str, Dict[int, int]] | None = None
+        self._quota: Dict[int, int] | None = None
+        self._quota_bits: Dict[str, int] | None = None
 
         # Try to restore from disk; fall back to a fresh shuffled pool
         self._available = self._load_state()
+        self._avail_bits = self._masks_of(self._available)
+        if self._upgraded:
+            self._save_state()
+        self._recover_pending()
+
+    # ── Bitmasks ─────────────────────────────────────────────────────────────
+
+    def _masks_of(self, pairs: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+        """Per-theme bitmasks with the bits of `pairs` set."""
+        bits = {theme: bytearray((len(ps) + 7) // 8) for theme, ps in self._theme_pairs.items()}
+        for pair in pairs:
+            i = self._bit_of[pair]
+            bits[pair[0]][i >> 3] |= 1 << (i & 7)
+        return {theme: int.from_bytes(b, "little") for theme, b in bits.items()}
+
+    def _has(self, masks: Dict[str, int], pair: Tuple[str, str]) -> bool:
+        i = self._bit_of.get(pair)
+        return i is not None and (masks.get(pair[0], 0) >> i) & 1 == 1
+
+    def _eligible(self, quota: bool = True) -> Dict[str, int]:
+        """Theme → available questions the filters (and the token plan) allow."""
+        masks = self._avail_bits
+        if self._allowed is not None:
+            masks = {t: m & self._allowed[t] for t, m in masks.items()}
+        if quota and self._quota_bits is not None:
+            in_quota = {t: m & self._quota_bits[t] for t, m in masks.items()}
+            if any(in_quota.values()):
+                masks = in_quota  # once the plan runs out (e.g. new cycle) anything goes
+        return masks
 
     # ── Persistence ──────────────────────────────────────────────────────────
 
+    def _read_state(self) -> dict | None:
+        """Return the raw saved state from the store or the JSON file, if any."""
+        if self._store is not None:
+            data = self._store.load_state()
+            if data is not None:
+                return data
+        if _STATE_FILE.exists():
+            return json.loads(_STATE_FILE.read_text(encoding="utf-8"))
+        return None
+
+    def _recover_state(self, exc: Exception) -> dict | None:
+        """
+        Stand-in for a saved state that can't be read: the questions asked in
+        the history's latest cycle count as used. The unreadable file is
+        copied aside and stays in place until the rebuilt state replaces it,
+        so a crash in between recovers the same way on the next start.
+        """
+        print(f"[Memory] Could not read the saved state ({exc}).")
+        if self._store is None and _STATE_FILE.exists():
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            backup = _STATE_FILE.with_name(f"{_STATE_FILE.name}.{stamp}.bak")
+            n = 1
+            while backup.exists():  # same second, or the clock went back
+                n += 1
+                backup = _STATE_FILE.with_name(f"{_STATE_FILE.name}.{stamp}-{n}.bak")
+            shutil.copyfile(_STATE_FILE, backup)
+            print(f"[Memory] Kept a copy as {backup.name}.")
+        history = self._store if self._store is not None else self._history
+        cycle, pairs = history.cycle_pairs()
+        if not pairs:
+            return None
+        print(f"[Memory] Rebuilt cycle {cycle} from the history log.")
+        return encode([], pairs, None, cycle)
+
     def _load_state(self) -> list[Tuple[str, str]]:
         """
         Load the remaining question pool from disk.
 
-        If the file doesn't exist, is corrupted, or contains an empty pool,
-        return a freshly shuffled full pool (starts a new cycle).
+        Older state formats are upgraded first (session_state.py). An
+        unreadable state is rebuilt from the history log; only without any
+        saved progress, or once the pool is exhausted, does a freshly
+        shuffled full pool start (a new cycle in the latter case).
         """
-        if _STATE_FILE.exists():
-            try:
-                data = json.loads(_STATE_FILE.read_text(encoding="utf-8"))
-                available = [tuple(pair) for pair in data.get("available", [])]
-                used = {tuple(pair) for pair in data.get("used", [])}
-                self._last_theme = data.get("last_theme")
-
-                # Validate: all pairs must be known
-                all_set = set(map(tuple, self._all_pairs))
-                available = [p for p in available if p in all_set]
-                used = {p for p in used if p in all_set}
-
-                if available:
-                    self._used = used
-                    print(
-                        f"[Memory] Restored state — "
-                        f"{len(used)}/{len(self._all_pairs)} questions already asked "
-                        f"({len(available)} remaining)"
-                    )
-                    return list(available)
-                else:
-                    print(
-                        "[Memory] All questions have been asked — "
-                        "resetting for a new cycle."
-                    )
-            except Exception as exc:
-                print(f"[Memory] Could not read state file ({exc}), starting fresh.")
+        try:
+            raw = self._read_state()
+            data, version = upgrade(raw) if raw is not None else (None, STATE_VERSION)
+        except NewerStateError:
+            raise
+        except Exception as exc:
+            data, version = self._recover_state(exc), STATE_VERSION
+            self._upgraded = data is not None  # save the rebuilt state right away
+
+        if data is not None:
+            if version < STATE_VERSION:
+                self._upgraded = True
+                print(f"[Memory] Upgraded the saved state from format {version} to {STATE_VERSION}.")
+            available = [tuple(pair) for pair in data.get("available", [])]
+            used = {tuple(pair) for pair in data.get("used", [])}
+            self._last_theme = data.get("last_theme")
+            self._cycle = int(data.get("cycle", 1))
+
+            # Saved pairs outside this run's pool (unselected batches,
+            # templates, named topics of older formats, questions since
+            # removed) are written back as they are
+            all_set = set(map(tuple, self._all_pairs))
+            self._kept = {
+                "available": [p for p in available if p not in all_set],
+                "used": sorted(p for p in used if p not in all_set),
+            }
+            if self._upgraded and (self._kept["available"] or self._kept["used"]):
+                print(
+                    f"[Memory] Keeping {len(self._kept['available']) + len(self._kept['used'])} "
+                    f"saved entries that match no question of this run."
+                )
+            available = [p for p in available if p in all_set]
+            used = {p for p in used if p in all_set}
+            # Pairs the saved state has never seen (a newly selected batch,
+            # questions added since) join the current cycle
+            known = used.union(available)
+            fresh = [p for p in self._all_pairs if p not in known]
+            if fresh:
+                self._rng.shuffle(fresh)
+                available += fresh
+
+            if available:
+                self._used = used
+                print(
+                    f"[Memory] Restored state — "
+                    f"{len(used)}/{len(self._all_pairs)} questions already asked "
+                    f"({len(available)} remaining)"
+                )
+                return list(available)
+            self._cycle += 1
+            print(
+                "[Memory] All questions have been asked — "
+                "resetting for a new cycle."
+            )
 
         # Fresh start
         pool = list(self._all_pairs)
-        random.shuffle(pool)
+        self._rng.shuffle(pool)
         print(f"[Memory] Starting fresh — {len(pool)} questions available.")
         return pool
 
-    def _save_state(self) -> None:
-        """Persist the current pool and used set to disk."""
-        data = {
-            "available": [list(p) for p in self._available],
-            "used":      [list(p) for p in self._used],
-            "last_theme": self._last_theme,
-        }
-        _STATE_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    def _save_state(self, asked: dict | None = None) -> None:
+        """
+        Persist the current pool and used set to disk.
+
+        `asked` is the history event of the question just sent; with a store
+        it is added to the history in the same transaction as the state.
+        """
+        data = encode(
+            self._available + self._kept["available"],
+            sorted(self._used) + self._kept["used"],
+            self._last_theme,
+            self._cycle,
+        )
+        if self._store is not None:
+            self._store.save_state(data, asked=asked)
+            return
+        # Compact: json only uses its C encoder without indent (~20x faster)
+        _write_atomic(_STATE_FILE, json.dumps(data, separators=(",", ":")))
+
+    # ── In-flight record ─────────────────────────────────────────────────────
+
+    def _read_pending(self) -> dict | None:
+        if self._store is not None:
+            return self._store.load_pending()
+        if not _PENDING_FILE.exists():
+            return None
+        try:
+            return json.loads(_PENDING_FILE.read_text(encoding="utf-8"))
+        except ValueError:
+            return None  # torn write of the record itself: nothing was sent yet
+
+    def _write_pending(self, pair: Tuple[str, str], phase: str) -> None:
+        record = {"theme": pair[0], "subtopic": pair[1], "phase": phase, "cycle": self._cycle}
+        if self._store is not None:
+            self._store.save_pending(record)
+        else:
+            _write_atomic(_PENDING_FILE, json.dumps(record))
+
+    def _clear_pending(self) -> None:
+        if self._store is not None:
+            self._store.save_pending(None)
+        elif _PENDING_FILE.exists():
+            _PENDING_FILE.unlink()
+
+    def _recover_pending(self) -> None:
+        """Settle a question left in flight by a crashed run."""
+        record = self._read_pending()
+        if record is None:
+            return
+        pair = (record["theme"], record["subtopic"])
+        if record.get("cycle", self._cycle) != self._cycle:
+            # Left over from a cycle that has since completed: already counted there
+            self._clear_pending()
+        elif record.get("phase") == "sent":
+            if pair not in self._used:
+                print(f"[Memory] Recovered sent question {pair[0]} > {pair[1]} — marking used.")
+                self.mark_used(*pair)
+            else:
+                self._clear_pending()
+        elif self._has(self._avail_bits, pair):
+            print(f"[Memory] Question {pair[0]} > {pair[1]} was interrupted — offering it again.")
+            self._resume = pair
+        else:
+            self._clear_pending()
 
     # ── Public API ───────────────────────────────────────────────────────────
 
     def pick_next_theme(self) -> Tuple[str, str]:
         """Pick the next (theme, subtopic) pair, avoiding the last used theme."""
-        if not self._available:
-            # All 252 questions exhausted — reset for a new cycle
+        resume = self._resume
+        if resume is not None and self._has(self._avail_bits, resume) and (
+                self._allowed is None or self._has(self._allowed, resume)):
+            return resume
+
+        eligible = self._eligible()
+        if not any(eligible.values()):
+            # Every question the filters allow has been asked — reset for a new cycle
             self._available = list(self._all_pairs)
-            random.shuffle(self._available)
+            self._rng.shuffle(self._available)
+            self._avail_bits = self._masks_of(self._available)
             self._used.clear()
+            self._cycle += 1
             self._save_state()
             print("[Memory] Full cycle complete — starting a new cycle.")
+            eligible = self._eligible()
 
         # Avoid two questions from the same theme back-to-back
-        candidates = [p for p in self._available if p[0] != self._last_theme]
+        candidates = {t: m for t, m in eligible.items() if m and t != self._last_theme}
         if not candidates:
-            candidates = self._available  # fallback if only one theme left
+            candidates = {t: m for t, m in eligible.items() if m}  # only one theme left
+
+        # Uniform over the candidate questions: pick the r-th set bit overall
+        r = self._rng.randrange(sum(m.bit_count() for m in candidates.values()))
+        for theme, mask in candidates.items():
+            count = mask.bit_count()
+            if r < count:
+                return self._theme_pairs[theme][_nth_set_bit(mask, r)]
+            r -= count
+        raise AssertionError("unreachable")
 
-        return random.choice(candidates)
+    def record_intent(self, theme: str, subtopic: str) -> None:
+        """Phase 1: persist the question about to be sent."""
+        self._write_pending((theme, subtopic), "intent")
+
+    def record_sent(self, theme: str, subtopic: str) -> None:
+        """Phase 2: the question was submitted; mark_used() must follow."""
+        self._write_pending((theme, subtopic), "sent")
 
     def mark_used(self, theme: str, subtopic: str) -> None:
         """Record that this question was sent, then persist to disk."""
         pair = (theme, subtopic)
+        self._take(pair)
+
+        event = {
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "session": self.session_id,
+            "cycle": self._cycle,
+            "theme": theme,
+            "subtopic": subtopic,
+            "fp": _question_fingerprint(theme, subtopic),
+        }
+        if self._store is not None:
+            # State, history row and pending-clear commit as one transaction
+            self._save_state(asked=event)
+            return
+        # History first: a replay after a crash here is dropped as a repeat
+        self._history.record(event)
+        self._save_state()
+        self._clear_pending()
+
+    def skip(self, theme: str, subtopic: str) -> None:
+        """
+        Take a question that could not be generated out of this cycle's pool,
+        without logging it as asked, then persist to disk.
+        """
+        self._take((theme, subtopic))
+        self._save_state()
+
+    def _take(self, pair: Tuple[str, str]) -> None:
+        """Move `pair` from the available pool to the used set."""
+        theme = pair[0]
         self._used.add(pair)
         self._last_theme = theme
-        if pair in self._available:
+        if self._has(self._avail_bits, pair):
+            self._avail_bits[theme] &= ~(1 << self._bit_of[pair])
             self._available.remove(pair)
-        self._save_state()
+        if self._resume == pair:
+            self._resume = None
+        if self._quota is not None and self._quota.get(self._bucket_of.get(pair), 0) > 0:
+            self._quota[self._bucket_of[pair]] -= 1
+            if not self._quota[self._bucket_of[pair]]:
+                self._update_quota_bits()
+
+    # ── Token budget ─────────────────────────────────────────────────────────
+
+    def _bucket_masks(self) -> Dict[str, Dict[int, int]]:
+        """Theme → token bucket → mask of the theme's questions in it (built once)."""
+        if self._bucket_bits is not None:
+            return self._bucket_bits
+        import question_generator as qgen
+        from bank.source import batch_subtopic
+        from bank.tokens import bucket
+
+        bits: Dict[str, Dict[int, bytearray]] = {}
+        for batch in self._pools:
+            for theme, counts in qgen.token_counts(batch).items():
+                size = (len(self._theme_pairs.get(theme, ())) + 7) // 8
+                for i, n in enumerate(counts):
+                    pair = (theme, batch_subtopic(batch, i))
+                    if pair not in self._bit_of:
+                        continue
+                    b = self._bucket_of[pair] = bucket(n)
+                    j = self._bit_of[pair]
+                    bits.setdefault(theme, {}).setdefault(b, bytearray(size))[j >> 3] |= 1 << (j & 7)
+        self._bucket_bits = {
+            theme: {b: int.from_bytes(raw, "little") for b, raw in buckets.items()}
+            for theme, buckets in bits.items()
+        }
+        return self._bucket_bits
+
+    def _update_quota_bits(self) -> None:
+        buckets = self._bucket_masks()
+        self._quota_bits = dict.fromkeys(self._theme_pairs, 0)
+        for theme, by_bucket in buckets.items():
+            for b, mask in by_bucket.items():
+                if self._quota.get(b, 0) > 0:
+                    self._quota_bits[theme] |= mask
+
+    def plan_tokens(self, budget: int, max_questions: int) -> dict:
+        """
+        Plan up to `max_questions` questions totalling at most `budget` tokens
+        from this cycle's remaining pool, and restrict picks to that plan.
+
+        The plan is a knapsack over the histogram of available, allowed
+        questions per token bucket — one popcount per (theme, bucket) mask.
+        Template questions have no token count and are left out. Returns
+        {"questions", "tokens", "quotas"}, "tokens" being the planned upper bound.
+        """
+        from bank.tokens import BUCKET_TOKENS, plan
+
+        eligible = self._eligible(quota=False)
+        available = Counter()
+        for theme, by_bucket in self._bucket_masks().items():
+            for b, mask in by_bucket.items():
+                available[b] += (mask & eligible.get(theme, 0)).bit_count()
+        quotas = plan(+available, budget, max_questions)
+        self._quota = dict(quotas)
+        self._update_quota_bits()
+        return {
+            "questions": sum(quotas.values()),
+            "tokens": sum(b * n for b, n in quotas.items()) * BUCKET_TOKENS,
+            "quotas": quotas,
+        }
+
+    def token_count(self, theme: str, subtopic: str) -> int | None:
+        """Approximate token count of a question (None for templates)."""
+        import question_generator as qgen
+        from bank.source import parse_subtopic
+        if subtopic.startswith("tpl:"):
+            return None
+        batch, index = parse_subtopic(subtopic)
+        try:
+            return qgen.token_counts(batch)[theme][index]
+        except (KeyError, IndexError):
+            return None
+
+    @property
+    def batches(self) -> list[str]:
+        return list(self._pools)
 
     def stats(self) -> str:
         total = len(self._all_pairs)
         used = len(self._used)
         remaining = len(self._available)
-        return f"[Memory] {used}/{total} questions asked this cycle  ({remaining} remaining)"
+        line = f"[Memory] {used}/{total} questions asked this cycle  ({remaining} remaining)"
+        if self._allowed is not None:
+            allowed = sum(m.bit_count() for m in self._eligible(quota=False).values())
+            line = line[:-1] + f", {allowed} allowed by the filters)"
+        if len(self._pools) > 1:
+            per_batch = ", ".join(
+                f"{batch} {sum(1 for p in pool if p not in self._used)}/{len(pool)}"
+                for batch, pool in self._pools.items()
+            )
+            line += f"\n  remaining by batch: {per_batch}"
+        return line
@@ -0,0 +1,138 @@
+"""
+session_state.py — The saved SessionMemory state: its format versions and
+the migration that brings any earlier one up to date.
+
+Formats seen so far:
+
+    0  named topics (the first prototype, "0/54 topics used"): subtopics are
+       names such as "layout_shift_cls", and "used" / "available" may be
+       theme → [names] objects instead of pair lists
+    1  index pairs, no version field:
+       {"available": [[theme, subtopic], ...], "used": [...], "last_theme"}
+       with subtopics "12", later "batch3:12" and "tpl:...", and a "cycle"
+       counter added along the way
+    2  format 1 with a "version" header, written by this module
+
+upgrade() reads any of them in a single pass over the entries. Every entry
+is normalized once (pair lists, theme objects, {"theme", "subtopic"}
+records, integer or zero-padded indexes) and lands in the same output list,
+so a migration costs one walk over the state whatever version it starts
+from — there are no intermediate per-version copies. Entries that no
+longer name a question in the bank (a named topic, an index past the end of
+a list) are kept verbatim: SessionMemory writes them back untouched, so an
+upgrade never turns progress into a restart.
+
+A state newer than STATE_VERSION raises NewerStateError instead of being
+overwritten by an older checkout.
+"""
+
+from typing import Iterable, Iterator, Tuple
+
+STATE_VERSION = 2
+
+Pair = Tuple[str, str]
+
+
+class NewerStateError(ValueError):
+    """The saved state was written by a newer format than STATE_VERSION."""
+
+
+def detect_version(data: dict) -> int:
+    """Format version of a raw saved state (see the module docstring)."""
+    if "version" in data:
+        return int(data["version"])
+    for key in ("used", "available"):
+        entries = data.get(key)
+        if isinstance(entries, dict):
+            return 0
+        for entry in entries or ():
+            try:
+                subtopic = _pair(entry)[1]
+            except (KeyError, TypeError, ValueError):
+                return 1  # left for upgrade() to report
+            return 1 if _is_indexed(subtopic) else 0
+    return 1
+
+
+def _is_indexed(subtopic: str) -> bool:
+    """True for the subtopics of format 1 and later: "12", "batch3:12", "tpl:..."."""
+    if subtopic.isdigit() or subtopic.startswith("tpl:"):
+        return True
+    batch, sep, index = subtopic.partition(":")
+    return bool(sep) and batch.startswith("batch") and index.isdigit()
+
+
+def _subtopic(value) -> str:
+    """Canonical subtopic: indexes without zero padding ("07" → "7")."""
+    text = value if isinstance(value, str) else str(value)
+    if text.isdigit():
+        return text if text[0] != "0" or text == "0" else str(int(text))
+    if ":" not in text:
+        return text
+    batch, sep, index = text.partition(":")
+    if sep and index.isdigit() and not batch.startswith("tpl"):
+        return f"{batch}:{int(index)}"
+    return text
+
+
+def _pair(entry) -> Pair:
+    """One saved entry as a (theme, subtopic) pair."""
+    if isinstance(entry, dict):
+        return str(entry["theme"]), _subtopic(entry["subtopic"])
+    theme, subtopic = entry
+    return str(theme), _subtopic(subtopic)
+
+
+def _pairs(entries) -> Iterator[Pair]:
+    """The pairs of a saved list, or of a theme → [subtopics] object."""
+    if isinstance(entries, dict):
+        for theme, subtopics in entries.items():
+            for subtopic in subtopics:
+                yield str(theme), _subtopic(subtopic)
+        return
+    for entry in entries or ():
+        yield _pair(entry)
+
+
+def upgrade(data: dict) -> Tuple[dict, int]:
+    """
+    Return (`data` in format STATE_VERSION, the version it was saved in).
+
+    Raises NewerStateError for a state written by a newer format, and
+    ValueError for one whose entries are not pairs.
+    """
+    version = detect_version(data)
+    if version > STATE_VERSION:
+        raise NewerStateError(
+            f"The saved session state is format {version}, newer than this "
+            f"checkout understands ({STATE_VERSION}); update before running"
+        )
+    if version == STATE_VERSION:
+        return data, version
+    try:
+        # A pair both used and still listed as available counts as used
+        used = dict.fromkeys(_pairs(data.get("used")))
+        available = [p for p in dict.fromkeys(_pairs(data.get("available"))) if p not in used]
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Unreadable entry in the saved session state ({exc!r})") from None
+    out = {key: value for key, value in data.items() if key not in ("used", "available")}
+    out.update(
+        version=STATE_VERSION,
+        available=[list(p) for p in available],
+        used=[list(p) for p in used],
+        last_theme=data.get("last_theme"),
+        cycle=int(data.get("cycle", 1)),
+    )
+    return out, version
+
+
+def encode(available: Iterable[Pair], used: Iterable[Pair], last_theme: str | None,
+           cycle: int) -> dict:
+    """The state to save, in format STATE_VERSION."""
+    return {
+        "version":   STATE_VERSION,
+        "available": [list(p) for p in available],
+        "used":      [list(p) for p in used],
+        "last_theme": last_theme,
+        "cycle":     cycle,
+    }
@@ -0,0 +1,68 @@
+"""
+snippets/templates.py — Question templates filled from the snippet libraries.
+
+Placeholders name a slot pool (see question_templates._slot_pools()):
+    {react_code} {nextjs_code} {ts_code}   one snippet from react/nextjs/typescript.py
+    {feature} {stack_item}                 one entry of PRODUCT_CONTEXT's lists
+    {product} {daily_users} {team_size}    fixed PRODUCT_CONTEXT values
+Literal braces must be doubled ({{ }}).
+"""
+
+# template id → (theme, template text)
+Q_TEMPLATES = {
+
+"react_rerender_audit": ("react_internals", """**Debug Scenario:**
+Our {product} ({daily_users} daily users) has {feature}. The React DevTools Profiler flags this component as one of the hottest paths — its commits take 3-4x longer than the rest of the tree, and users report input lag whenever that feature is active:
+
+```tsx
+{react_code}
+```
+
+Show: exactly what React does on each render here, which identities, closures or subscriptions are unstable, the change you would make first, and how you would prove the fix with the Profiler (commit durations, "why did this render?") rather than by intuition."""),
+
+"react_review_gate": ("react_internals", """**Debug Scenario:**
+A PR touching {feature} includes the snippet below, and two reviewers on a team of {team_size} disagree on whether it is safe to merge:
+
+```tsx
+{react_code}
+```
+
+Act as the deciding reviewer. Show: the concrete bugs or risks (stale values, race conditions, wasted renders, broken memoization) ranked by user impact on a dashboard with {daily_users} daily users, and the corrected version you would approve."""),
+
+"nextjs_boundary_review": ("nextjs_advanced", """**Debug Scenario:**
+Our {product} is built on {stack_item}. After the last deploy, p95 TTFB doubled on the route behind {feature}, and some users intermittently see stale data. This code sits on its request path:
+
+```tsx
+{nextjs_code}
+```
+
+Show: where the server/client and caching boundaries actually fall in this code, which Next.js 14 caching layer (request memoization, data cache, full route cache, router cache) is most likely involved, and how you would restructure it."""),
+
+"nextjs_scale_plan": ("nextjs_advanced", """**Task (Code Generation):**
+Rework the implementation of {feature} for triple today's traffic of {daily_users} daily users, expected next quarter:
+
+```tsx
+{nextjs_code}
+```
+
+Show: what breaks first at 3x load and why, the rendering strategy (static, ISR, dynamic, streaming, edge) you would move it to, the cache keys and invalidation it needs, and how you would roll it out safely with {team_size}."""),
+
+"ts_type_debug": ("typescript", """**Debug Scenario:**
+Our {product} uses {stack_item} and a shared types package consumed by {feature}. This type-level code started failing after a dependency bump:
+
+```ts
+{ts_code}
+```
+
+Show: step by step how the compiler evaluates these types, why it fails (or infers the wrong thing), a fixed version, and where you would draw the line between type-level cleverness and maintainability for {team_size}."""),
+
+"ts_api_design": ("typescript", """**Task (Code Generation):**
+Publish the pattern below as a public, well-typed API in the internal SDK behind {feature}:
+
+```ts
+{ts_code}
+```
+
+Show: which generics and constraints belong in the signature, what should be inferred vs. annotated, which edge cases need type tests (`expectTypeOf`/`@ts-expect-error`), and what the compile-time cost looks like across a large monorepo."""),
+
+}
@@ -0,0 +1,40 @@
+"""
+tests/conftest.py — Shared fixtures: a private compiled bank.
+
+The live snippets are whatever is being written this week, so tests that
+need real questions serve an archived batch (batch2) from a bank built once
+per run under pytest's tmp directory, never the repo's .bank/bank.pack.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import question_generator as qgen  # noqa: E402
+from bank.pack import ensure_pack  # noqa: E402
+
+BATCH = "batch2"
+
+
+@pytest.fixture(scope="session")
+def bank_pack(tmp_path_factory) -> Path:
+    """Path of a bank of every batch, built once per test run."""
+    path = tmp_path_factory.mktemp("bank") / "bank.pack"
+    ensure_pack(path)
+    return path
+
+
+@pytest.fixture
+def archived_bank(bank_pack, monkeypatch):
+    """question_generator serving archived batches from `bank_pack`."""
+    monkeypatch.setattr(qgen, "_bank", None)
+    qgen.use_bank([BATCH], bank_pack)
+    reader = qgen._bank
+    yield reader
+    reader.close()
+    qgen.batch_sizes.cache_clear()
+    qgen.token_counts.cache_clear()
@@ -0,0 +1,75 @@
+"""
+tests/test_filters.py — Block/allow rules and the bitmasks they compile to.
+
+Bit i of a theme's mask stands for the theme's i-th pair; a block rule
+always wins over an allow rule. Only id: and batch: rules are used here, so
+no index or markdown is read.
+
+Run with: python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bank.filters import compile_masks, parse_rules  # noqa: E402
+
+PAIRS = {
+    "testing": [("testing", "0"), ("testing", "1"), ("testing", "batch3:0"),
+                ("testing", "tpl:ts_api_design:0.0")],
+    "css_rendering": [("css_rendering", "batch3:0"), ("css_rendering", "batch3:1")],
+}
+
+
+def _bits(mask: int) -> list[int]:
+    return [i for i in range(mask.bit_length()) if mask >> i & 1]
+
+
+def test_parse_rules_normalizes_values():
+    rules = parse_rules({"allow": ["tag: MSW "], "block": ["fp:3F0C9A1B2C3D4E5F", "id:live/testing#1"]})
+    assert rules == {
+        "allow": [("tag", "msw")],
+        "block": [("fp", "3f0c9a1b2c3d4e5f"), ("id", "live/testing#1")],
+    }
+
+
+@pytest.mark.parametrize("data, message", [
+    ([], "expected an object"),
+    ({"deny": []}, "unknown key"),
+    ({"block": "id:live/testing#1"}, "block must be a list"),
+    ({"block": ["name:layout_shift_cls"]}, r"block\[0\]"),
+    ({"allow": ["tag: "]}, r"allow\[0\]"),
+])
+def test_parse_rules_rejects(data, message):
+    with pytest.raises(ValueError, match=message):
+        parse_rules(data)
+
+
+def test_no_rules_allow_everything():
+    masks = compile_masks(PAIRS, parse_rules({}))
+    assert _bits(masks["testing"]) == [0, 1, 2, 3]
+    assert _bits(masks["css_rendering"]) == [0, 1]
+
+
+def test_block_by_id_and_batch():
+    rules = parse_rules({"block": ["id:live/testing#1", "batch:templates"]})
+    masks = compile_masks(PAIRS, rules)
+    assert _bits(masks["testing"]) == [0, 2]
+    assert _bits(masks["css_rendering"]) == [0, 1]
+
+
+def test_allow_list_with_block_winning():
+    rules = parse_rules({"allow": ["batch:batch3"], "block": ["id:batch3/css_rendering#1"]})
+    masks = compile_masks(PAIRS, rules)
+    assert _bits(masks["testing"]) == [2]
+    assert _bits(masks["css_rendering"]) == [0]
+
+
+def test_masks_span_several_bytes():
+    pairs = {"testing": [("testing", str(i)) for i in range(20)]}
+    rules = parse_rules({"block": [f"id:live/testing#{i}" for i in (0, 8, 19)]})
+    assert _bits(compile_masks(pairs, rules)["testing"]) == [i for i in range(20) if i not in (0, 8, 19)]
@@ -0,0 +1,40 @@
+"""
+tests/test_fingerprints.py — History fingerprints agree with the bank index.
+
+The history log (session_memory) and the bank tools (bank/index.py) must give
+a question the same fingerprint, or filters and rollups that join the two
+find nothing. batch1 questions are the interesting case: the runtime serves
+them in the normalized layout, the index hashes their source text.
+
+Run with: python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import bank.index  # noqa: E402
+import question_generator as qgen  # noqa: E402
+import session_memory  # noqa: E402
+from bank.fingerprint import fingerprint  # noqa: E402
+from bank.layout import normalize_layout  # noqa: E402
+from bank.source import batch_subtopic, load_batch  # noqa: E402
+
+
+def test_history_fp_matches_index_for_archived_question(tmp_path, monkeypatch, archived_bank):
+    # A private archive index instead of the repo's .bank/archive_index.jsonl
+    monkeypatch.setattr(bank.index, "INDEX_FILE", tmp_path / "archive_index.jsonl")
+
+    bank.index.backfill()
+    entry = next(
+        e for e in bank.index.batch_entries("batch1")
+        if e["theme"] == "testing" and e["index"] == 0
+    )
+    source = load_batch("batch1")[0]["testing"][0]
+    assert fingerprint(normalize_layout(source)) != entry["fp"]  # the layouts really differ
+
+    subtopic = batch_subtopic("batch1", 0)
+    assert fingerprint(qgen.generate("testing", subtopic)) != entry["fp"]  # served normalized
+    assert session_memory._question_fingerprint("testing", subtopic) == entry["fp"]
@@ -0,0 +1,101 @@
+"""
+tests/test_markdown.py — Markdown question order, and broken files keeping
+their slot.
+
+Files of a theme follow their numeric prefix across sub-folders. A file that
+fails to parse must compile to an empty placeholder in its theme, so the
+questions after it keep their indexes.
+
+Run with: python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bank.markdown import compile_dir  # noqa: E402
+
+THEMES = ("testing", "css_rendering")
+
+
+def _question(theme: str, body: str) -> str:
+    return f"---\ntheme: {theme}\ntags: [msw]\ndifficulty: hard\n---\n{body}\n"
+
+
+def _write(src: Path, rel: str, text: str) -> None:
+    path = src / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def src(tmp_path) -> Path:
+    src = tmp_path / "questions"
+    _write(src, "010-third.md", _question("testing", "**Task:** third"))
+    _write(src, "mocks/002-second.md", _question("testing", "**Task:** second"))
+    _write(src, "001-first.md", _question("testing", "**Task:** first"))
+    _write(src, "extra.md", _question("testing", "**Task:** unnumbered"))
+    _write(src, "005-css.md", _question("css_rendering", "**Task:** css"))
+    return src
+
+
+def _texts(records: dict, theme: str) -> list[str]:
+    return [r["text"] for r in records[theme]]
+
+
+def test_order_follows_numeric_prefix(src):
+    records, stats = compile_dir(src, THEMES)
+    assert _texts(records, "testing") == [
+        "**Task:** first", "**Task:** second", "**Task:** third", "**Task:** unnumbered",
+    ]
+    assert records["testing"][1]["source"] == "mocks/002-second.md"
+    assert records["testing"][0]["tags"] == ["msw"]
+    assert stats == {"files": 5, "compiled": 5, "reused": 0, "broken": 0}
+
+
+def test_broken_file_raises_without_errors_list(src):
+    _write(src, "mocks/002-second.md", "---\ntheme: testing\nowner: me\n---\n**Task:** second\n")
+    with pytest.raises(ValueError, match="unknown front-matter key"):
+        compile_dir(src, THEMES)
+
+
+def test_broken_file_keeps_its_slot(src):
+    _write(src, "mocks/002-second.md", "---\ntheme: testing\nowner: me\n---\n**Task:** second\n")
+    errors: list[str] = []
+    records, stats = compile_dir(src, THEMES, errors=errors)
+    assert len(errors) == 1 and "002-second.md" in errors[0]
+    assert _texts(records, "testing") == ["**Task:** first", "", "**Task:** third", "**Task:** unnumbered"]
+    assert records["testing"][1]["source"] == "mocks/002-second.md"
+    assert stats["broken"] == 1
+    assert stats["files"] == stats["compiled"] + stats["reused"] + stats["broken"]
+
+
+def test_broken_file_keeps_its_cached_theme(src, tmp_path):
+    cache = tmp_path / "markdown.json"
+    compile_dir(src, THEMES, cache)
+    # The theme line itself is broken now: the cache still knows the theme
+    _write(src, "005-css.md", "---\ntheme css_rendering\n---\n**Task:** css\n")
+    errors: list[str] = []
+    records, stats = compile_dir(src, THEMES, cache, errors=errors)
+    assert len(errors) == 1
+    assert _texts(records, "css_rendering") == [""]
+    assert stats == {"files": 5, "compiled": 0, "reused": 4, "broken": 1}
+
+    # Fixed again: compiled back into the same slot
+    _write(src, "005-css.md", _question("css_rendering", "**Task:** css, fixed"))
+    records, stats = compile_dir(src, THEMES, cache, errors=errors)
+    assert _texts(records, "css_rendering") == ["**Task:** css, fixed"]
+    assert stats["compiled"] == 1
+
+
+def test_broken_file_of_unknown_theme_is_dropped(src):
+    _write(src, "007-broken.md", "no front matter at all\n")
+    errors: list[str] = []
+    records, stats = compile_dir(src, THEMES, errors=errors)
+    assert len(errors) == 1
+    assert len(records["testing"]) == 4
+    assert stats["broken"] == 1
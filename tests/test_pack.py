@@ -0,0 +1,151 @@
+"""
+tests/test_pack.py — Pack round-trip and source-stamp staleness.
+
+A pack must give back every question, token count and fingerprint it was
+written with, and pack_stale() must notice any source file of a batch being
+edited, added or removed. The batch is a copy of two batch2 modules in a
+private tree, so the repo's snippets are never touched.
+
+Run with: python -m pytest -q tests
+"""
+
+import shutil
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import bank.pack  # noqa: E402
+import bank.source  # noqa: E402
+import bank.tokens  # noqa: E402
+from bank.fingerprint import fingerprint  # noqa: E402
+from bank.layout import normalize_layout  # noqa: E402
+from bank.pack import PackReader, collect, pack_stale, source_stamps, write_pack  # noqa: E402
+from bank.source import parse_question_id  # noqa: E402
+from bank.tokens import count_tokens  # noqa: E402
+
+BATCH = "batch2"
+MODULES = ("q_testing.py", "q_css.py")
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch) -> Path:
+    """A private snippets/archive/batch2 with two theme modules."""
+    batch_dir = tmp_path / "snippets" / "archive" / BATCH
+    batch_dir.mkdir(parents=True)
+    for name in MODULES:
+        shutil.copy2(ROOT / "snippets" / "archive" / BATCH / name, batch_dir / name)
+    monkeypatch.setattr(bank.source, "ARCHIVE_DIR", tmp_path / "snippets" / "archive")
+    monkeypatch.setattr(bank.source, "CACHE_DIR", tmp_path / ".bank")
+    monkeypatch.setattr(bank.pack, "ROOT", tmp_path)
+    monkeypatch.setattr(bank.tokens, "TOKEN_CACHE_FILE", tmp_path / ".bank" / "tokens.json")
+    return batch_dir
+
+
+def _build(path: Path, **kwargs) -> tuple[dict, dict, dict]:
+    """Pack the private batch; returns (questions, fps, sources) as written."""
+    sources = source_stamps([BATCH])
+    fps: dict = {}
+    questions = collect([BATCH], fps=fps)
+    options = {"sources": sources, "fps": fps, **kwargs}
+    write_pack(questions, path, codec="zlib", **options)
+    return questions, fps, sources
+
+
+def test_round_trip(tree, tmp_path):
+    path = tmp_path / "bank.pack"
+    questions, fps, sources = _build(path)
+
+    reader = PackReader(path)
+    try:
+        assert reader.ids == list(questions)
+        assert reader.batches() == [BATCH]
+        assert reader.sources == sources
+        themes = Counter(parse_question_id(qid)[1] for qid in questions)
+        assert reader.theme_counts(BATCH) == {"testing": themes["testing"],
+                                              "css_rendering": themes["css_rendering"]}
+        counts = reader.token_counts(BATCH)
+        for qid, text in questions.items():
+            _, theme, index = parse_question_id(qid)
+            assert reader.get(qid) == text
+            assert reader.fingerprint(qid) == fps[qid]
+            assert counts[theme][index] == count_tokens(text)
+        assert f"{BATCH}/testing#{len(counts['testing'])}" not in reader
+    finally:
+        reader.close()
+
+
+def test_round_trip_of_free_form_ids(tree, tmp_path):
+    path = tmp_path / "free.pack"
+    questions = {"scratch-b": "**Task:** second", "scratch-a": "**Task:** first"}
+    write_pack(questions, path, codec="zlib", fps={"scratch-b": "00ff", "scratch-a": "0a"})
+    reader = PackReader(path)
+    try:
+        assert reader.ids == ["scratch-b", "scratch-a"]
+        assert reader.get("scratch-a") == "**Task:** first"
+        assert reader.fingerprint("scratch-a") == "000000000000000a"
+        with pytest.raises(KeyError):
+            reader.get("scratch-c")
+    finally:
+        reader.close()
+
+
+def test_collect_normalizes_but_fingerprints_the_source(tree):
+    fps: dict = {}
+    questions = collect([BATCH], fps=fps)
+    assert set(fps) == set(questions)
+    sources, _ = bank.source.load_batch(BATCH)
+    for theme, texts in sources.items():
+        for i, text in enumerate(texts):
+            qid = f"{BATCH}/{theme}#{i}"
+            assert questions[qid] == normalize_layout(text)
+            assert fps[qid] == fingerprint(text)
+
+
+def test_fresh_pack_is_not_stale(tree, tmp_path):
+    path = tmp_path / "bank.pack"
+    _build(path)
+    assert not pack_stale(path, [BATCH])
+    assert pack_stale(path, [BATCH, "batch3"])  # batch3 is not in it
+    assert pack_stale(tmp_path / "missing.pack", [BATCH])
+
+
+def test_edited_source_makes_it_stale(tree, tmp_path):
+    path = tmp_path / "bank.pack"
+    _build(path)
+    with (tree / "q_css.py").open("a", encoding="utf-8") as f:
+        f.write("\n# edited\n")
+    assert pack_stale(path, [BATCH])
+
+
+def test_copied_in_source_with_old_mtime_makes_it_stale(tree, tmp_path):
+    path = tmp_path / "bank.pack"
+    _build(path)
+    # rotate installs files with copy2: an older mtime, but a different stamp
+    shutil.copy2(ROOT / "snippets" / "archive" / "batch3" / "q_css.py", tree / "q_css.py")
+    assert pack_stale(path, [BATCH])
+
+
+def test_added_or_removed_source_makes_it_stale(tree, tmp_path):
+    path = tmp_path / "bank.pack"
+    _build(path)
+    (tree / "q_css.py").unlink()
+    assert pack_stale(path, [BATCH])
+
+    _build(path)
+    assert not pack_stale(path, [BATCH])
+    (tree / "questions").mkdir()
+    (tree / "questions" / "001-new.md").write_text("---\ntheme: testing\n---\n**Task:** new\n",
+                                                   encoding="utf-8")
+    assert pack_stale(path, [BATCH])
+
+
+@pytest.mark.parametrize("missing", ["sources", "fps"])
+def test_pack_without_stamps_or_fingerprints_is_stale(tree, tmp_path, missing):
+    path = tmp_path / "bank.pack"
+    _build(path, **{missing: None})
+    assert pack_stale(path, [BATCH])
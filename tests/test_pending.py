@@ -0,0 +1,83 @@
+"""
+tests/test_pending.py — Two-phase send recovery across a restart.
+
+record_intent() / record_sent() / mark_used() leave a pending record behind
+at each step; a SessionMemory started after a crash at any of them must
+offer an unsent question again, settle a sent one, and never log a send
+twice. Sessions here serve an archived batch from the shared test bank.
+
+Run with: python -m pytest -q tests
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import session_memory  # noqa: E402
+from conftest import BATCH  # noqa: E402
+from session_history import HistoryLog  # noqa: E402
+from session_memory import SessionMemory  # noqa: E402
+
+
+@pytest.fixture
+def start(tmp_path, monkeypatch, archived_bank):
+    """Start a SessionMemory on private state, pending and history files."""
+    monkeypatch.setattr(session_memory, "_STATE_FILE", tmp_path / "session_state.json")
+    monkeypatch.setattr(session_memory, "_PENDING_FILE", tmp_path / "session_state.pending.json")
+
+    def start(seed: int = 0) -> SessionMemory:
+        history = HistoryLog(tmp_path / "history.jsonl", tmp_path / "rollups.json")
+        return SessionMemory(rng=random.Random(seed), batches=[BATCH], history=history)
+    return start
+
+
+def _used() -> list[list[str]]:
+    return json.loads(session_memory._STATE_FILE.read_text(encoding="utf-8"))["used"]
+
+
+def _sends(memory: SessionMemory) -> list[tuple[str, str]]:
+    return memory._history.cycle_pairs()[1]
+
+
+def test_intent_only_is_offered_again(start):
+    memory = start()
+    pair = memory.pick_next_theme()
+    memory.record_intent(*pair)
+
+    memory = start(seed=1)  # crash before the send: a different seed must not matter
+    assert memory.pick_next_theme() == pair
+    assert _sends(memory) == []
+
+
+def test_sent_is_marked_used_on_restart(start):
+    memory = start()
+    pair = memory.pick_next_theme()
+    memory.record_intent(*pair)
+    memory.record_sent(*pair)
+
+    memory = start()  # crash after the send, before mark_used()
+    assert list(pair) in _used()
+    assert _sends(memory) == [pair]
+    assert not session_memory._PENDING_FILE.exists()
+    assert memory.pick_next_theme() != pair
+
+
+def test_completed_send_is_not_logged_twice(start):
+    memory = start()
+    pair = memory.pick_next_theme()
+    memory.record_intent(*pair)
+    memory.record_sent(*pair)
+    memory.mark_used(*pair)
+    # A crash between saving the state and clearing the record leaves it behind
+    memory.record_sent(*pair)
+
+    memory = start()
+    assert _used() == [list(pair)]
+    assert _sends(memory) == [pair]
+    assert not session_memory._PENDING_FILE.exists()
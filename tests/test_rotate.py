@@ -0,0 +1,97 @@
+"""
+tests/test_rotate.py — Re-keying saved progress onto a new live batch.
+
+After a rotation a live question counts as asked when one with the same
+fingerprint was asked before; the old live questions move to their archived
+subtopic, and the in-flight record moves with them.
+
+Run with: python -m pytest -q tests
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import bank.rotate  # noqa: E402
+from bank.rotate import _rekey, migrate_state  # noqa: E402
+from session_state import STATE_VERSION  # noqa: E402
+
+# Old live batch: testing 0-2; the new one keeps "b" (moved to index 0)
+OLD_FPS = {("testing", "0"): "a", ("testing", "1"): "b", ("testing", "2"): "c"}
+NEW_FPS = {("testing", "0"): "b", ("testing", "1"): "d", ("testing", "2"): "e"}
+
+
+def _state(**fields) -> dict:
+    return {"version": STATE_VERSION, "last_theme": "testing", "cycle": 3, **fields}
+
+
+def test_rekey_carries_over_by_fingerprint():
+    data = _state(
+        used=[["testing", "1"], ["testing", "2"], ["testing", "batch3:4"]],
+        available=[["testing", "0"], ["testing", "tpl:ts_api_design:0.0"]],
+    )
+    out = _rekey(data, OLD_FPS, NEW_FPS, "batch7", random.Random(0))
+    assert out["version"] == STATE_VERSION
+    assert (out["last_theme"], out["cycle"]) == ("testing", 3)
+    assert out["used"] == [
+        ["testing", "0"],             # "b" was asked
+        ["testing", "batch3:4"],      # archived pairs stay as they are
+        ["testing", "batch7:1"],      # the old live questions, archived
+        ["testing", "batch7:2"],
+    ]
+    assert sorted(out["available"]) == [
+        ["testing", "1"], ["testing", "2"], ["testing", "tpl:ts_api_design:0.0"],
+    ]
+
+
+def test_rekey_upgrades_an_old_state_first():
+    data = {"used": [["testing", "01"]], "available": [["testing", "00"], ["testing", "2"]]}
+    out = _rekey(data, OLD_FPS, NEW_FPS, None, random.Random(0))
+    assert out["used"] == [["testing", "0"]]
+    assert sorted(out["available"]) == [["testing", "1"], ["testing", "2"]]
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    state = tmp_path / "session_state.json"
+    pending = tmp_path / "session_state.pending.json"
+    monkeypatch.setattr(bank.rotate, "STATE_FILE", state)
+    monkeypatch.setattr(bank.rotate, "PENDING_FILE", pending)
+    return state, pending
+
+
+def test_migrate_state_moves_the_pending_record(files):
+    state, pending = files
+    state.write_text(json.dumps(_state(used=[["testing", "1"]], available=[["testing", "0"]])),
+                     encoding="utf-8")
+    pending.write_text(json.dumps({"theme": "testing", "subtopic": "2", "phase": "sent", "cycle": 3}),
+                       encoding="utf-8")
+
+    out = migrate_state(OLD_FPS, NEW_FPS, archived_as="batch7", rng=random.Random(0))
+    assert out == {"file": (2, 2)}
+    saved = json.loads(state.read_text(encoding="utf-8"))
+    assert saved["used"] == [["testing", "0"], ["testing", "batch7:1"]]
+    assert json.loads(pending.read_text(encoding="utf-8"))["subtopic"] == "batch7:2"
+
+
+def test_migrate_state_drops_a_live_pending_record_without_an_archive(files):
+    state, pending = files
+    pending.write_text(json.dumps({"theme": "testing", "subtopic": "2", "phase": "intent", "cycle": 3}),
+                       encoding="utf-8")
+    assert migrate_state(OLD_FPS, NEW_FPS, rng=random.Random(0)) == {}
+    assert not pending.exists()
+    assert not state.exists()
+
+
+def test_migrate_state_keeps_an_archived_pending_record(files):
+    _, pending = files
+    record = {"theme": "testing", "subtopic": "batch3:4", "phase": "sent", "cycle": 3}
+    pending.write_text(json.dumps(record), encoding="utf-8")
+    migrate_state(OLD_FPS, NEW_FPS, archived_as="batch7", rng=random.Random(0))
+    assert json.loads(pending.read_text(encoding="utf-8")) == record
@@ -0,0 +1,86 @@
+"""
+tests/test_session_state.py — Saved-state format detection and upgrade.
+
+Every format session_state.py knows must come out as STATE_VERSION with each
+entry exactly once, and nothing a user has already been asked may fall back
+into the available pool.
+
+Run with: python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from session_state import (  # noqa: E402
+    STATE_VERSION,
+    NewerStateError,
+    detect_version,
+    encode,
+    upgrade,
+)
+
+
+def test_v0_named_topics_are_kept_verbatim():
+    data = {
+        "available": {"css_rendering": ["layout_shift_cls", "paint_layers"]},
+        "used": {"css_rendering": ["paint_layers"]},
+        "last_theme": "css_rendering",
+    }
+    assert detect_version(data) == 0
+    out, version = upgrade(data)
+    assert version == 0
+    assert out["version"] == STATE_VERSION
+    assert out["used"] == [["css_rendering", "paint_layers"]]
+    assert out["available"] == [["css_rendering", "layout_shift_cls"]]
+    assert out["cycle"] == 1
+
+
+def test_v1_pairs_are_normalized_and_deduplicated():
+    data = {
+        "available": [["testing", "07"], ["testing", "3"], {"theme": "testing", "subtopic": 7},
+                      ["testing", "batch3:012"], ["testing", "tpl:ts_api_design:0.1"]],
+        "used": [["testing", "3"], ["testing", "batch3:12"]],
+        "last_theme": "testing",
+        "cycle": 4,
+    }
+    assert detect_version(data) == 1
+    out, version = upgrade(data)
+    assert version == 1
+    assert out["used"] == [["testing", "3"], ["testing", "batch3:12"]]
+    # Zero padding dropped, repeats merged, used pairs out of the pool
+    assert out["available"] == [["testing", "7"], ["testing", "tpl:ts_api_design:0.1"]]
+    assert (out["last_theme"], out["cycle"]) == ("testing", 4)
+
+
+def test_current_format_is_returned_as_is():
+    data = encode([("testing", "1")], [("testing", "0")], "testing", 2)
+    out, version = upgrade(data)
+    assert out is data
+    assert version == STATE_VERSION
+
+
+def test_encode_round_trips_through_upgrade():
+    data = encode(iter([("css_rendering", "2")]), iter([("testing", "batch5:0")]), None, 3)
+    assert data == {
+        "version": STATE_VERSION,
+        "available": [["css_rendering", "2"]],
+        "used": [["testing", "batch5:0"]],
+        "last_theme": None,
+        "cycle": 3,
+    }
+    assert upgrade(data)[0] == data
+
+
+def test_newer_state_is_refused():
+    with pytest.raises(NewerStateError):
+        upgrade({"version": STATE_VERSION + 1, "available": [], "used": []})
+
+
+def test_unreadable_entry_raises_value_error():
+    with pytest.raises(ValueError, match="Unreadable entry"):
+        upgrade({"available": [["testing", "1", "extra"]], "used": []})
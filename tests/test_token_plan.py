@@ -0,0 +1,65 @@
+"""
+tests/test_token_plan.py — plan() over token-length histograms.
+
+plan() must never exceed the budget, take as many questions as fit (up to
+max_questions), and among those plans the one with the most tokens. Small
+histograms are checked against an exhaustive search.
+
+Run with: python -m pytest -q tests
+"""
+
+import itertools
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bank.tokens import BUCKET_TOKENS, bucket, plan  # noqa: E402
+
+
+def _best(hist: dict, budget: int, max_questions: int) -> tuple[int, int]:
+    """(questions, bucket units) of the best plan, by trying every one."""
+    buckets = sorted(hist)
+    best = (0, 0)
+    for takes in itertools.product(*(range(hist[b] + 1) for b in buckets)):
+        count = sum(takes)
+        units = sum(t * b for t, b in zip(takes, buckets))
+        if count <= max_questions and units * BUCKET_TOKENS <= budget:
+            best = max(best, (count, units))
+    return best
+
+
+def test_bucket_bounds():
+    assert bucket(1) == 1
+    assert bucket(BUCKET_TOKENS) == 1
+    assert bucket(BUCKET_TOKENS + 1) == 2
+
+
+def test_nothing_fits():
+    assert plan({3: 4}, 2 * BUCKET_TOKENS, 5) == {}
+    assert plan({1: 4}, BUCKET_TOKENS - 1, 5) == {}
+    assert plan({1: 4}, 10 * BUCKET_TOKENS, 0) == {}
+
+
+def test_more_questions_beat_more_tokens():
+    # Five short questions fit; one long one plus a short one would be fewer
+    assert plan({1: 5, 4: 2}, 6 * BUCKET_TOKENS, 10) == {1: 5}
+
+
+def test_ties_on_count_take_the_longer_questions():
+    assert plan({1: 3, 2: 3}, 5 * BUCKET_TOKENS, 3) == {1: 1, 2: 2}
+
+
+def test_matches_exhaustive_search():
+    rng = random.Random(42)
+    for _ in range(300):
+        hist = {b: rng.randint(1, 4) for b in rng.sample(range(1, 9), rng.randint(1, 4))}
+        budget = rng.randint(0, 30) * BUCKET_TOKENS + rng.randint(0, BUCKET_TOKENS - 1)
+        max_questions = rng.randint(1, 8)
+        quotas = plan(hist, budget, max_questions)
+        assert all(0 < n <= hist[b] for b, n in quotas.items())
+        units = sum(b * n for b, n in quotas.items())
+        assert units * BUCKET_TOKENS <= budget
+        assert (sum(quotas.values()), units) == _best(hist, budget, max_questions)